@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from .models import Collection, Art
+from .images import THUMBNAIL_WIDTH, image_url
 
 
 @admin.register(Collection)
@@ -16,7 +17,7 @@ class CollectionAdmin(admin.ModelAdmin):
         if obj.cover_image:
             return format_html(
                 '<img src="{}" style="max-height:75px;" />',
-                obj.cover_image.url,
+                image_url(obj.cover_image, THUMBNAIL_WIDTH),
             )
         return ''
 
@@ -42,7 +43,7 @@ class ArtAdmin(admin.ModelAdmin):
         if obj.image:
             return format_html(
                 '<img src="{}" style="max-height:75px;" />',
-                obj.image.url,
+                image_url(obj.image, THUMBNAIL_WIDTH),
             )
         return ''
 
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CollectionsAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'collections_app'
+
+    def ready(self):
+        # Register signal receivers (storefront projections, caches)
+        from . import signals  # noqa: F401
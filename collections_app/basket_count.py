@@ -0,0 +1,42 @@
+"""Navbar basket badge count.
+
+The count is rendered into every page for signed-in users (see
+collections_app.context_processors.basket) instead of being fetched by
+``main.js`` after load. It is read from Basket.item_count and cached per
+user (config.cache.UserCounter); BasketQuerySet drops the cached value
+whenever a basket's totals change. Within a request the value is memoized
+on the request object.
+"""
+from config.cache import UserCounter
+
+
+def _load(user_id):
+    from .models import Basket
+
+    return (
+        Basket.objects.filter(user_id=user_id)
+        .values_list('item_count', flat=True)
+        .first()
+    ) or 0
+
+
+BASKET_COUNT = UserCounter(
+    'collections_app:basket_count', _load,
+    timeout_setting='BASKET_COUNT_CACHE_TIMEOUT',
+    request_attr='_basket_count',
+)
+
+
+def basket_count(user_id):
+    """Return the user's basket item count, reading the column on a miss."""
+    return BASKET_COUNT.get(user_id)
+
+
+def forget_basket_counts(user_ids):
+    """Drop cached counts once the surrounding transaction commits."""
+    BASKET_COUNT.forget(*user_ids)
+
+
+def request_basket_count(request):
+    """Per-request memoized basket count for the signed-in user."""
+    return BASKET_COUNT.for_request(request)
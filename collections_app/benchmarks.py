@@ -0,0 +1,211 @@
+"""Request benchmarks for the storefront pages.
+
+``run_benchmarks`` requests each page in ``benchmark_pages`` through the
+Django test client (the whole middleware/view/template stack, no network)
+and reports, per page:
+
+- ``p50_ms`` / ``p95_ms`` / ``mean_ms``: wall-clock latency of the timed
+  requests (nearest-rank percentiles);
+- ``queries``: SQL queries of the last timed request;
+- ``peak_kib``: peak Python memory allocated during one extra request,
+  traced with ``tracemalloc`` (kept out of the timed requests, which it
+  would slow down).
+
+The anonymous page cache and the homepage context cache are dropped before
+every request unless ``warm_cache`` is set, so by default the figures are
+the cost of actually building each page.
+
+``compare`` checks a result against a baseline written by an earlier run:
+any extra query is a regression, latency and memory may grow by
+``tolerance`` (a fraction) before they count. ``manage.py
+benchmark_storefront`` wraps both and writes the JSON report CI diffs.
+"""
+import math
+import platform
+import time
+import tracemalloc
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+# Metrics compared against the baseline; queries must not grow at all
+TIMED_METRICS = ('p50_ms', 'p95_ms', 'peak_kib')
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def benchmark_pages():
+    """``{name: (path, user)}`` for the pages to benchmark.
+
+    Detail pages use the newest available artwork and its artist; basket
+    and checkout are requested as the first user whose basket has items
+    (and skipped when there is none).
+    """
+    from .models import Art, Basket
+
+    def url(name, *args, query=''):
+        return reverse(f'collections_app:{name}', args=args) + query
+
+    pages = {
+        'index': (url('index'), None),
+        'gallery': (url('gallery'), None),
+        'artwork_list': (url('artwork_list'), None),
+        'artwork_list_filtered': (
+            url('artwork_list', query='?min_price=100&max_price=1000'), None
+        ),
+        'artwork_search_by_price': (
+            url('artwork_search_by_price',
+                query='?min_price=100&max_price=500'),
+            None,
+        ),
+        'artwork_price_histogram': (url('artwork_price_histogram'), None),
+        'events': (reverse('events_app:index'), None),
+    }
+
+    art = (
+        Art.storefront.available()
+        .select_related('collection')
+        .order_by('-created_at', 'id')
+        .first()
+    )
+    if art is not None:
+        pages['artwork_detail'] = (url('artwork_detail', art.pk), None)
+        pages['artworks_by_artist'] = (
+            url('artworks_by_artist', art.collection.artist_id), None
+        )
+
+    basket = (
+        Basket.objects.filter(item_count__gt=0)
+        .select_related('user')
+        .order_by('pk')
+        .first()
+    )
+    if basket is not None:
+        pages['basket'] = (url('basket'), basket.user)
+        pages['checkout'] = (url('checkout'), basket.user)
+    return pages
+
+
+def _client_host():
+    # The test client's default "testserver" is only allowed under tests
+    for host in settings.ALLOWED_HOSTS:
+        if host != '*' and not host.startswith('.'):
+            return host
+    return 'localhost'
+
+
+def _forget_page_caches():
+    from config.cache import bump_page_cache_version
+
+    from .homepage import invalidate_homepage_cache
+
+    invalidate_homepage_cache()
+    bump_page_cache_version('catalog', 'events')
+
+
+def measure(client, path, iterations=20, warmup=3, warm_cache=False):
+    """Time ``iterations`` GETs of ``path``; returns one result dict."""
+    def get():
+        if not warm_cache:
+            _forget_page_caches()
+        return client.get(path)
+
+    for _ in range(warmup):
+        get()
+
+    timings = []
+    for _ in range(iterations):
+        if not warm_cache:
+            _forget_page_caches()
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = client.get(path)
+            timings.append((time.perf_counter() - start) * 1000)
+    # Read now: the captured list is a view of the connection's query log,
+    # which the next request clears
+    query_count = len(queries)
+
+    tracemalloc.start()
+    try:
+        get()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'path': path,
+        'status': response.status_code,
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'mean_ms': round(sum(timings) / len(timings), 2),
+        'queries': query_count,
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(iterations=20, warmup=3, only=None, warm_cache=False):
+    """Benchmark every page (or the names in ``only``); returns the report."""
+    from .models import Art
+
+    results = {}
+    for name, (path, user) in benchmark_pages().items():
+        if only and name not in only:
+            continue
+        client = Client(SERVER_NAME=_client_host())
+        if user is not None:
+            client.force_login(user)
+        results[name] = measure(
+            client, path, iterations=iterations, warmup=warmup,
+            warm_cache=warm_cache,
+        )
+    return {
+        'meta': {
+            'vendor': connection.vendor,
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'arts': Art.objects.count(),
+            'iterations': iterations,
+            'warmup': warmup,
+            'warm_cache': warm_cache,
+        },
+        'results': results,
+    }
+
+
+def compare(report, baseline, tolerance=0.25):
+    """Regressions of ``report`` against ``baseline`` as readable lines.
+
+    Pages missing from either side are ignored. A page whose status code
+    changed is reported as such and its numbers are not compared.
+    """
+    problems = []
+    for name, result in report['results'].items():
+        before = baseline.get('results', {}).get(name)
+        if before is None:
+            continue
+        if result['status'] != before['status']:
+            problems.append(
+                f'{name}: status {before["status"]} -> {result["status"]}'
+            )
+            continue
+        if result['queries'] > before['queries']:
+            problems.append(
+                f'{name}: queries {before["queries"]} -> {result["queries"]}'
+            )
+        for metric in TIMED_METRICS:
+            limit = before[metric] * (1 + tolerance)
+            if result[metric] > limit:
+                problems.append(
+                    f'{name}: {metric} {before[metric]} -> {result[metric]} '
+                    f'(limit {limit:.2f})'
+                )
+    return problems
@@ -0,0 +1,13 @@
+"""Template context processors for collections_app."""
+from .basket_count import BASKET_COUNT
+
+
+def basket(request):
+    """Expose ``basket_count`` for the navbar badge.
+
+    Lazy and memoized on the request, so it is looked up at most once and
+    only when a template renders it.
+    """
+    return {
+        'basket_count': BASKET_COUNT.lazy(request),
+    }
@@ -1,4 +1,5 @@
 from django import forms
+from django.db import transaction
 from .models import Art, ArtVariant
 from .models import Media
 
@@ -52,6 +53,15 @@ class ArtForm(forms.ModelForm):
         required=False, max_digits=10, decimal_places=2
     )
 
+    # (variant medium, availability field, price field) for each format
+    VARIANT_FIELDS = (
+        (ArtVariant.ORIGINAL, 'original_available', 'original_price'),
+        (ArtVariant.POSTER, 'poster_available', 'poster_price'),
+        (ArtVariant.DIGITAL, 'digital_available', 'digital_price'),
+    )
+    # Variant columns the form owns; stock and created_at are left alone
+    VARIANT_UPDATE_FIELDS = ('is_available', 'price', 'currency', 'updated_at')
+
     class Meta:
         model = Art
         fields = [
@@ -111,27 +121,19 @@ class ArtForm(forms.ModelForm):
                     'rows': 4,
                 }
             )
-        # Pre-populate per-medium variant fields when editing existing Art
+        # Pre-populate per-medium variant fields when editing existing Art.
+        # The variants are kept for save(); views editing an Art should
+        # load it with prefetch_related('variants') so this is no query.
+        self._variants = {}
         if self.instance and getattr(self.instance, 'pk', None):
-            variants = {v.medium: v for v in self.instance.variants.all()}
-
-            # original
-            orig = variants.get(ArtVariant.ORIGINAL)
-            if orig:
-                self.fields['original_available'].initial = orig.is_available
-                self.fields['original_price'].initial = orig.price
-
-            # poster
-            poster = variants.get(ArtVariant.POSTER)
-            if poster:
-                self.fields['poster_available'].initial = poster.is_available
-                self.fields['poster_price'].initial = poster.price
-
-            # digital
-            digital = variants.get(ArtVariant.DIGITAL)
-            if digital:
-                self.fields['digital_available'].initial = digital.is_available
-                self.fields['digital_price'].initial = digital.price
+            self._variants = {
+                v.medium: v for v in self.instance.variants.all()
+            }
+            for medium, avail_field, price_field in self.VARIANT_FIELDS:
+                variant = self._variants.get(medium)
+                if variant:
+                    self.fields[avail_field].initial = variant.is_available
+                    self.fields[price_field].initial = variant.price
         # Add Bootstrap classes
         for name, field in self.fields.items():
             css = field.widget.attrs.get('class', '')
@@ -185,43 +187,74 @@ class ArtForm(forms.ModelForm):
                 )
 
     def save(self, commit=True):
-        # Save Art instance first
-        art = super().save(commit=commit)
-
-        # Helper to update/create variant
-        def upsert_variant(medium_const, avail_field, price_field):
-            avail = self.cleaned_data.get(avail_field, False)
-            price = self.cleaned_data.get(price_field, None)
-            variant, _ = ArtVariant.objects.get_or_create(
-                art=art, medium=medium_const
+        """
+        Save the Art and upsert its three variants.
+
+        Art.is_available and the storefront price projection are derived
+        from the submitted variants in memory, so the Art row is written
+        once. The variants are then written by a single
+        INSERT ... ON CONFLICT (art, medium) DO UPDATE, or not at all when
+        they match the variants loaded in __init__. bulk_create sends no
+        post_save signals for them; the Art save's receivers already drop
+        the homepage and catalog caches.
+
+        With commit=False, call save_m2m() after saving the Art to write
+        the variants, as with any ModelForm.
+        """
+        art = self.instance
+        currency = art.currency or 'USD'
+        self._variant_rows = [
+            ArtVariant(
+                medium=medium,
+                is_available=bool(self.cleaned_data.get(avail_field)),
+                price=self.cleaned_data.get(price_field),
+                currency=currency,
+                # Only used when the row is inserted: a new original is a
+                # single unit, as in ArtVariant.save()
+                stock=1 if medium == ArtVariant.ORIGINAL else None,
             )
-            variant.is_available = bool(avail)
-            # allow None for price
-            variant.price = price if price is not None else None
-            # use art.currency as the variant currency by default
-            variant.currency = getattr(art, 'currency', 'USD') or 'USD'
-            variant.save()
-
-        upsert_variant(
-            ArtVariant.ORIGINAL, 'original_available', 'original_price'
-        )
-        upsert_variant(
-            ArtVariant.POSTER, 'poster_available', 'poster_price'
-        )
-        upsert_variant(
-            ArtVariant.DIGITAL, 'digital_available', 'digital_price'
-        )
+            for medium, avail_field, price_field in self.VARIANT_FIELDS
+        ]
+
+        # Overall availability: any variant being available
+        art.is_available = any(v.is_available for v in self._variant_rows)
+        for field, value in Art.resolve_storefront_price(
+            self._variant_rows
+        ).items():
+            setattr(art, field, value)
 
-        # Derive overall Art.is_available from any variant being available
-        any_avail = (
-            ArtVariant.objects.filter(
-                art=art, is_available=True
-            ).exists()
+        if not commit:
+            return super().save(commit=False)
+        with transaction.atomic():
+            return super().save(commit=True)
+
+    def _save_m2m(self):
+        super()._save_m2m()
+        self._save_variants()
+
+    def _save_variants(self):
+        rows = self._variant_rows
+        if not self._variants_changed(rows):
+            return
+        for variant in rows:
+            variant.art = self.instance
+        ArtVariant.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['art', 'medium'],
+            update_fields=list(self.VARIANT_UPDATE_FIELDS),
+        )
+        # The prefetched variants are stale now
+        getattr(self.instance, '_prefetched_objects_cache', {}).pop(
+            'variants', None
         )
-        if art.is_available != any_avail:
-            art.is_available = any_avail
-            # ensure change is saved when using commit=True
-            if commit:
-                art.save()
 
-        return art
+    def _variants_changed(self, rows):
+        """False when every row matches the variant loaded in __init__."""
+        for row in rows:
+            current = self._variants.get(row.medium)
+            if current is None or (
+                current.is_available, current.price, current.currency
+            ) != (row.is_available, row.price, row.currency):
+                return True
+        return False
@@ -0,0 +1,117 @@
+"""Cached homepage context.
+
+The homepage is the hottest page on the site, yet its content only changes
+when an owner edits Media, Art or ArtVariant rows. The resolved context
+(hero/secondary/tertiary media URLs and the featured carousel payload) is
+therefore built once, stored in the Django cache and dropped by the
+receivers in collections_app.signals whenever one of those models changes.
+
+Settings:
+    HOMEPAGE_CACHE_ALIAS    cache alias from CACHES (default 'default')
+    HOMEPAGE_CACHE_TIMEOUT  seconds; invalidation is signal driven, so this
+                            is only a safety net (default 1 hour)
+    HOMEPAGE_LOCAL_CACHE_TIMEOUT
+                            cap on the timeout when the cache is per-process
+                            (locmem): an invalidation made in one process
+                            cannot reach the others, so their copies only
+                            expire (default 30 seconds)
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Q
+
+from config.cache import is_shared_cache
+
+from .images import FALLBACK_WIDTH, image_srcset, image_url
+
+HOMEPAGE_CACHE_KEY = 'collections_app:homepage:context'
+
+# Number of featured artworks shown in the homepage carousel
+FEATURED_LIMIT = 6
+
+
+def _cache():
+    return caches[getattr(settings, 'HOMEPAGE_CACHE_ALIAS', 'default')]
+
+
+def _timeout(cache):
+    timeout = getattr(settings, 'HOMEPAGE_CACHE_TIMEOUT', 60 * 60)
+    if not is_shared_cache(cache):
+        timeout = min(
+            timeout, getattr(settings, 'HOMEPAGE_LOCAL_CACHE_TIMEOUT', 30)
+        )
+    return timeout
+
+
+def _file_url(media):
+    if media is not None and media.file:
+        # Images get f_auto,q_auto; videos keep their original URL
+        return image_url(media.file)
+    return None
+
+
+def build_homepage_context():
+    """Query the database and return the homepage template context.
+
+    Only plain values are returned (no model instances or querysets) so
+    the result pickles cheaply and no Cloudinary URLs are rebuilt on a
+    cache hit.
+    """
+    from .models import Art, Media
+
+    # One query for all three placement flags instead of one per flag.
+    # Media.Meta.ordering (newest first) decides between duplicates, as
+    # the per-flag .first() calls did.
+    placed = list(
+        Media.objects.filter(
+            Q(hero=True) | Q(second_section=True) | Q(third_section=True)
+        )
+    )
+    hero = next((m for m in placed if m.hero), None)
+    secondary = next((m for m in placed if m.second_section), None)
+    tertiary = next((m for m in placed if m.third_section), None)
+
+    hero_video = _file_url(hero)
+    tertiary_url = _file_url(tertiary)
+
+    featured = Art.storefront.featured().order_by('-created_at')
+    featured_artworks = [
+        {
+            'pk': art.pk,
+            'title': art.title,
+            'year_created': art.year_created,
+            'image_url': (
+                image_url(art.image, FALLBACK_WIDTH) if art.image else None
+            ),
+            'image_srcset': image_srcset(art.image) if art.image else '',
+        }
+        for art in featured[:FEATURED_LIMIT]
+    ]
+
+    return {
+        'hero_video': hero_video,
+        # Use the media caption as the hero caption when available
+        'hero_caption': (hero.caption or '') if hero_video else '',
+        'secondary_video': _file_url(secondary),
+        # Provide both URL and media_type so templates can render
+        # image or video
+        'tertiary_media_url': tertiary_url,
+        'tertiary_media_type': tertiary.media_type if tertiary_url else None,
+        'featured_artworks': featured_artworks,
+    }
+
+
+def get_homepage_context():
+    """Return the homepage context, building and caching it on a miss."""
+    cache = _cache()
+    context = cache.get(HOMEPAGE_CACHE_KEY)
+    if context is None:
+        context = build_homepage_context()
+        cache.set(HOMEPAGE_CACHE_KEY, context, _timeout(cache))
+    # Callers may add request-specific keys; keep the cached dict intact
+    return dict(context)
+
+
+def invalidate_homepage_cache():
+    """Drop the cached homepage context."""
+    _cache().delete(HOMEPAGE_CACHE_KEY)
@@ -0,0 +1,125 @@
+"""Responsive Cloudinary image URLs.
+
+``CloudinaryField`` values (``Art.image``, ``Collection.cover_image``,
+``Exhibition.cover_image``, ``Media.file``, ``ArtistProfile.image``) are
+CloudinaryResource objects whose ``.url`` is the untouched original. The
+helpers here build delivery URLs that let Cloudinary pick the format and
+quality (``f_auto,q_auto``) and scale the image down to a given width
+(``w_N,c_limit``, never upscaled), plus a ``srcset`` of such widths so the
+browser downloads the smallest file that fills the slot.
+
+Videos and other non-image resources are returned unchanged. Templates use
+these through the ``image_tags`` library (``{% responsive_image %}`` and
+the ``cloudinary_url`` filter).
+
+Building a URL runs the SDK's option parsing (and signing, when enabled)
+every time, and pages such as the gallery build hundreds. ``resource_url``
+memoizes the result per ``(public_id, version, format, type,
+resource_type, options)`` in a per-process LRU of
+CLOUDINARY_URL_CACHE_SIZE entries and, when CLOUDINARY_URL_CACHE_ALIAS
+names a cache, in that shared cache too. A URL never changes for a given
+key (a re-upload gets a new version), so entries need no invalidation.
+"""
+import hashlib
+from functools import lru_cache
+
+from cloudinary import CloudinaryResource
+from cloudinary.utils import cloudinary_url
+from django.conf import settings
+from django.core.cache import caches
+
+# Widths offered in srcset; covers phone cards up to full-width heroes on
+# 2x screens without producing too many derived images per upload.
+DEFAULT_WIDTHS = (320, 480, 640, 960, 1280, 1600)
+
+# Used as ``src`` for browsers that ignore srcset
+FALLBACK_WIDTH = 960
+
+# Admin list previews (shown at max-height 75px)
+THUMBNAIL_WIDTH = 160
+
+# Shared-cache entries outlive deploys; the key already pins the version
+SHARED_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+
+
+def _build_url(key):
+    public_id, version, fmt, upload_type, resource_type, options = key
+    return cloudinary_url(
+        public_id,
+        format=fmt,
+        version=version,
+        type=upload_type,
+        resource_type=resource_type,
+        **dict(options),
+    )[0]
+
+
+def _shared_url(key):
+    alias = getattr(settings, 'CLOUDINARY_URL_CACHE_ALIAS', None)
+    if not alias:
+        return _build_url(key)
+    shared = caches[alias]
+    cache_key = 'cloudinary:url:' + hashlib.sha1(
+        repr(key).encode()
+    ).hexdigest()
+    url = shared.get(cache_key)
+    if url is None:
+        url = _build_url(key)
+        shared.set(cache_key, url, SHARED_CACHE_TIMEOUT)
+    return url
+
+
+_cached_url = lru_cache(
+    maxsize=getattr(settings, 'CLOUDINARY_URL_CACHE_SIZE', 4096)
+)(_shared_url)
+
+
+def resource_url(resource, **options):
+    """Memoized ``resource.build_url(**options)``.
+
+    Accepts any CloudinaryField value; empty values give ``''`` and
+    anything that is not a CloudinaryResource falls back to its ``url``.
+    """
+    if not resource:
+        return ''
+    if not isinstance(resource, CloudinaryResource):
+        return getattr(resource, 'url', None) or str(resource)
+    options = {**resource.url_options, **options}
+    key = (
+        resource.public_id,
+        resource.version,
+        resource.format,
+        resource.type,
+        resource.resource_type or 'image',
+        tuple(sorted(options.items())),
+    )
+    try:
+        return _cached_url(key)
+    except TypeError:
+        # Unhashable options (e.g. a transformation list): build directly
+        return resource.build_url(**options)
+
+
+def is_image(resource):
+    return (
+        isinstance(resource, CloudinaryResource)
+        and bool(resource.public_id)
+        and (resource.resource_type or 'image') == 'image'
+    )
+
+
+def image_url(resource, width=None):
+    """Delivery URL for ``resource``, optimised and capped at ``width``."""
+    if not is_image(resource):
+        return resource_url(resource)
+    options = {'fetch_format': 'auto', 'quality': 'auto'}
+    if width:
+        options.update(width=int(width), crop='limit')
+    return resource_url(resource, **options)
+
+
+def image_srcset(resource, widths=DEFAULT_WIDTHS):
+    """``srcset`` value listing ``resource`` at each of ``widths``."""
+    if not is_image(resource):
+        return ''
+    return ', '.join(f'{image_url(resource, w)} {w}w' for w in widths)
@@ -0,0 +1,493 @@
+"""Bulk catalog import from CSV or JSON Lines.
+
+``import_catalog`` streams rows from a file (never holding more than one
+batch in memory) and upserts Collections, Art and ArtVariants batch by
+batch with a fixed number of queries per batch, whatever its size.
+
+Each row describes one artwork:
+
+- ``artist_email`` (required): an existing ArtistProfile;
+- ``collection`` (required): the collection name, created for that artist
+  when missing;
+- ``title`` (required): with the collection, identifies the artwork;
+- optional Art columns: ``medium``, ``year_created``, ``width_cm``,
+  ``height_cm``, ``depth_cm``, ``price``, ``currency``, ``is_featured``,
+  ``description``;
+- optional variant columns ``original_price``/``original_available``,
+  ``poster_price``/``poster_available`` and ``digital_price``/
+  ``digital_available``.
+
+A column that is present sets its field (an empty cell clears it); a
+column that is left out keeps the stored value, so a file of titles and
+poster prices only touches those. As in ArtForm, Art.is_available follows
+the variants and the storefront price projection is computed in memory
+and written with the Art row.
+
+Rows are validated with the model fields' own ``clean()`` before their
+batch is written. bulk_create/bulk_update send no signals: search vectors
+are refreshed per batch and the homepage and catalog page caches are
+dropped once the import commits.
+"""
+import csv
+import io
+import json
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from .models import STOREFRONT_FIELDS, Art, ArtVariant, Collection
+
+DEFAULT_BATCH_SIZE = 1000
+
+REQUIRED_COLUMNS = ('artist_email', 'collection', 'title')
+
+# Importable Art columns, cleaned with the model field of the same name
+ART_COLUMNS = (
+    'medium',
+    'year_created',
+    'width_cm',
+    'height_cm',
+    'depth_cm',
+    'price',
+    'currency',
+    'is_featured',
+    'description',
+)
+
+# Column prefix of each variant medium
+VARIANT_PREFIXES = {
+    'original': ArtVariant.ORIGINAL,
+    'poster': ArtVariant.POSTER,
+    'digital': ArtVariant.DIGITAL,
+}
+
+# Art columns compared to tell whether a stored artwork changed
+TRACKED_FIELDS = (*ART_COLUMNS, 'is_available', *STOREFRONT_FIELDS)
+
+# Rows per UPDATE statement of bulk_update()
+UPDATE_BATCH_SIZE = 100
+
+# Variant columns an import owns; stock and created_at are left alone
+VARIANT_UPDATE_FIELDS = ('is_available', 'price', 'currency', 'updated_at')
+
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y', 'on'}
+FALSE_VALUES = {'', '0', 'false', 'f', 'no', 'n', 'off'}
+
+
+class RowError(ValueError):
+    """A row that cannot be imported; ``line`` is its 1-based line."""
+
+    def __init__(self, line, message):
+        super().__init__(f'line {line}: {message}')
+        self.line = line
+
+
+class ImportStats:
+    """Running totals of an import."""
+
+    def __init__(self):
+        self.rows = 0
+        self.invalid = 0
+        self.collections_created = 0
+        self.art_created = 0
+        self.art_updated = 0
+        self.art_unchanged = 0
+        self.variants_written = 0
+        self.batches = 0
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+def read_rows(stream, fmt):
+    """Yield ``(line, dict)`` pairs from a CSV or JSON Lines text stream.
+
+    A JSON line that does not parse to an object is yielded as a RowError
+    in place of the dict, so it is reported like any other invalid row.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for line, text in enumerate(stream, start=1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError as exc:
+                row = RowError(line, f'invalid JSON ({exc})')
+            if not isinstance(row, (dict, RowError)):
+                row = RowError(line, 'expected a JSON object')
+            yield line, row
+    else:
+        raise ValueError(f'Unknown format {fmt!r}')
+
+
+def detect_format(path):
+    """'csv' or 'jsonl' from a file name (None when it does not say)."""
+    lowered = path.lower()
+    if lowered.endswith('.csv'):
+        return 'csv'
+    if lowered.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return None
+
+
+def _text(value):
+    return '' if value is None else str(value).strip()
+
+
+def _boolean(line, column, value):
+    if isinstance(value, bool):
+        return value
+    text = _text(value).lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise RowError(line, f'{column}: {value!r} is not a yes/no value')
+
+
+def _clean(line, model, column, value, name=None):
+    """Clean ``value`` with the model field's own validation."""
+    field = model._meta.get_field(name or column)
+    text = _text(value)
+    if text == '':
+        if field.null:
+            return None
+        if field.blank:
+            return ''
+    try:
+        return field.clean(text, None)
+    except ValidationError as exc:
+        raise RowError(line, f'{column}: {" ".join(exc.messages)}')
+
+
+def clean_row(line, row):
+    """Validate one input row without touching the database.
+
+    Returns a dict with the artwork key, the Art values of the columns
+    present and ``variants``: ``{medium: {"price"?, "is_available"?}}``.
+    """
+    row = {key.strip(): value for key, value in row.items() if key}
+    for column in REQUIRED_COLUMNS:
+        if not _text(row.get(column)):
+            raise RowError(line, f'{column} is required')
+
+    cleaned = {
+        'line': line,
+        'artist_email': _text(row['artist_email']),
+        'collection': _clean(line, Collection, 'collection', row['collection'],
+                             name='name'),
+        'title': _clean(line, Art, 'title', row['title']),
+        'values': {},
+        'variants': {},
+    }
+    for column in ART_COLUMNS:
+        if column not in row:
+            continue
+        if column == 'is_featured':
+            value = _boolean(line, column, row[column])
+        else:
+            value = _clean(line, Art, column, row[column])
+        cleaned['values'][column] = value
+
+    for prefix, medium in VARIANT_PREFIXES.items():
+        variant = {}
+        price_column = f'{prefix}_price'
+        available_column = f'{prefix}_available'
+        if price_column in row:
+            variant['price'] = _clean(
+                line, ArtVariant, price_column, row[price_column],
+                name='price',
+            )
+        if available_column in row:
+            variant['is_available'] = _boolean(
+                line, available_column, row[available_column]
+            )
+        if variant:
+            cleaned['variants'][medium] = variant
+    return cleaned
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class CatalogImporter:
+    """Validate and write rows batch by batch; see the module docstring.
+
+    ``skip_invalid`` drops bad rows and imports the rest; otherwise the
+    first bad row stops all writing and the remaining rows are only
+    validated, so the caller can report every error and roll back.
+    ``dry_run`` validates everything and writes nothing.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, skip_invalid=False,
+                 dry_run=False):
+        self.batch_size = batch_size
+        self.skip_invalid = skip_invalid
+        self.dry_run = dry_run
+        self.stats = ImportStats()
+        self.errors = []
+        # Lookups that stay valid for the whole import
+        self._artists = {}
+        self._collections = {}
+
+    @property
+    def writing(self):
+        return not self.dry_run and (self.skip_invalid or not self.errors)
+
+    def run(self, rows, on_batch=None):
+        """Import ``(line, dict)`` rows; returns the ImportStats."""
+        for raw in _batched(rows, self.batch_size):
+            batch = self._validate(raw)
+            if self.writing and batch:
+                self._write(batch)
+            self.stats.batches += 1
+            if on_batch is not None:
+                on_batch(self.stats)
+        if self.writing:
+            transaction.on_commit(_forget_caches)
+        return self.stats
+
+    def _reject(self, error):
+        self.stats.invalid += 1
+        self.errors.append(error)
+
+    def _validate(self, raw):
+        batch = []
+        for line, row in raw:
+            self.stats.rows += 1
+            try:
+                if isinstance(row, RowError):
+                    raise row
+                batch.append(clean_row(line, row))
+            except RowError as exc:
+                self._reject(exc)
+        self._resolve_artists(batch)
+        valid = []
+        for row in batch:
+            artist_id = self._artists.get(row['artist_email'])
+            if artist_id is None:
+                self._reject(RowError(
+                    row['line'], f'unknown artist {row["artist_email"]}'
+                ))
+                continue
+            row['artist_id'] = artist_id
+            valid.append(row)
+        return valid
+
+    def _resolve_artists(self, batch):
+        from owner_app.models import ArtistProfile
+
+        missing = {
+            row['artist_email'] for row in batch
+        } - set(self._artists)
+        if not missing:
+            return
+        for pk, email in ArtistProfile.objects.filter(
+            email__in=missing
+        ).values_list('pk', 'email'):
+            self._artists[email] = pk
+
+    def _write(self, batch):
+        self._resolve_collections(batch)
+
+        # Last row wins when a batch repeats an artwork
+        by_key = {}
+        for row in batch:
+            key = (self._collections[(row['artist_id'], row['collection'])],
+                   row['title'])
+            by_key[key] = row
+
+        existing = self._existing_art(by_key)
+        current_variants = self._existing_variants(existing.values())
+        now = timezone.now()
+
+        new_art, changed_art, variant_rows = [], [], []
+        update_fields = {'updated_at'}
+        for key, row in by_key.items():
+            art = existing.get(key)
+            if art is None:
+                art = Art(
+                    collection_id=key[0], title=key[1], created_at=now
+                )
+            before = {field: getattr(art, field) for field in TRACKED_FIELDS}
+            for field, value in row['values'].items():
+                setattr(art, field, value)
+
+            variants = dict(current_variants.get(art.pk, {}))
+            for medium, values in row['variants'].items():
+                variant = self._variant_row(
+                    art, medium, values, variants.get(medium)
+                )
+                if variant is not None:
+                    variants[medium] = variant
+                    variant_rows.append(variant)
+            if row['variants']:
+                art.is_available = any(
+                    v.is_available for v in variants.values()
+                )
+            for field, value in Art.resolve_storefront_price(
+                list(variants.values())
+            ).items():
+                setattr(art, field, value)
+
+            art.updated_at = now
+            if art.pk is None:
+                new_art.append(art)
+                continue
+            changed = {
+                field for field, value in before.items()
+                if getattr(art, field) != value
+            }
+            if changed:
+                changed_art.append(art)
+                update_fields |= changed
+
+        Art.objects.bulk_create(new_art, batch_size=self.batch_size)
+        if changed_art:
+            # bulk_update writes one CASE WHEN per column whose cost grows
+            # with the number of rows, so keep each statement small
+            Art.objects.bulk_update(
+                changed_art, sorted(update_fields),
+                batch_size=min(self.batch_size, UPDATE_BATCH_SIZE),
+            )
+        for variant in variant_rows:
+            # Re-read the id now that new Art rows have one
+            variant.art_id = variant.art.pk
+        if variant_rows:
+            ArtVariant.objects.bulk_create(
+                variant_rows,
+                batch_size=self.batch_size,
+                update_conflicts=True,
+                unique_fields=['art', 'medium'],
+                update_fields=list(VARIANT_UPDATE_FIELDS),
+            )
+
+        from .search import refresh_search_vectors
+
+        if new_art or changed_art:
+            refresh_search_vectors(Art.objects.filter(
+                pk__in=[a.pk for a in new_art + changed_art]
+            ))
+        self.stats.art_created += len(new_art)
+        self.stats.art_updated += len(changed_art)
+        self.stats.art_unchanged += len(by_key) - len(new_art) - len(
+            changed_art
+        )
+        self.stats.variants_written += len(variant_rows)
+
+    def _resolve_collections(self, batch):
+        keys = {
+            (row['artist_id'], row['collection']) for row in batch
+        } - set(self._collections)
+        if not keys:
+            return
+        found = Collection.objects.filter(
+            artist_id__in={artist for artist, _ in keys},
+            name__in={name for _, name in keys},
+        ).order_by('pk').values_list('pk', 'artist_id', 'name')
+        for pk, artist_id, name in found:
+            # Several collections may share a name; the oldest one wins
+            self._collections.setdefault((artist_id, name), pk)
+
+        new = [
+            Collection(artist_id=artist_id, name=name)
+            for artist_id, name in sorted(keys - set(self._collections))
+        ]
+        for collection in Collection.objects.bulk_create(new):
+            self._collections[(collection.artist_id, collection.name)] = (
+                collection.pk
+            )
+        self.stats.collections_created += len(new)
+
+    def _existing_art(self, by_key):
+        """``{(collection_id, title): Art}`` for the keys already stored."""
+        existing = {}
+        queryset = Art.objects.filter(
+            collection_id__in={collection for collection, _ in by_key},
+            title__in={title for _, title in by_key},
+        ).only(
+            'id', 'collection_id', 'title', 'currency', 'is_available',
+            *ART_COLUMNS, *STOREFRONT_FIELDS,
+        ).order_by('pk')
+        for art in queryset:
+            key = (art.collection_id, art.title)
+            if key in by_key:
+                existing.setdefault(key, art)
+        return existing
+
+    def _existing_variants(self, arts):
+        grouped = {}
+        for variant in ArtVariant.objects.filter(
+            art_id__in=[art.pk for art in arts]
+        ):
+            grouped.setdefault(variant.art_id, {})[variant.medium] = variant
+        return grouped
+
+    def _variant_row(self, art, medium, values, current):
+        """The variant to upsert, ``values`` over the stored variant.
+
+        None when the stored variant already matches.
+        """
+        is_available = values.get(
+            'is_available', current.is_available if current else False
+        )
+        price = values.get('price', current.price if current else None)
+        currency = art.currency or 'USD'
+        if current is not None and (
+            current.is_available, current.price, current.currency
+        ) == (is_available, price, currency):
+            return None
+        return ArtVariant(
+            art=art,
+            medium=medium,
+            is_available=is_available,
+            price=price,
+            currency=currency,
+            # Only used when the row is inserted: a new original is a
+            # single unit, as in ArtVariant.save()
+            stock=1 if medium == ArtVariant.ORIGINAL else None,
+        )
+
+
+def import_catalog(stream, fmt, **options):
+    """Import a CSV/JSONL text stream; returns ``(stats, errors)``.
+
+    Runs in one transaction, rolled back on a dry run or when a row was
+    invalid and ``skip_invalid`` is off.
+    """
+    on_batch = options.pop('on_batch', None)
+    importer = CatalogImporter(**options)
+    with transaction.atomic():
+        importer.run(read_rows(stream, fmt), on_batch=on_batch)
+        if not importer.writing:
+            transaction.set_rollback(True)
+    return importer.stats, importer.errors
+
+
+def open_text(path):
+    """Open ``path`` for reading as UTF-8 text; '-' is standard input."""
+    if path == '-':
+        import sys
+
+        return io.TextIOWrapper(
+            sys.stdin.buffer, encoding='utf-8-sig', newline=''
+        )
+    return open(path, encoding='utf-8-sig', newline='')
+
+
+def _forget_caches():
+    from config.cache import bump_page_cache_version
+
+    from .homepage import invalidate_homepage_cache
+
+    invalidate_homepage_cache()
+    bump_page_cache_version('catalog')
@@ -0,0 +1,222 @@
+"""Stock reservations for stocked ArtVariants.
+
+Variants with a finite ``stock`` (original pieces are one-of-one) are
+protected in two steps:
+
+- **Basket holds.** Adding a stocked variant to a basket creates or resizes
+  a StockReservation for BASKET_HOLD_MINUTES. Units held by other baskets
+  are unavailable until the hold expires. The variant row is locked while
+  the hold is checked, so two shoppers cannot both hold the last unit.
+- **Checkout claims.** place_order locks the basket's stocked variants
+  with ``SELECT ... FOR UPDATE`` in primary key order, re-checks stock
+  against other baskets' live holds, decrements stock and drops the
+  basket's holds in the same transaction. A checkout for a variant another
+  checkout has locked waits for it to finish and then sees the stock it
+  left, so a shopper is only turned away when the unit is really gone.
+- **Restocks.** A Stripe order whose payment is cancelled or never made
+  gives its claimed units back (``restock``, called from
+  collections_app.payments when the order is cancelled).
+
+Only the variant rows involved are locked, so checkouts for unrelated
+artworks never wait on each other. Expired holds stop counting as soon as
+they lapse; the ``process_payments`` worker deletes them on every pass
+(``manage.py sweep_reservations`` does the same once, e.g. from cron).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Sum, When
+from django.utils import timezone
+
+from .models import Art, ArtVariant, StockReservation
+
+
+class OutOfStockError(Exception):
+    """Raised when a stocked variant cannot cover the requested quantity."""
+
+    def __init__(self, variant, available=0):
+        self.variant = variant
+        self.available = available
+        super().__init__(
+            f"Only {available} of variant {variant.pk} available"
+        )
+
+
+def hold_duration():
+    return timedelta(minutes=getattr(settings, 'BASKET_HOLD_MINUTES', 15))
+
+
+def _held_elsewhere(variant_ids, basket, now):
+    """Units of each variant held by live reservations of other baskets."""
+    rows = (
+        StockReservation.objects
+        .filter(variant_id__in=variant_ids, expires_at__gt=now)
+        .exclude(basket=basket)
+        .order_by()
+        .values('variant_id')
+        .annotate(held=Sum('quantity'))
+    )
+    return {row['variant_id']: row['held'] for row in rows}
+
+
+def reserve(basket, variant, quantity):
+    """Hold ``quantity`` units of ``variant`` for ``basket``.
+
+    ``quantity`` is the basket's total for the variant, not an increment.
+    Unlimited variants need no hold and always succeed.
+
+    Raises:
+        OutOfStockError: other baskets' holds leave too few units
+    """
+    if not variant.is_stocked:
+        return None
+    now = timezone.now()
+    with transaction.atomic():
+        locked = ArtVariant.objects.select_for_update().get(pk=variant.pk)
+        available = locked.stock - _held_elsewhere(
+            [locked.pk], basket, now
+        ).get(locked.pk, 0)
+        if quantity > available:
+            raise OutOfStockError(locked, max(available, 0))
+        reservation, _ = StockReservation.objects.update_or_create(
+            basket=basket,
+            variant=locked,
+            defaults={
+                'quantity': quantity,
+                'expires_at': now + hold_duration(),
+            },
+        )
+    return reservation
+
+
+def release(basket, variant):
+    """Drop ``basket``'s hold on ``variant``, if any."""
+    StockReservation.objects.filter(basket=basket, variant=variant).delete()
+
+
+def claim(basket, items):
+    """Claim stock for the basket items at checkout.
+
+    Must run inside the checkout transaction. ``items`` are the basket's
+    BasketItems with ``variant`` loaded. Decrements stock, marks sold-out
+    variants unavailable and removes the basket's holds.
+
+    Raises:
+        OutOfStockError: a variant is sold out (possibly by a concurrent
+            checkout this one waited for), held by other baskets, or gone
+    """
+    wanted = {}
+    for item in items:
+        if item.variant.is_stocked:
+            wanted[item.variant_id] = (
+                wanted.get(item.variant_id, 0) + item.quantity
+            )
+    if not wanted:
+        return
+
+    now = timezone.now()
+    # Lock in primary key order so concurrent claims cannot deadlock; a
+    # claim waits for a concurrent checkout of the same variant and then
+    # reads the stock it left
+    variants = {
+        v.pk: v
+        for v in ArtVariant.objects.select_for_update()
+        .filter(pk__in=wanted)
+        .order_by('pk')
+    }
+    held = _held_elsewhere(list(wanted), basket, now)
+    for variant_id, quantity in wanted.items():
+        variant = variants.get(variant_id)
+        if variant is None:
+            # Deleted since it was put in the basket
+            item_variant = next(
+                i.variant for i in items if i.variant_id == variant_id
+            )
+            raise OutOfStockError(item_variant, 0)
+        available = variant.stock - held.get(variant_id, 0)
+        if quantity > available:
+            raise OutOfStockError(variant, max(available, 0))
+
+    # One UPDATE for all claimed variants
+    ArtVariant.objects.filter(pk__in=wanted).update(
+        stock=Case(
+            *[
+                When(pk=variant_id, then=F('stock') - quantity)
+                for variant_id, quantity in wanted.items()
+            ],
+            default=F('stock'),
+            output_field=ArtVariant._meta.get_field('stock'),
+        )
+    )
+    sold_out = [
+        variant_id for variant_id, quantity in wanted.items()
+        if variants[variant_id].stock - quantity == 0
+    ]
+    if sold_out:
+        ArtVariant.objects.filter(pk__in=sold_out).update(is_available=False)
+        # update() sends no signals: refresh the storefront projection
+        # and let the caches know the catalog changed after commit
+        Art.refresh_storefront_prices(
+            {variants[pk].art_id for pk in sold_out}
+        )
+        transaction.on_commit(_catalog_changed)
+    basket.reservations.all().delete()
+
+
+def restock(order_items):
+    """Put the stock claimed by ``order_items`` back on sale.
+
+    Must run in the transaction that cancels their order, so the units are
+    returned exactly once. Stocked variants get the quantities added back
+    with F() increments; only variants that had sold out are made
+    available again, so one the owner took off sale stays off. Unlimited
+    and deleted variants are skipped.
+    """
+    returned = {}
+    for item in order_items:
+        if item.variant_id is not None:
+            returned[item.variant_id] = (
+                returned.get(item.variant_id, 0) + item.quantity
+            )
+    variants = ArtVariant.objects.filter(
+        pk__in=returned, stock__isnull=False
+    )
+    art_ids = set(variants.values_list('art_id', flat=True))
+    if not art_ids:
+        return
+    variants.update(
+        stock=Case(
+            *[
+                When(pk=variant_id, then=F('stock') + quantity)
+                for variant_id, quantity in returned.items()
+            ],
+            default=F('stock'),
+            output_field=ArtVariant._meta.get_field('stock'),
+        ),
+        # SET expressions read the row as it was before the UPDATE, so
+        # stock=0 means "sold out", not "just restocked"
+        is_available=Case(
+            When(stock=0, then=True),
+            default=F('is_available'),
+        ),
+    )
+    Art.refresh_storefront_prices(art_ids)
+    transaction.on_commit(_catalog_changed)
+
+
+def _catalog_changed():
+    from config.cache import bump_page_cache_version
+
+    from .homepage import invalidate_homepage_cache
+
+    invalidate_homepage_cache()
+    bump_page_cache_version('catalog')
+
+
+def sweep_expired(now=None):
+    """Delete lapsed holds; returns the number removed."""
+    deleted, _ = StockReservation.objects.filter(
+        expires_at__lte=now or timezone.now()
+    ).delete()
+    return deleted
@@ -0,0 +1,82 @@
+"""Column sets for the listing pages.
+
+Listing views load many Art rows but each template reads only a handful of
+columns. Fetching whole rows also transfers the unbounded ``description``,
+the ``search_vector`` document and Decimal columns the page never shows,
+then instantiates them for every row. Each tuple below names exactly the
+columns its template reads, and the view passes it to ``.only()``.
+
+Keep a tuple in step with its template: reading a column that is not listed
+still works, but costs one extra query per row (the tests for these views
+assert both the column set and the query count).
+"""
+
+# includes/artwork_cards.html and the featured carousel on artwork_list.
+# created_at is read by the keyset paginator to build the next cursor.
+ARTWORK_CARD_FIELDS = (
+    'id',
+    'title',
+    'image',
+    'price',
+    'currency',
+    'is_available',
+    'created_at',
+    'storefront_price',
+    'storefront_currency',
+    'storefront_medium',
+    'storefront_original_unavailable',
+)
+
+# Keyset order of the storefront listing (newest first). art_listing_idx
+# covers it, so every "Load more" page is an index range scan.
+ARTWORK_LIST_ORDERING = ('-created_at', 'id')
+
+# Vistor_pages/artworks_by_artist.html
+ARTIST_ARTWORK_FIELDS = (
+    'id',
+    'title',
+    'image',
+    'medium',
+    'year_created',
+    'width_cm',
+    'height_cm',
+    'depth_cm',
+    'price',
+    'currency',
+    'is_featured',
+)
+
+# Vistor_pages/artwork_price_search.html (artwork.artist goes through
+# the collection, so it is joined with select_related). The search only
+# returns priced art, so display_price_range never falls back to price.
+PRICE_SEARCH_FIELDS = (
+    'id',
+    'title',
+    'image',
+    'medium',
+    'width_cm',
+    'height_cm',
+    'depth_cm',
+    'currency',
+    'storefront_currency',
+    'min_available_price',
+    'max_available_price',
+    'collection__artist__name',
+)
+
+# owner_pages/art_list.html (collection is the prefetch join key)
+OWNER_ART_FIELDS = (
+    'id',
+    'collection',
+    'title',
+    'image',
+    'is_featured',
+)
+
+# owner_pages/assign_art.html
+ASSIGN_ART_FIELDS = (
+    'id',
+    'title',
+    'image',
+    'collection__name',
+)
@@ -0,0 +1,138 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from collections_app.benchmarks import benchmark_pages, compare, run_benchmarks
+from collections_app.seed import seed_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        'Request the storefront pages through the Django test client and '
+        'report p50/p95 latency, SQL queries and peak memory per page. '
+        'Writes a JSON report with --output and, with --baseline, exits '
+        'with status 1 when a page regressed against an earlier report.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='Timed requests per page (default 20)',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=3,
+            help='Untimed requests per page first (default 3)',
+        )
+        parser.add_argument(
+            '--page',
+            action='append',
+            dest='pages',
+            help='Only benchmark this page (repeatable); one of the names '
+                 'printed by --list',
+        )
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='List the page names and paths, then exit',
+        )
+        parser.add_argument(
+            '--warm-cache',
+            action='store_true',
+            help='Keep the page and homepage caches between requests '
+                 '(default: drop them so every request builds the page)',
+        )
+        parser.add_argument(
+            '--seed-arts',
+            type=int,
+            default=0,
+            help='Seed this many synthetic Art rows first, inside a '
+                 'transaction rolled back at the end (default 0: use the '
+                 'existing data)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed for the synthetic data (default 0)',
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the JSON report to this path',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON report of an earlier run to compare against',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.25,
+            help='Allowed growth of latency and memory over the baseline, '
+                 'as a fraction (default 0.25); query counts may not grow',
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as fh:
+                    baseline = json.load(fh)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f'Cannot read baseline: {exc}')
+
+        with transaction.atomic():
+            if options['seed_arts']:
+                counts = seed_catalog(
+                    arts=options['seed_arts'], seed=options['seed']
+                )
+                self.stdout.write(f'Seeded {counts}')
+
+            if options['list']:
+                for name, (path, user) in benchmark_pages().items():
+                    who = f' (as {user.username})' if user else ''
+                    self.stdout.write(f'{name}: {path}{who}')
+                transaction.set_rollback(True)
+                return
+
+            report = run_benchmarks(
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                only=options['pages'],
+                warm_cache=options['warm_cache'],
+            )
+            report['meta']['seed_arts'] = options['seed_arts']
+            report['meta']['seed'] = options['seed']
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f'{"page":<26} {"status":>6} {"p50 ms":>9} {"p95 ms":>9} '
+            f'{"queries":>8} {"peak KiB":>9}'
+        )
+        for name, result in report['results'].items():
+            self.stdout.write(
+                f'{name:<26} {result["status"]:>6} {result["p50_ms"]:>9} '
+                f'{result["p95_ms"]:>9} {result["queries"]:>8} '
+                f'{result["peak_kib"]:>9}'
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2, sort_keys=True)
+            self.stdout.write(
+                self.style.SUCCESS(f'Wrote report to {options["output"]}')
+            )
+
+        if baseline is not None:
+            problems = compare(report, baseline, options['tolerance'])
+            for problem in problems:
+                self.stderr.write(self.style.ERROR(problem))
+            if problems:
+                raise CommandError(
+                    f'{len(problems)} regressions against the baseline'
+                )
+            self.stdout.write(self.style.SUCCESS('No regressions'))
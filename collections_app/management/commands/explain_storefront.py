@@ -0,0 +1,208 @@
+import json
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from django.db.models import Q
+
+from collections_app.models import Art, ArtVariant, Media
+from collections_app.seed import seed_catalog
+
+# Indexes added for the storefront access paths (collections_app 0024 and
+# 0025, events_app 0004, owner_app 0008). The "before" plans run without them.
+STOREFRONT_INDEXES = (
+    ('collections_app', 'Art', 'art_listing_idx'),
+    ('collections_app', 'Art', 'art_featured_idx'),
+    ('collections_app', 'Art', 'art_price_range_idx'),
+    ('collections_app', 'ArtVariant', 'variant_available_idx'),
+    ('collections_app', 'Media', 'media_hero_idx'),
+    ('collections_app', 'Media', 'media_second_section_idx'),
+    ('collections_app', 'Media', 'media_third_section_idx'),
+    ('events_app', 'Exhibition', 'exhibition_upcoming_idx'),
+    ('events_app', 'Exhibition', 'exhibition_previous_idx'),
+    ('owner_app', 'Messages', 'messages_inbox_idx'),
+)
+
+# Indexes those migrations replaced; restored for the "before" plans
+REPLACED_INDEXES = (
+    ('owner_app', 'Messages', models.Index(
+        fields=['owner', 'unread'], name='messages_owner_unread_idx'
+    )),
+)
+
+
+def storefront_queries(owner_id):
+    """The hot storefront queries, as the views build them."""
+    from django.conf import settings
+    from events_app.models import Exhibition
+    from owner_app.models import Messages
+
+    from collections_app.homepage import FEATURED_LIMIT
+    from collections_app.listings import (
+        ARTWORK_CARD_FIELDS, ARTWORK_LIST_ORDERING,
+    )
+    from collections_app.pagination import KeysetPaginator
+
+    def paginator(queryset):
+        return KeysetPaginator(
+            queryset, ARTWORK_LIST_ORDERING, settings.ARTWORK_LIST_PAGE_SIZE
+        )
+
+    cards = paginator(Art.storefront.available().only(*ARTWORK_CARD_FIELDS))
+    formats = paginator(
+        Art.storefront.available().only(*ARTWORK_CARD_FIELDS)
+        .with_format(ArtVariant.POSTER)
+    )
+    queries = {
+        # The keyset queries artwork_list runs: the first page and a
+        # "Load more" page after the first page's cursor
+        'artwork_list': cards.page_queryset(),
+        'artwork_list_next': cards.page_queryset(cards.get_page().next_cursor),
+        'artwork_list_format': formats.page_queryset(),
+        'featured': (
+            Art.storefront.featured().order_by('-created_at')[:FEATURED_LIMIT]
+        ),
+        'price_search': (
+            Art.storefront.available()
+            .in_price_range(100, 500)
+            .order_by('min_available_price', 'id')
+        ),
+        'homepage_media': Media.objects.filter(
+            Q(hero=True) | Q(second_section=True) | Q(third_section=True)
+        ),
+        'events_upcoming': (
+            Exhibition.objects.exclude(status='finished')
+            .order_by('start_date')
+        ),
+        'events_previous': (
+            Exhibition.objects.filter(status='finished')
+            .order_by('-end_date')
+        ),
+        'inbox': (
+            Messages.objects.filter(owner_id=owner_id)
+            .order_by('-unread', '-sent_at')[:200]
+        ),
+    }
+    return queries
+
+
+def _index(app_label, model_name, name):
+    model = apps.get_model(app_label, model_name)
+    for index in model._meta.indexes:
+        if index.name == name:
+            return model, index
+    raise CommandError(f'{model_name} has no index {name}')
+
+
+class Command(BaseCommand):
+    help = (
+        'Print EXPLAIN plans of the storefront queries with and without '
+        'the storefront indexes. Optionally seeds a synthetic catalog '
+        'first. Everything runs in one transaction that is rolled back, '
+        'so neither the seeded rows nor the dropped indexes persist '
+        '(use a Postgres database; on SQLite the plans are only indicative).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed-arts',
+            type=int,
+            default=0,
+            help='Seed this many synthetic Art rows first (default 0: '
+                 'explain against the existing data)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed for the synthetic data (default 0)',
+        )
+        parser.add_argument(
+            '--owner',
+            type=int,
+            help='User id whose inbox is explained (default: the seeded '
+                 'owner, else the first superuser)',
+        )
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help='Run EXPLAIN ANALYZE (Postgres only)',
+        )
+        parser.add_argument(
+            '--output',
+            help='Also write {"before": {...}, "after": {...}} plans as '
+                 'JSON to this path',
+        )
+
+    def handle(self, *args, **options):
+        if options['analyze'] and connection.vendor != 'postgresql':
+            raise CommandError('--analyze needs a Postgres database')
+
+        with transaction.atomic():
+            owner_id = options['owner']
+            if options['seed_arts']:
+                counts = seed_catalog(
+                    arts=options['seed_arts'], seed=options['seed']
+                )
+                owner_id = owner_id or counts['owner_id']
+                self.stdout.write(f'Seeded {counts}')
+            if owner_id is None:
+                from django.contrib.auth.models import User
+
+                owner = User.objects.filter(is_superuser=True).first()
+                owner_id = owner.pk if owner else 0
+
+            self._refresh_statistics()
+            after = self._explain(owner_id, options['analyze'])
+            self._drop_storefront_indexes()
+            self._refresh_statistics()
+            before = self._explain(owner_id, options['analyze'])
+            transaction.set_rollback(True)
+
+        for name in after:
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write('-- before')
+            self.stdout.write(before[name])
+            self.stdout.write('-- after')
+            self.stdout.write(after[name])
+            self.stdout.write('')
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(
+                    {
+                        'vendor': connection.vendor,
+                        'seed_arts': options['seed_arts'],
+                        'seed': options['seed'],
+                        'before': before,
+                        'after': after,
+                    },
+                    fh,
+                    indent=2,
+                )
+            self.stdout.write(
+                self.style.SUCCESS(f'Wrote plans to {options["output"]}')
+            )
+
+    def _explain(self, owner_id, analyze):
+        extra = {'analyze': True} if analyze else {}
+        return {
+            name: queryset.explain(**extra)
+            for name, queryset in storefront_queries(owner_id).items()
+        }
+
+    def _refresh_statistics(self):
+        # The planner only picks an index once it knows the table sizes
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def _drop_storefront_indexes(self):
+        # Plain statements rather than the schema editor's context manager,
+        # which SQLite refuses to enter inside a transaction
+        editor = connection.schema_editor()
+        for app_label, model_name, name in STOREFRONT_INDEXES:
+            model, index = _index(app_label, model_name, name)
+            editor.execute(index.remove_sql(model, editor))
+        for app_label, model_name, index in REPLACED_INDEXES:
+            model = apps.get_model(app_label, model_name)
+            editor.execute(index.create_sql(model, editor))
@@ -0,0 +1,109 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from collections_app.importer import (
+    DEFAULT_BATCH_SIZE,
+    detect_format,
+    import_catalog,
+    open_text,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Import artworks from a CSV or JSON Lines file ("-" reads standard '
+        'input). Creates missing collections and upserts Art and their '
+        'original/poster/digital variants in batches. Artworks are matched '
+        'on collection and title; artists must already exist and are '
+        'matched on artist_email. See collections_app/importer.py for the '
+        'columns. Nothing is written when a row is invalid, unless '
+        '--skip-invalid is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSONL file, or "-"')
+        parser.add_argument(
+            '--format',
+            choices=('csv', 'jsonl'),
+            help='Input format (default: from the file extension)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Rows written per batch (default {DEFAULT_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--skip-invalid',
+            action='store_true',
+            help='Report invalid rows and import the others',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate every row without writing anything',
+        )
+        parser.add_argument(
+            '--max-errors',
+            type=int,
+            default=20,
+            help='Invalid rows to print (default 20)',
+        )
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or detect_format(options['path'])
+        if fmt is None:
+            raise CommandError('Cannot tell the format; pass --format')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        def progress(stats):
+            if options['verbosity'] > 1:
+                self.stdout.write(
+                    f'batch {stats.batches}: {stats.rows} rows read'
+                )
+
+        start = time.perf_counter()
+        try:
+            with open_text(options['path']) as stream:
+                stats, errors = import_catalog(
+                    stream,
+                    fmt,
+                    batch_size=options['batch_size'],
+                    skip_invalid=options['skip_invalid'],
+                    dry_run=options['dry_run'],
+                    on_batch=progress,
+                )
+        except OSError as exc:
+            raise CommandError(f'Cannot read {options["path"]}: {exc}')
+        except csv.Error as exc:
+            raise CommandError(f'Malformed CSV: {exc}')
+        elapsed = time.perf_counter() - start
+
+        for error in errors[:options['max_errors']]:
+            self.stderr.write(str(error))
+        if len(errors) > options['max_errors']:
+            self.stderr.write(
+                f'... and {len(errors) - options["max_errors"]} more'
+            )
+
+        rate = stats.rows / elapsed if elapsed else 0
+        self.stdout.write(
+            f'{stats.rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/s), '
+            f'{stats.batches} batches, {stats.invalid} invalid'
+        )
+        if errors and not options['skip_invalid']:
+            raise CommandError(
+                f'{len(errors)} invalid rows; nothing was imported'
+            )
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS('Dry run: nothing was written'))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {stats.collections_created} collections and '
+            f'{stats.art_created} artworks, updated {stats.art_updated} '
+            f'artworks ({stats.art_unchanged} unchanged), wrote '
+            f'{stats.variants_written} variants'
+        ))
@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from collections_app.inventory import sweep_expired
+from collections_app.payments import (
+    create_pending_payment_intents,
+    expire_stale_orders,
+    process_pending_events,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Payment worker: create Stripe PaymentIntents for pending orders, '
+        'apply received webhook events, expire orders left unpaid and '
+        'delete lapsed basket holds. Runs until interrupted unless --once '
+        'is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run a single pass and exit (e.g. from cron)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Seconds to sleep when a pass found no work (default 2)',
+        )
+        parser.add_argument(
+            '--batch',
+            type=int,
+            default=100,
+            help='Maximum orders and events handled per pass (default 100)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            intents = create_pending_payment_intents(limit=options['batch'])
+            events = process_pending_events(limit=options['batch'])
+            expired = expire_stale_orders(limit=options['batch'])
+            swept = sweep_expired()
+            if intents or events or expired or swept:
+                self.stdout.write(
+                    f'Created {intents} payment intents, '
+                    f'processed {events} events, '
+                    f'expired {expired} unpaid orders, '
+                    f'removed {swept} expired reservations'
+                )
+            if options['once']:
+                return
+            if not (intents or events or expired or swept):
+                try:
+                    time.sleep(options['interval'])
+                except KeyboardInterrupt:
+                    return
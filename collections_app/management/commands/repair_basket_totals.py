@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from collections_app.models import Basket
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute Basket.item_count and Basket.total_amount from the '
+        'basket items wherever the stored totals have drifted'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted baskets without changing them',
+        )
+
+    def handle(self, *args, **options):
+        # A basket has drifted when either stored total differs from the
+        # SQL aggregate over its items
+        drifted = (
+            Basket.objects.with_computed_totals()
+            .exclude(
+                item_count=F('computed_count'),
+                total_amount=F('computed_total'),
+            )
+        )
+
+        rows = list(
+            drifted.values_list(
+                'pk', 'item_count', 'computed_count',
+                'total_amount', 'computed_total',
+            )
+        )
+        for pk, count, real_count, total, real_total in rows:
+            self.stdout.write(
+                f'Basket {pk}: item_count {count} -> {real_count}, '
+                f'total_amount {total} -> {real_total}'
+            )
+
+        if not rows:
+            self.stdout.write(self.style.SUCCESS('All basket totals match'))
+            return
+        if options['dry_run']:
+            self.stdout.write(
+                self.style.WARNING(f'{len(rows)} baskets have drifted')
+            )
+            return
+
+        fixed = Basket.objects.filter(
+            pk__in=[row[0] for row in rows]
+        ).refresh_totals()
+        self.stdout.write(
+            self.style.SUCCESS(f'Repaired totals on {fixed} baskets')
+        )
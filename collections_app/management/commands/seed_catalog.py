@@ -0,0 +1,82 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from collections_app.seed import AlreadySeeded, seed_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        'Load a deterministic synthetic catalog (artists, collections, art '
+        'and variants, media, exhibitions, shoppers with baskets, orders and '
+        'an owner inbox) for benchmarking, e.g. '
+        '"seed_catalog --arts 10000 --exhibitions 1000". The same --seed '
+        'always produces the same rows. Never run this against production.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--arts',
+            type=int,
+            default=1000,
+            help='Number of Art rows; each gets three variants (default 1000)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed; one dataset can be loaded per seed (default 0)',
+        )
+        parser.add_argument(
+            '--arts-per-collection',
+            type=int,
+            default=20,
+            help='Art rows per collection (default 20)',
+        )
+        parser.add_argument(
+            '--media',
+            type=int,
+            default=30,
+            help='Number of Media rows (default 30)',
+        )
+        parser.add_argument(
+            '--exhibitions',
+            type=int,
+            default=40,
+            help='Number of exhibitions, ten pieces each (default 40)',
+        )
+        parser.add_argument(
+            '--shoppers',
+            type=int,
+            help='Users with a filled basket (default arts / 50)',
+        )
+        parser.add_argument(
+            '--orders',
+            type=int,
+            help='Past orders across the shoppers (default arts / 10)',
+        )
+        parser.add_argument(
+            '--messages',
+            type=int,
+            default=500,
+            help='Messages in the seeded owner\'s inbox (default 500)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            counts = seed_catalog(
+                arts=options['arts'],
+                seed=options['seed'],
+                arts_per_collection=options['arts_per_collection'],
+                media=options['media'],
+                exhibitions=options['exhibitions'],
+                shoppers=options['shoppers'],
+                orders=options['orders'],
+                messages=options['messages'],
+            )
+        except AlreadySeeded as exc:
+            raise CommandError(f'{exc}; pick another --seed')
+
+        for name, count in counts.items():
+            self.stdout.write(f'{name}: {count}')
+        self.stdout.write(
+            self.style.SUCCESS(f'Seeded dataset {options["seed"]}')
+        )
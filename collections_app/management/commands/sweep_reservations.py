@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from collections_app.inventory import sweep_expired
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete basket stock holds whose BASKET_HOLD_MINUTES have lapsed. '
+        'The process_payments worker does this on every pass; run this '
+        'from cron only where that worker is not running.'
+    )
+
+    def handle(self, *args, **options):
+        removed = sweep_expired()
+        self.stdout.write(
+            self.style.SUCCESS(f'Removed {removed} expired reservations')
+        )
@@ -0,0 +1,78 @@
+# Generated by Django 4.2.24 on 2026-10-17 18:40
+
+from django.db import migrations, models
+
+
+PREFERRED_ORDER = ('original_piece', 'printed_poster', 'digital_copy')
+
+
+def backfill_storefront_price(apps, schema_editor):
+    Art = apps.get_model('collections_app', 'Art')
+    ArtVariant = apps.get_model('collections_app', 'ArtVariant')
+
+    grouped = {}
+    for v in ArtVariant.objects.all():
+        grouped.setdefault(v.art_id, {})[v.medium] = v
+
+    rows = []
+    for art in Art.objects.only('pk'):
+        variants_map = grouped.get(art.pk, {})
+        art.storefront_price = None
+        art.storefront_currency = ''
+        art.storefront_medium = ''
+        for medium in PREFERRED_ORDER:
+            v = variants_map.get(medium)
+            if v and v.is_available and v.price is not None:
+                art.storefront_price = v.price
+                art.storefront_currency = v.currency or ''
+                art.storefront_medium = v.medium
+                break
+        orig = variants_map.get('original_piece')
+        art.storefront_original_unavailable = (
+            (orig is None) or (not orig.is_available)
+        )
+        rows.append(art)
+
+    Art.objects.bulk_update(
+        rows,
+        [
+            'storefront_price',
+            'storefront_currency',
+            'storefront_medium',
+            'storefront_original_unavailable',
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collections_app', '0018_alter_media_options_remove_media_unique_hero_true_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='art',
+            name='storefront_currency',
+            field=models.CharField(blank=True, editable=False, max_length=3),
+        ),
+        migrations.AddField(
+            model_name='art',
+            name='storefront_medium',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='art',
+            name='storefront_original_unavailable',
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='art',
+            name='storefront_price',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=10, null=True),
+        ),
+        migrations.RunPython(
+            backfill_storefront_price, migrations.RunPython.noop
+        ),
+    ]
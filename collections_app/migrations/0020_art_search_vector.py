@@ -0,0 +1,68 @@
+# Generated by Django 4.2.24 on 2026-10-17 18:44
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+# GIN indexes are created here rather than in Art.Meta.indexes because
+# GinIndex cannot be created on the non-Postgres databases used locally.
+CREATE_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS collections_art_search_vector_gin '
+    'ON collections_app_art USING gin (search_vector)',
+    'CREATE INDEX IF NOT EXISTS collections_art_title_trgm '
+    'ON collections_app_art USING gin (title gin_trgm_ops)',
+]
+DROP_INDEXES = [
+    'DROP INDEX IF EXISTS collections_art_search_vector_gin',
+    'DROP INDEX IF EXISTS collections_art_title_trgm',
+]
+
+# Same document as collections_app.search.art_search_vector(). The
+# collection and artist are LEFT JOINed, as the ORM expression does, so
+# every Art gets a vector even if its artist row is missing.
+BACKFILL_SQL = """
+UPDATE collections_app_art AS a SET search_vector =
+    setweight(to_tsvector('english', coalesce(a.title, '')), 'A')
+    || setweight(to_tsvector('english', coalesce(p.name, '')), 'A')
+    || setweight(to_tsvector('english', coalesce(c.name, '')), 'B')
+    || setweight(to_tsvector('english', coalesce(a.medium, '')), 'B')
+    || setweight(to_tsvector('english', coalesce(a.description, '')), 'C')
+FROM collections_app_art AS src
+LEFT JOIN collections_app_collection AS c ON c.id = src.collection_id
+LEFT JOIN owner_app_artistprofile AS p ON p.id = c.artist_id
+WHERE src.id = a.id
+"""
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in CREATE_INDEXES:
+        schema_editor.execute(statement)
+    schema_editor.execute(BACKFILL_SQL)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in DROP_INDEXES:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collections_app', '0019_art_storefront_price'),
+    ]
+
+    operations = [
+        # No-op on non-Postgres databases
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='art',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.24 on 2026-10-17 18:50
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef
+from django.db.models import Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_basket_totals(apps, schema_editor):
+    Basket = apps.get_model('collections_app', 'Basket')
+    BasketItem = apps.get_model('collections_app', 'BasketItem')
+
+    def item_totals(expression):
+        return (
+            BasketItem.objects.filter(basket=OuterRef('pk'))
+            .order_by()
+            .values('basket')
+            .annotate(total=Sum(expression))
+            .values('total')
+        )
+
+    amount = ExpressionWrapper(
+        F('price_at_addition') * F('quantity'),
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+    Basket.objects.update(
+        item_count=Coalesce(Subquery(item_totals('quantity')), 0),
+        total_amount=Coalesce(
+            Subquery(item_totals(amount)),
+            Value(Decimal('0.00')),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collections_app', '0020_art_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='basket',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Total quantity of all items in the basket'),
+        ),
+        migrations.AddField(
+            model_name='basket',
+            name='total_amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, help_text='Sum of price_at_addition × quantity over all items', max_digits=12),
+        ),
+        migrations.RunPython(backfill_basket_totals, migrations.RunPython.noop),
+    ]
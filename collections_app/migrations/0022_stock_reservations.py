@@ -0,0 +1,45 @@
+# Generated by Django 4.2.24 on 2026-10-17 18:54
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def stock_originals(apps, schema_editor):
+    # Originals are one-of-one; other formats stay unlimited (NULL)
+    ArtVariant = apps.get_model('collections_app', 'ArtVariant')
+    ArtVariant.objects.filter(
+        medium='original_piece', stock__isnull=True
+    ).update(stock=1)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collections_app', '0021_basket_totals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artvariant',
+            name='stock',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(default=1, help_text='Number of units held', validators=[django.core.validators.MinValueValidator(1)])),
+                ('expires_at', models.DateTimeField(help_text='When the hold lapses')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('basket', models.ForeignKey(help_text='The basket holding the units', on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='collections_app.basket')),
+                ('variant', models.ForeignKey(help_text='The reserved variant', on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='collections_app.artvariant')),
+            ],
+            options={
+                'verbose_name': 'Stock Reservation',
+                'verbose_name_plural': 'Stock Reservations',
+                'indexes': [models.Index(fields=['variant', 'expires_at'], name='reservation_variant_exp_idx'), models.Index(fields=['expires_at'], name='reservation_exp_idx')],
+                'unique_together': {('basket', 'variant')},
+            },
+        ),
+        migrations.RunPython(stock_originals, migrations.RunPython.noop),
+    ]
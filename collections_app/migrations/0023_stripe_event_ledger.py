@@ -0,0 +1,33 @@
+# Generated by Django 4.2.24 on 2026-10-17 18:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collections_app', '0022_stock_reservations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StripeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(help_text='Stripe event ID (evt_...)', max_length=255, unique=True)),
+                ('event_type', models.CharField(help_text='Stripe event type, e.g. payment_intent.succeeded', max_length=100)),
+                ('payload', models.JSONField(help_text='The verified event body')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processed', 'Processed'), ('failed', 'Failed')], default='pending', help_text='Processing state of the event', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0, help_text='Number of processing attempts')),
+                ('last_error', models.TextField(blank=True, help_text='Error raised by the last failed attempt')),
+                ('received_at', models.DateTimeField(auto_now_add=True, help_text='When the webhook delivered the event')),
+                ('processed_at', models.DateTimeField(blank=True, help_text='When the event was applied', null=True)),
+            ],
+            options={
+                'verbose_name': 'Stripe Event',
+                'verbose_name_plural': 'Stripe Events',
+                'ordering': ['received_at'],
+                'indexes': [models.Index(fields=['status', 'received_at'], name='stripe_event_queue_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.24 on 2026-10-17 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collections_app', '0023_stripe_event_ledger'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='art',
+            index=models.Index(fields=['-created_at', 'id'], name='art_listing_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='art',
+            index=models.Index(condition=models.Q(('is_featured', True)), fields=['-created_at'], name='art_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='art',
+            index=models.Index(fields=['price'], name='art_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='artvariant',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['art', 'medium'], name='variant_available_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='media',
+            index=models.Index(condition=models.Q(('hero', True)), fields=['-created_at'], name='media_hero_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='media',
+            index=models.Index(condition=models.Q(('second_section', True)), fields=['-created_at'], name='media_second_section_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='media',
+            index=models.Index(condition=models.Q(('third_section', True)), fields=['-created_at'], name='media_third_section_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.24 on 2026-10-17 19:12
+
+from django.db import migrations, models
+from django.db.models import Max, Min, OuterRef, Subquery
+
+
+def backfill_price_range(apps, schema_editor):
+    Art = apps.get_model('collections_app', 'Art')
+    ArtVariant = apps.get_model('collections_app', 'ArtVariant')
+
+    # One UPDATE with correlated aggregates instead of a loop over Art
+    priced = ArtVariant.objects.filter(
+        art=OuterRef('pk'), is_available=True, price__isnull=False
+    ).values('art')
+    Art.objects.update(
+        min_available_price=Subquery(
+            priced.annotate(low=Min('price')).values('low')
+        ),
+        max_available_price=Subquery(
+            priced.annotate(high=Max('price')).values('high')
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collections_app', '0024_storefront_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='art',
+            name='art_price_idx',
+        ),
+        migrations.AddField(
+            model_name='art',
+            name='max_available_price',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='art',
+            name='min_available_price',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=10, null=True),
+        ),
+        migrations.RunPython(
+            backfill_price_range, migrations.RunPython.noop
+        ),
+        # Built after the backfill so it is written once
+        migrations.AddIndex(
+            model_name='art',
+            index=models.Index(condition=models.Q(('min_available_price__isnull', False)), fields=['min_available_price', 'max_available_price'], name='art_price_range_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.24 on 2026-10-17 19:57
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce, Now
+import django.utils.timezone
+
+
+def backfill_created_at(apps, schema_editor):
+    Art = apps.get_model('collections_app', 'Art')
+
+    # Best guess for rows that predate the column: when they were last
+    # edited, else now
+    Art.objects.filter(created_at__isnull=True).update(
+        created_at=Coalesce('updated_at', Now())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collections_app', '0025_art_available_price_range'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_created_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='art',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.24 on 2026-10-17 20:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collections_app', '0026_art_created_at_required'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='stripe_client_secret',
+            field=models.CharField(blank=True, help_text='Client secret of the Stripe payment intent', max_length=255, null=True),
+        ),
+    ]
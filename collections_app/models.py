@@ -1,6 +1,13 @@
-from django.db import models
-from django.db.models import PROTECT
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import PROTECT, CharField, Exists, OuterRef, Q
+from django.db.models import DecimalField, ExpressionWrapper, F, Subquery
+from django.db.models import Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
 from cloudinary.models import CloudinaryField
 # contenttypes removed for simplified Media model
@@ -22,6 +29,70 @@ class Collection(models.Model):
         return f"{self.name} ({self.artist})"
 
 
+class StorefrontQuerySet(models.QuerySet):
+    """Art rows as the storefront sees them.
+
+    Availability is "the Art itself is flagged available, or at least one
+    of its ArtVariants is". Variant checks use correlated EXISTS subqueries
+    rather than a JOIN on variants, so results never contain duplicate Art
+    rows and need no DISTINCT.
+    """
+
+    def _available_variants(self, **filters):
+        return ArtVariant.objects.filter(
+            art=OuterRef('pk'), is_available=True, **filters
+        )
+
+    def available(self):
+        """Art that can be bought in at least one form."""
+        return self.filter(
+            Q(is_available=True) | Exists(self._available_variants())
+        )
+
+    def featured(self):
+        """Available Art flagged for the storefront carousel."""
+        return self.available().filter(is_featured=True)
+
+    def with_format(self, medium):
+        """Art with an available variant of the given ArtVariant.medium.
+
+        Also annotates that variant's price so Art.display_price shows the
+        selected format instead of the default storefront price.
+        """
+        variants = self._available_variants(medium=medium)
+        priced = variants.filter(price__isnull=False)
+        return self.filter(Exists(variants)).annotate(
+            format_price=Subquery(priced.values('price')[:1]),
+            format_currency=Subquery(priced.values('currency')[:1]),
+            format_medium=Value(medium, output_field=CharField()),
+        )
+
+    def priced(self):
+        """Art with at least one available, priced variant."""
+        return self.filter(min_available_price__isnull=False)
+
+    def in_price_range(self, min_price=None, max_price=None):
+        """Art with an available variant priced within [min_price, max_price].
+
+        One variant has to fit the range: a cheap poster and a dear
+        original do not match a range between their prices. The
+        min/max_available_price projection is tested first, so
+        art_price_range_idx rules out art that cannot match before the
+        EXISTS on ArtVariant runs. Either bound may be None.
+        """
+        queryset = self.priced()
+        if min_price is None and max_price is None:
+            return queryset
+        bounds = {}
+        if min_price is not None:
+            queryset = queryset.filter(max_available_price__gte=min_price)
+            bounds['price__gte'] = min_price
+        if max_price is not None:
+            queryset = queryset.filter(min_available_price__lte=max_price)
+            bounds['price__lte'] = max_price
+        return queryset.filter(Exists(self._available_variants(**bounds)))
+
+
 class Art(models.Model):
 
     collection = models.ForeignKey(
@@ -70,12 +141,79 @@ class Art(models.Model):
     # Generic description field (from Artwork.description)
     description = models.TextField(blank=True)
 
-    # Optional timestamps (nullable so existing rows are not affected)
-    created_at = models.DateTimeField(null=True, blank=True)
+    # created_at is required: the storefront listing orders and paginates
+    # on (created_at DESC, id), which art_listing_idx can only serve for a
+    # NOT NULL column (migration 0026 backfilled the old NULLs)
+    created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(null=True, blank=True)
 
+    # --- STOREFRONT PRICE PROJECTION (denormalized from ArtVariant) ---
+    # Resolved by refresh_storefront_price() whenever an ArtVariant is
+    # saved or deleted (see collections_app.signals), so listing pages read
+    # finished values and can sort/filter on them in SQL.
+    storefront_price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True,
+        editable=False,
+    )
+    storefront_currency = models.CharField(
+        max_length=3, blank=True, editable=False
+    )
+    # ArtVariant.medium of the variant that supplied storefront_price
+    storefront_medium = models.CharField(
+        max_length=32, blank=True, editable=False
+    )
+    storefront_original_unavailable = models.BooleanField(
+        default=True, editable=False
+    )
+    # Cheapest and dearest available, priced variant; NULL when nothing is
+    # for sale. Price search sorts on these and uses them to narrow the
+    # range test (Art.storefront.in_price_range).
+    min_available_price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True,
+        editable=False,
+    )
+    max_available_price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True,
+        editable=False,
+    )
+
+    # Full-text search document (title, medium, description, collection and
+    # artist name). Maintained by collections_app.search on Postgres, where
+    # migration 0020 adds its GIN index; always NULL on other databases.
+    search_vector = SearchVectorField(null=True, editable=False)
+
     # (artwork_link removed after migration consolidation)
 
+    objects = models.Manager()
+    # Art.storefront.available() / .featured() / .with_format(medium)
+    storefront = StorefrontQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Storefront listing and keyset pagination:
+            # ORDER BY created_at DESC, id
+            models.Index(
+                fields=['-created_at', 'id'], name='art_listing_idx'
+            ),
+            # Featured carousels (homepage, artwork_list): WHERE is_featured
+            # ORDER BY created_at DESC. Few rows are featured, so a partial
+            # index stays small.
+            models.Index(
+                fields=['-created_at'],
+                name='art_featured_idx',
+                condition=Q(is_featured=True),
+            ),
+            # Price range search: WHERE min_available_price <= ? AND
+            # max_available_price >= ? ORDER BY min_available_price,
+            # before the per-variant EXISTS. Unpriced art never matches,
+            # so it is left out.
+            models.Index(
+                fields=['min_available_price', 'max_available_price'],
+                name='art_price_range_idx',
+                condition=Q(min_available_price__isnull=False),
+            ),
+        ]
+
     def __str__(self):
         # Return a friendly string including artist for compatibility with
         # old Artwork
@@ -116,12 +254,138 @@ class Art(models.Model):
             return f"{self.currency} {self.price:,.2f}"
         return "Price not available"
 
+    # --- Storefront display helpers (read the denormalized projection) ---
+    # Listing views may annotate `format_price`, `format_currency` and
+    # `format_medium` when the visitor filters by a specific format; those
+    # take precedence over the stored projection.
+
+    @property
+    def display_price(self):
+        """Formatted storefront price, falling back to the Art price."""
+        price = getattr(self, 'format_price', None)
+        currency = getattr(self, 'format_currency', None)
+        if price is None:
+            price = self.storefront_price
+            currency = self.storefront_currency
+        if price is None:
+            return self.get_price_display()
+        return f"{currency} {price:,.2f}"
+
+    @property
+    def display_format_label(self):
+        """Human label of the variant format behind display_price."""
+        if getattr(self, 'format_price', None) is not None:
+            medium = self.format_medium
+        elif self.storefront_price is not None:
+            medium = self.storefront_medium
+        else:
+            return None
+        return ArtVariant.MEDIUM_LABELS.get(medium)
+
+    @property
+    def display_original_unavailable(self):
+        """Only flag a missing original when no format filter is active."""
+        if getattr(self, 'format_medium', None):
+            return False
+        return self.storefront_original_unavailable
+
+    @property
+    def display_price_range(self):
+        """Formatted available price, or range across variants."""
+        low, high = self.min_available_price, self.max_available_price
+        if low is None:
+            return self.get_price_display()
+        currency = self.storefront_currency or self.currency
+        if low == high:
+            return f"{currency} {low:,.2f}"
+        return f"{currency} {low:,.2f} – {high:,.2f}"
+
+    @staticmethod
+    def resolve_storefront_price(variants):
+        """Return the storefront projection values for ``variants``.
+
+        Picks the first available, priced variant in
+        ArtVariant.PREFERRED_ORDER (original, poster, digital), and the
+        lowest and highest price among all available, priced variants.
+        """
+        variants_map = {v.medium: v for v in variants}
+        values = {
+            'storefront_price': None,
+            'storefront_currency': '',
+            'storefront_medium': '',
+        }
+        for medium in ArtVariant.PREFERRED_ORDER:
+            v = variants_map.get(medium)
+            if v and v.is_available and v.price is not None:
+                values.update(
+                    storefront_price=v.price,
+                    storefront_currency=v.currency or '',
+                    storefront_medium=v.medium,
+                )
+                break
+        orig = variants_map.get(ArtVariant.ORIGINAL)
+        values['storefront_original_unavailable'] = (
+            (orig is None) or (not orig.is_available)
+        )
+        prices = [
+            v.price for v in variants
+            if v.is_available and v.price is not None
+        ]
+        values['min_available_price'] = min(prices, default=None)
+        values['max_available_price'] = max(prices, default=None)
+        return values
+
+    def refresh_storefront_price(self, variants=None):
+        """Recompute and persist the storefront projection for this Art.
+
+        Pass ``variants`` when they are already in memory to skip the
+        lookup. Uses a queryset update so no save signals fire.
+        """
+        if variants is None:
+            variants = ArtVariant.objects.filter(art_id=self.pk)
+        values = self.resolve_storefront_price(variants)
+        for field, value in values.items():
+            setattr(self, field, value)
+        Art.objects.filter(pk=self.pk).update(**values)
+        return values
+
+    @classmethod
+    def refresh_storefront_prices(cls, art_ids):
+        """Bulk variant of refresh_storefront_price() for many Art ids.
+
+        Loads all variants in one query and writes the projections with a
+        single bulk_update. Use after bulk writes that bypass signals.
+        """
+        art_ids = list(art_ids)
+        grouped = {pk: [] for pk in art_ids}
+        for v in ArtVariant.objects.filter(art_id__in=art_ids):
+            grouped[v.art_id].append(v)
+        rows = [
+            cls(pk=pk, **cls.resolve_storefront_price(variants))
+            for pk, variants in grouped.items()
+        ]
+        cls.objects.bulk_update(
+            rows, STOREFRONT_FIELDS, batch_size=500
+        )
+        return len(rows)
+
     def clean(self):
         # Phase B: validation is based on ArtVariant availability/pricing.
         # Keep a no-op here to preserve behavior for existing code paths.
         return
 
 
+# Columns written by Art.refresh_storefront_price()/refresh_storefront_prices()
+STOREFRONT_FIELDS = [
+    'storefront_price',
+    'storefront_currency',
+    'storefront_medium',
+    'storefront_original_unavailable',
+    'min_available_price',
+    'max_available_price',
+]
+
+
 class ArtVariant(models.Model):
     ORIGINAL = 'original_piece'
     POSTER = 'printed_poster'
@@ -131,6 +395,9 @@ class ArtVariant(models.Model):
         (POSTER, 'Printed poster'),
         (DIGITAL, 'Digital copy'),
     ]
+    MEDIUM_LABELS = dict(MEDIUM_CHOICES)
+    # Order in which storefront listings pick the price to display
+    PREFERRED_ORDER = (ORIGINAL, POSTER, DIGITAL)
 
     art = models.ForeignKey(
         Art, on_delete=models.CASCADE, related_name='variants'
@@ -141,11 +408,38 @@ class ArtVariant(models.Model):
         max_digits=10, decimal_places=2, null=True, blank=True
     )
     currency = models.CharField(max_length=3, default='USD', blank=True)
+    # Units left to sell; NULL means unlimited (posters, digital copies).
+    # Originals are one-of-one and start at 1. Basket holds and checkout
+    # claims go through collections_app.inventory.
+    stock = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ('art', 'medium')
+        indexes = [
+            # Art.storefront availability checks: EXISTS (... WHERE art_id
+            # = ? AND is_available [AND medium = ?]). Unavailable variants
+            # are never looked up, so they are left out of the index.
+            models.Index(
+                fields=['art', 'medium'],
+                name='variant_available_idx',
+                condition=Q(is_available=True),
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        # A new original piece is a single unit unless stated otherwise
+        if self._state.adding and self.stock is None and (
+            self.medium == self.ORIGINAL
+        ):
+            self.stock = 1
+        super().save(*args, **kwargs)
+
+    @property
+    def is_stocked(self):
+        """True when this variant has a finite stock to reserve against."""
+        return self.stock is not None
 
     def __str__(self):
         # Defensive: avoid dereferencing the related descriptor which will
@@ -220,6 +514,26 @@ class Media(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Media'
         verbose_name_plural = 'Media'
+        indexes = [
+            # Homepage placements: WHERE hero OR second_section OR
+            # third_section ORDER BY created_at DESC (and the exclusivity
+            # checks in save()). At most a few rows carry each flag.
+            models.Index(
+                fields=['-created_at'],
+                name='media_hero_idx',
+                condition=Q(hero=True),
+            ),
+            models.Index(
+                fields=['-created_at'],
+                name='media_second_section_idx',
+                condition=Q(second_section=True),
+            ),
+            models.Index(
+                fields=['-created_at'],
+                name='media_third_section_idx',
+                condition=Q(third_section=True),
+            ),
+        ]
 
     def __str__(self):
         # Defensive: avoid directly accessing self.art which would trigger a
@@ -259,6 +573,67 @@ class Media(models.Model):
 # BASKET MODELS - Shopping cart functionality for purchasing artworks
 # =============================================================================
 
+class BasketQuerySet(models.QuerySet):
+    """Maintenance of the denormalized Basket.item_count/total_amount."""
+
+    def _forget_cached_counts(self):
+        from .basket_count import forget_basket_counts
+
+        forget_basket_counts(list(self.values_list('user_id', flat=True)))
+
+    def adjust_totals(self, quantity, amount):
+        """Shift the stored totals by a delta in a single atomic UPDATE."""
+        self._forget_cached_counts()
+        return self.update(
+            item_count=F('item_count') + quantity,
+            total_amount=F('total_amount') + amount,
+            updated_at=timezone.now(),
+        )
+
+    def with_computed_totals(self):
+        """Annotate ``computed_count``/``computed_total`` from the items."""
+        return self.annotate(
+            computed_count=Coalesce(
+                Subquery(_item_totals('quantity')), 0
+            ),
+            computed_total=Coalesce(
+                Subquery(_item_totals(_LINE_AMOUNT)),
+                Value(Decimal('0.00')),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            ),
+        )
+
+    def refresh_totals(self):
+        """Recompute the stored totals from the items in one UPDATE."""
+        self._forget_cached_counts()
+        return self.update(
+            item_count=Coalesce(Subquery(_item_totals('quantity')), 0),
+            total_amount=Coalesce(
+                Subquery(_item_totals(_LINE_AMOUNT)),
+                Value(Decimal('0.00')),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            ),
+        )
+
+
+# price_at_addition × quantity for one BasketItem row
+_LINE_AMOUNT = ExpressionWrapper(
+    F('price_at_addition') * F('quantity'),
+    output_field=DecimalField(max_digits=12, decimal_places=2),
+)
+
+
+def _item_totals(expression):
+    """Correlated per-basket SUM over BasketItem, for use in a Subquery."""
+    return (
+        BasketItem.objects.filter(basket=OuterRef('pk'))
+        .order_by()
+        .values('basket')
+        .annotate(total=Sum(expression))
+        .values('total')
+    )
+
+
 class Basket(models.Model):
     """
     Shopping basket/cart model for storing user's selected artworks.
@@ -292,6 +667,24 @@ class Basket(models.Model):
         auto_now=True,
         help_text="When the basket was last modified"
     )
+
+    # Denormalized totals, kept current by BasketItem.save()/delete() and
+    # BasketItem queryset deletes via F-expression UPDATEs. Repair drift
+    # with `manage.py repair_basket_totals`.
+    item_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Total quantity of all items in the basket"
+    )
+    total_amount = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        editable=False,
+        help_text="Sum of price_at_addition × quantity over all items"
+    )
+
+    objects = BasketQuerySet.as_manager()
     
     class Meta:
         verbose_name = 'Basket'
@@ -304,22 +697,48 @@ class Basket(models.Model):
     
     def get_total_price(self):
         """
-        Calculate the total price of all items in the basket.
+        Get the total price of all items in the basket.
+        Reads the denormalized total_amount column, so no items are loaded.
         
         Returns:
             Decimal: Total price of all basket items
         """
-        total = sum(item.get_subtotal() for item in self.items.all())
-        return total
+        return self.total_amount
     
     def get_item_count(self):
         """
         Get the total number of items (considering quantities) in the basket.
+        Reads the denormalized item_count column, so no items are loaded.
         
         Returns:
             int: Total quantity of all items
         """
-        return sum(item.quantity for item in self.items.all())
+        return self.item_count
+
+    def aggregate_totals(self):
+        """
+        Compute the basket totals from its items with a SQL aggregate.
+        Used to reconcile the denormalized columns.
+        
+        Returns:
+            dict: {'item_count': int, 'total_amount': Decimal}
+        """
+        totals = self.items.aggregate(
+            item_count=Sum('quantity'),
+            total_amount=Sum(_LINE_AMOUNT),
+        )
+        return {
+            'item_count': totals['item_count'] or 0,
+            'total_amount': totals['total_amount'] or Decimal('0.00'),
+        }
+
+    def refresh_totals(self):
+        """
+        Recompute and store the denormalized totals from the items,
+        then reload them onto this instance.
+        """
+        Basket.objects.filter(pk=self.pk).refresh_totals()
+        self.refresh_from_db(fields=['item_count', 'total_amount'])
     
     def get_unique_item_count(self):
         """
@@ -334,8 +753,44 @@ class Basket(models.Model):
         """
         Remove all items from the basket.
         Used after successful purchase or when user wants to clear basket.
+        Issues one DELETE for the items and one UPDATE zeroing the totals.
+        """
+        from .basket_count import forget_basket_counts
+
+        with transaction.atomic():
+            self.items.all().delete(refresh_totals=False)
+            # Release any stock held for the items
+            self.reservations.all().delete()
+            Basket.objects.filter(pk=self.pk).update(
+                item_count=0,
+                total_amount=Decimal('0.00'),
+                updated_at=timezone.now(),
+            )
+        forget_basket_counts([self.user_id])
+        self.item_count = 0
+        self.total_amount = Decimal('0.00')
+
+
+class BasketItemQuerySet(models.QuerySet):
+
+    def delete(self, refresh_totals=True):
+        """Delete the items and recompute the affected basket totals.
+
+        Bulk deletes bypass BasketItem.delete(), so the totals of every
+        touched basket are recomputed with one UPDATE instead. Callers that
+        set the totals themselves (Basket.clear) pass refresh_totals=False.
         """
-        self.items.all().delete()
+        if not refresh_totals:
+            return super().delete()
+        with transaction.atomic(using=self.db):
+            basket_ids = set(self.values_list('basket_id', flat=True))
+            result = super().delete()
+            if basket_ids:
+                Basket.objects.filter(pk__in=basket_ids).refresh_totals()
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
 
 
 class BasketItem(models.Model):
@@ -399,6 +854,8 @@ class BasketItem(models.Model):
         help_text="When this item was added to the basket"
     )
     
+    objects = BasketItemQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Basket Item'
         verbose_name_plural = 'Basket Items'
@@ -442,7 +899,60 @@ class BasketItem(models.Model):
                 # Fallback to Art.price if variant price missing
                 self.price_at_addition = getattr(self.art, 'price', None) or 0
 
-        super().save(*args, **kwargs)
+        # Keep Basket.item_count/total_amount in step within the same
+        # transaction: apply the delta against the stored row when the
+        # previous state is known, otherwise recompute from the items.
+        loaded = getattr(self, '_loaded_totals', None)
+        adding = self._state.adding
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            baskets = Basket.objects.filter(pk=self.basket_id)
+            if adding:
+                baskets.adjust_totals(self.quantity, self.get_subtotal())
+            elif loaded is None or loaded[0] != self.basket_id:
+                basket_ids = {self.basket_id}
+                if loaded is not None:
+                    basket_ids.add(loaded[0])
+                Basket.objects.filter(pk__in=basket_ids).refresh_totals()
+            else:
+                _, old_quantity, old_price = loaded
+                quantity_delta = self.quantity - old_quantity
+                amount_delta = (
+                    self.get_subtotal() - old_price * old_quantity
+                )
+                if quantity_delta or amount_delta:
+                    baskets.adjust_totals(quantity_delta, amount_delta)
+        self._loaded_totals = (
+            self.basket_id, self.quantity, self.price_at_addition
+        )
+
+    def delete(self, *args, **kwargs):
+        """Delete the item and subtract it from the basket totals."""
+        loaded = getattr(self, '_loaded_totals', None)
+        basket_id = self.basket_id
+        with transaction.atomic(using=kwargs.get('using')):
+            result = super().delete(*args, **kwargs)
+            baskets = Basket.objects.filter(pk=basket_id)
+            if loaded is None:
+                baskets.refresh_totals()
+            else:
+                _, quantity, price = loaded
+                baskets.adjust_totals(-quantity, -(price * quantity))
+        return result
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored quantity and price so save()/delete() can
+        # apply exact deltas to the basket totals. Read __dict__ so
+        # deferred fields are not fetched here.
+        state = [
+            instance.__dict__.get(name)
+            for name in ('basket_id', 'quantity', 'price_at_addition')
+        ]
+        if None not in state:
+            instance._loaded_totals = tuple(state)
+        return instance
 
     @property
     def display_artwork(self):
@@ -450,6 +960,59 @@ class BasketItem(models.Model):
         return getattr(self, 'art', None)
 
 
+class StockReservation(models.Model):
+    """
+    Time-limited hold on stocked ArtVariant units for a basket.
+    Created when a stocked variant is added to a basket, claimed at
+    checkout and removed by the `sweep_reservations` command once expired.
+    
+    Features:
+    - One hold per basket and variant, sized to the basket quantity
+    - Expired holds stop counting against stock immediately
+    """
+
+    variant = models.ForeignKey(
+        ArtVariant,
+        on_delete=models.CASCADE,
+        related_name='reservations',
+        help_text="The reserved variant"
+    )
+    basket = models.ForeignKey(
+        Basket,
+        on_delete=models.CASCADE,
+        related_name='reservations',
+        help_text="The basket holding the units"
+    )
+    quantity = models.PositiveIntegerField(
+        default=1,
+        validators=[MinValueValidator(1)],
+        help_text="Number of units held"
+    )
+    expires_at = models.DateTimeField(
+        help_text="When the hold lapses"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Stock Reservation'
+        verbose_name_plural = 'Stock Reservations'
+        unique_together = ['basket', 'variant']
+        indexes = [
+            # Active holds per variant, and the sweeper's expiry scan
+            models.Index(
+                fields=['variant', 'expires_at'],
+                name='reservation_variant_exp_idx',
+            ),
+            models.Index(fields=['expires_at'], name='reservation_exp_idx'),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.quantity}x variant {self.variant_id} held for basket "
+            f"{self.basket_id} until {self.expires_at:%Y-%m-%d %H:%M}"
+        )
+
+
 # ============================================================================
 # ORDER MODELS - Track completed purchases
 # ============================================================================
@@ -521,6 +1084,15 @@ class Order(models.Model):
         null=True,
         help_text="Stripe payment intent ID"
     )
+
+    # Stored with the intent so the payment page's status polls never
+    # have to call the Stripe API
+    stripe_client_secret = models.CharField(
+        max_length=255,
+        blank=True,
+        null=True,
+        help_text="Client secret of the Stripe payment intent"
+    )
     
     # Customer contact information
     email = models.EmailField(
@@ -687,3 +1259,87 @@ class OrderItem(models.Model):
             Decimal: Total price for this item
         """
         return self.price * self.quantity
+
+
+# ============================================================================
+# PAYMENT EVENTS - Ledger of received Stripe webhook events
+# ============================================================================
+
+class StripeEvent(models.Model):
+    """
+    A Stripe webhook event, stored on receipt and processed out of band.
+
+    Features:
+    - The unique event_id makes redelivered events a no-op
+    - The webhook only inserts the row, so Stripe gets a fast 200
+    - ``manage.py process_payments`` applies pending events to orders
+      (see collections_app.payments)
+    - Failed events are retried up to payments.MAX_EVENT_ATTEMPTS times
+    """
+
+    PENDING = 'pending'
+    PROCESSED = 'processed'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (PROCESSED, 'Processed'),
+        (FAILED, 'Failed'),
+    ]
+
+    event_id = models.CharField(
+        max_length=255,
+        unique=True,
+        help_text="Stripe event ID (evt_...)"
+    )
+
+    event_type = models.CharField(
+        max_length=100,
+        help_text="Stripe event type, e.g. payment_intent.succeeded"
+    )
+
+    payload = models.JSONField(
+        help_text="The verified event body"
+    )
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        help_text="Processing state of the event"
+    )
+
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Number of processing attempts"
+    )
+
+    last_error = models.TextField(
+        blank=True,
+        help_text="Error raised by the last failed attempt"
+    )
+
+    received_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="When the webhook delivered the event"
+    )
+
+    processed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the event was applied"
+    )
+
+    class Meta:
+        verbose_name = 'Stripe Event'
+        verbose_name_plural = 'Stripe Events'
+        ordering = ['received_at']
+        indexes = [
+            # The worker's queue scan: pending events, oldest first
+            models.Index(
+                fields=['status', 'received_at'],
+                name='stripe_event_queue_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} {self.event_id} ({self.status})"
@@ -0,0 +1,62 @@
+"""Order confirmation and owner notification emails.
+
+Both emails are rendered from templates when the order is confirmed and
+put in the database outbox (owner_app.outbox), so checkout never waits on
+SMTP; ``manage.py send_outbox`` (the Procfile ``worker`` process) delivers
+them in batches over one reused connection. Rendering uses the OrderItem snapshot rows, so the emails show
+what was bought even if the artwork changes later.
+
+Orders paid by Stripe are confirmed when the payment succeeds (see
+collections_app.payments); other orders when they are placed.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.template.loader import render_to_string
+
+from owner_app.outbox import enqueue
+
+# Shop name used in email subjects and sign-offs
+SITE_NAME = 'Const Collection'
+
+
+def owner_recipients():
+    """ORDER_NOTIFICATION_EMAILS, or the superusers' addresses."""
+    configured = getattr(settings, 'ORDER_NOTIFICATION_EMAILS', None)
+    if configured:
+        return list(configured)
+    return list(
+        get_user_model().objects.filter(is_superuser=True, is_active=True)
+        .exclude(email='')
+        .values_list('email', flat=True)
+    )
+
+
+def queue_order_emails(order, items=None):
+    """Render and queue the customer and owner emails for ``order``.
+
+    ``items`` are the order's OrderItem rows; they are loaded in one query
+    when not given. Call inside the transaction that confirms the order.
+    """
+    if items is None:
+        items = list(order.items.all())
+    context = {
+        'order': order,
+        'items': items,
+        'site_name': SITE_NAME,
+    }
+    if order.email:
+        enqueue(
+            f"Your order #{order.order_number}",
+            render_to_string('emails/order_confirmation.txt', context),
+            [order.email],
+            html_body=render_to_string(
+                'emails/order_confirmation.html', context
+            ),
+        )
+    owners = owner_recipients()
+    if owners:
+        enqueue(
+            f"New order #{order.order_number} from {order.full_name}",
+            render_to_string('emails/order_owner_notification.txt', context),
+            owners,
+        )
@@ -0,0 +1,142 @@
+"""Order placement.
+
+``place_order`` turns a user's basket into an Order in one transaction:
+
+1. lock the Basket row (SELECT ... FOR UPDATE) so a concurrent checkout or
+   basket edit for the same user waits instead of interleaving;
+2. load every BasketItem with its art, collection, artist and variant in
+   one query;
+   Stripe orders must be priced in STRIPE_CURRENCY, the currency the
+   PaymentIntent charges in;
+3. build the OrderItem snapshots in memory and insert them with a single
+   bulk_create;
+4. claim stock for stocked variants (see collections_app.inventory);
+5. empty the basket with one DELETE;
+6. queue the confirmation emails (collections_app.order_emails) unless
+   the order still awaits a Stripe payment.
+
+The number of queries does not depend on the basket size, and any failure
+(including an OutOfStockError from the stock claim) rolls the whole order
+back.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+
+from . import inventory
+from .models import Basket, Order, OrderItem
+from .order_emails import queue_order_emails
+
+
+class EmptyBasketError(Exception):
+    """Raised when an order is requested for an empty or missing basket."""
+
+
+class CurrencyMismatchError(Exception):
+    """Raised when a Stripe order has items priced in another currency."""
+
+    def __init__(self, currencies):
+        self.currencies = currencies
+        super().__init__(
+            f"Cannot charge {', '.join(sorted(currencies))} in "
+            f"{settings.STRIPE_CURRENCY.upper()}"
+        )
+
+
+def _foreign_currencies(items):
+    """Item currencies other than STRIPE_CURRENCY (blank means default)."""
+    charged = settings.STRIPE_CURRENCY.upper()
+    currencies = set()
+    for item in items:
+        priced = item.variant or item.display_artwork
+        currency = (getattr(priced, 'currency', '') or charged).upper()
+        if currency != charged:
+            currencies.add(currency)
+    return currencies
+
+
+def _order_item_from(order, basket_item):
+    """Build (without saving) the OrderItem snapshot of a BasketItem."""
+    art = basket_item.display_artwork
+    variant = basket_item.variant
+    artist = art.artist if art else None
+    return OrderItem(
+        order=order,
+        art=art,
+        artwork_title=art.title if art else 'Unknown artwork',
+        artwork_artist=artist.name if artist else '',
+        artwork_medium=(art.medium or '') if art else '',
+        quantity=basket_item.quantity,
+        price=basket_item.price_at_addition,
+        # snapshot selected variant info when available
+        variant_id=variant.pk if variant else None,
+        variant_medium=variant.get_medium_display() if variant else '',
+    )
+
+
+def place_order(user, billing, payment_method, stripe_payment_intent=None,
+                shipping_cost=Decimal('0')):
+    """Create an Order from ``user``'s basket and empty the basket.
+
+    Args:
+        user: the purchasing User
+        billing: dict of Order contact/address fields (email, full_name,
+            address_line1, address_line2, city, postal_code, country)
+        payment_method: stored on Order.payment_method
+        stripe_payment_intent: stored on Order.stripe_payment_intent
+        shipping_cost: added to the basket subtotal
+
+    Returns:
+        Order: the saved order, with its items
+
+    Raises:
+        EmptyBasketError: the user has no basket or it has no items
+        CurrencyMismatchError: a Stripe order has items priced in another
+            currency than STRIPE_CURRENCY
+        inventory.OutOfStockError: a stocked variant can no longer be sold
+    """
+    with transaction.atomic():
+        basket = (
+            Basket.objects.select_for_update()
+            .filter(user=user)
+            .first()
+        )
+        if basket is None:
+            raise EmptyBasketError('No basket to check out')
+
+        items = list(
+            basket.items.select_related(
+                'art__collection__artist', 'variant'
+            )
+        )
+        if not items:
+            raise EmptyBasketError('Basket is empty')
+        if payment_method == 'stripe':
+            foreign = _foreign_currencies(items)
+            if foreign:
+                raise CurrencyMismatchError(foreign)
+
+        # Decrement stock and drop the basket's holds; raises
+        # inventory.OutOfStockError when an original was sold meanwhile
+        inventory.claim(basket, items)
+
+        # Price from the locked items rather than the stored totals
+        subtotal = sum(
+            (item.get_subtotal() for item in items), Decimal('0')
+        )
+        order = Order.objects.create(
+            user=user,
+            total_amount=subtotal + shipping_cost,
+            payment_method=payment_method,
+            stripe_payment_intent=stripe_payment_intent,
+            **billing,
+        )
+        order_items = OrderItem.objects.bulk_create(
+            [_order_item_from(order, item) for item in items]
+        )
+        basket.clear()
+        # Stripe orders are confirmed by the payment webhook instead
+        if payment_method != 'stripe':
+            queue_order_emails(order, order_items)
+    return order
@@ -0,0 +1,175 @@
+"""Keyset (cursor) pagination for storefront listings.
+
+Unlike OFFSET pagination, each page is fetched with a WHERE clause that
+starts right after the last row of the previous page, so every page costs
+the same no matter how deep the visitor scrolls.
+
+Usage::
+
+    paginator = KeysetPaginator(queryset, ('-created_at', 'id'), 24)
+    page = paginator.get_page(request.GET.get('cursor'))
+    for art in page: ...
+    page.next_cursor  # opaque token for the following page, or None
+"""
+import base64
+import datetime
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    """JSON encoder that keeps full microsecond precision on datetimes.
+
+    DjangoJSONEncoder truncates to milliseconds, which would make rows that
+    share a timestamp prefix with the cursor row vanish between pages.
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token cannot be decoded."""
+
+
+class KeysetPage:
+    """A single page of results plus the cursor for the next one."""
+
+    def __init__(self, object_list, next_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __contains__(self, item):
+        return item in self.object_list
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+
+class KeysetPaginator:
+    """Paginate ``queryset`` by the given ordering keys.
+
+    ``ordering`` uses the usual ``'-field'`` notation and must end with a
+    unique key (normally ``'id'``) so the ordering is total. Nullable keys
+    and annotations sort last in either direction so cursors behave the
+    same on Postgres and SQLite. NOT NULL columns get a plain ORDER BY and
+    range test, so an index on the ordering keys can serve every page.
+    """
+
+    def __init__(self, queryset, ordering, page_size):
+        self.queryset = queryset
+        self.page_size = page_size
+        self.keys = [
+            (name.lstrip('-'), name.startswith('-')) for name in ordering
+        ]
+
+    def _ordered(self):
+        order_by = []
+        for name, desc in self.keys:
+            # NULLS LAST only where NULLs can occur: a plain DESC index
+            # sorts NULLs first on Postgres and cannot serve it
+            nulls_last = True if self._nullable(name) else None
+            order_by.append(
+                F(name).desc(nulls_last=nulls_last) if desc
+                else F(name).asc(nulls_last=nulls_last)
+            )
+        return self.queryset.order_by(*order_by)
+
+    def _field(self, name):
+        try:
+            return self.queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Annotations (e.g. a search rank) are used as-is
+            return None
+
+    def _nullable(self, name):
+        field = self._field(name)
+        return field is None or field.null
+
+    def encode_cursor(self, obj):
+        values = [getattr(obj, name) for name, _ in self.keys]
+        raw = json.dumps(values, cls=_CursorEncoder)
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (ValueError, TypeError) as exc:
+            raise InvalidCursor(cursor) from exc
+        if not isinstance(values, list) or len(values) != len(self.keys):
+            raise InvalidCursor(cursor)
+        decoded = []
+        for (name, _), value in zip(self.keys, values):
+            field = self._field(name)
+            if field is not None and value is not None:
+                try:
+                    value = field.to_python(value)
+                except ValidationError as exc:
+                    raise InvalidCursor(cursor) from exc
+            decoded.append(value)
+        return decoded
+
+    def _after(self, values):
+        """Build the Q matching rows that sort strictly after ``values``."""
+        condition = None
+        equal = Q()
+        for (name, desc), value in zip(self.keys, values):
+            nullable = self._nullable(name)
+            if value is None:
+                if not nullable:
+                    # Forged cursor: a NOT NULL key cannot be NULL
+                    raise InvalidCursor(values)
+                # NULLs sort last: only other NULLs can follow at this level
+                equal &= Q(**{f'{name}__isnull': True})
+                continue
+            step = Q(**{f'{name}__{"lt" if desc else "gt"}': value})
+            if nullable:
+                step |= Q(**{f'{name}__isnull': True})
+            step = equal & step
+            condition = step if condition is None else condition | step
+            equal &= Q(**{name: value})
+        if condition is None:
+            return Q(pk__in=[])
+        name, desc = self.keys[0]
+        if values[0] is not None and not self._nullable(name):
+            # Implied by the OR chain, but as a plain range on the leading
+            # key it lets an index scan start at the cursor instead of
+            # filtering every row before it
+            condition &= Q(**{f'{name}__{"lte" if desc else "gte"}': values[0]})
+        return condition
+
+    def page_queryset(self, cursor=None):
+        """The query for the page after ``cursor``, plus one lookahead row.
+
+        This is what get_page() runs; ``manage.py explain_storefront``
+        explains it.
+        """
+        queryset = self._ordered()
+        if cursor:
+            queryset = queryset.filter(self._after(self.decode_cursor(cursor)))
+        return queryset[:self.page_size + 1]
+
+    def get_page(self, cursor=None):
+        """Return the page following ``cursor`` (or the first page)."""
+        rows = list(self.page_queryset(cursor))
+        next_cursor = None
+        if len(rows) > self.page_size:
+            rows = rows[:self.page_size]
+            next_cursor = self.encode_cursor(rows[-1])
+        return KeysetPage(rows, next_cursor)
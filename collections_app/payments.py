@@ -0,0 +1,337 @@
+"""Stripe payment pipeline.
+
+Checkout never talks to Stripe during the request:
+
+1. ``checkout`` places the Order as ``pending`` with no PaymentIntent and
+   sends the shopper to the payment page, which polls
+   ``order_payment_status`` until the intent exists.
+2. ``manage.py process_payments`` (the out-of-band worker) creates the
+   PaymentIntent for each pending order (``create_pending_payment_intents``).
+   The order number is the idempotency key, so a retried create never
+   charges twice. The intent's client secret is stored on the order, so
+   the payment page's polls never call Stripe.
+3. Stripe calls ``stripe_webhook``. The view verifies the signature, inserts
+   the event into the StripeEvent ledger (``INSERT ... ON CONFLICT DO
+   NOTHING`` on the event ID) and answers 200 at once.
+4. The worker applies pending ledger rows with ``process_pending_events``.
+   Rows are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED``, so several
+   workers can run side by side, and each handler only moves an order
+   forward from the state it expects, so a replayed event changes nothing.
+   A successful payment queues the order emails (collections_app.order_emails)
+   unless the amount or currency charged differs from the order's, which
+   leaves the order pending and logs an error.
+5. Checkout claims stock before payment, so a cancelled intent cancels the
+   order and restocks its items (collections_app.inventory.restock). Orders
+   still pending after STRIPE_PENDING_ORDER_MINUTES are expired the same
+   way by ``expire_stale_orders``, after their intent is cancelled.
+
+Set STRIPE_API_BASE to point the client at a local stub server such as
+stripe-mock (``http://localhost:12111``) in development and CI.
+"""
+import logging
+from datetime import timedelta
+from decimal import Decimal
+
+import stripe
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import inventory
+from .models import Order, OrderItem, StripeEvent
+from .order_emails import queue_order_emails
+
+logger = logging.getLogger(__name__)
+
+# A ledger row is marked failed after this many attempts
+MAX_EVENT_ATTEMPTS = 5
+
+# Stripe's own API host, used unless STRIPE_API_BASE points elsewhere
+_DEFAULT_API_BASE = stripe.api_base
+
+
+class PaymentsDisabled(Exception):
+    """Raised when Stripe is used while STRIPE_PAYMENTS_ENABLED is off."""
+
+
+def stripe_enabled():
+    return getattr(settings, 'STRIPE_PAYMENTS_ENABLED', False)
+
+
+def _client():
+    """Configure and return the ``stripe`` module for an API call."""
+    if not stripe_enabled():
+        raise PaymentsDisabled('STRIPE_PAYMENTS_ENABLED is off')
+    stripe.api_key = settings.STRIPE_SECRET_KEY
+    stripe.api_version = settings.STRIPE_API_VERSION
+    stripe.api_base = (
+        getattr(settings, 'STRIPE_API_BASE', None) or _DEFAULT_API_BASE
+    )
+    return stripe
+
+
+def pending_order_ttl():
+    return timedelta(
+        minutes=getattr(settings, 'STRIPE_PENDING_ORDER_MINUTES', 60)
+    )
+
+
+def amount_in_minor_units(amount):
+    """Convert a Decimal amount to the integer cents Stripe expects."""
+    return int((Decimal(amount) * 100).quantize(Decimal('1')))
+
+
+# ============================================================================
+# PAYMENT INTENTS
+# ============================================================================
+
+def create_payment_intent(order):
+    """Create the PaymentIntent for ``order`` and store its ID and secret.
+
+    Safe to retry: Stripe returns the original intent for a repeated
+    idempotency key, and the ID is only written while the column is empty.
+    """
+    intent = _client().PaymentIntent.create(
+        amount=amount_in_minor_units(order.total_amount),
+        currency=settings.STRIPE_CURRENCY,
+        receipt_email=order.email or None,
+        metadata={
+            'order_id': str(order.pk),
+            'order_number': order.order_number,
+        },
+        automatic_payment_methods={'enabled': True},
+        idempotency_key=f'payment-intent-{order.order_number}',
+    )
+    Order.objects.filter(
+        pk=order.pk, stripe_payment_intent__isnull=True
+    ).update(
+        stripe_payment_intent=intent.id,
+        stripe_client_secret=intent.client_secret,
+    )
+    order.stripe_payment_intent = intent.id
+    order.stripe_client_secret = intent.client_secret
+    return intent
+
+
+def create_pending_payment_intents(limit=50):
+    """Create intents for pending Stripe orders that lack one.
+
+    Returns the number created. Orders that fail are logged and picked up
+    again on the next run.
+    """
+    orders = Order.objects.filter(
+        payment_method='stripe',
+        status='pending',
+        stripe_payment_intent__isnull=True,
+    ).order_by('created_at')[:limit]
+    created = 0
+    for order in orders:
+        try:
+            create_payment_intent(order)
+        except stripe.StripeError:
+            logger.exception(
+                'Creating PaymentIntent for order %s failed',
+                order.order_number,
+            )
+        else:
+            created += 1
+    return created
+
+
+def expire_stale_orders(limit=50, now=None):
+    """Cancel Stripe orders left unpaid for too long and restock them.
+
+    The order's PaymentIntent is cancelled first so it can no longer be
+    paid; an intent Stripe refuses to cancel (already paid, say) leaves
+    the order to its webhook. Returns the number of orders expired.
+    """
+    cutoff = (now or timezone.now()) - pending_order_ttl()
+    orders = Order.objects.filter(
+        payment_method='stripe',
+        status='pending',
+        created_at__lt=cutoff,
+    ).order_by('created_at')[:limit]
+    expired = 0
+    for order in orders:
+        if order.stripe_payment_intent:
+            try:
+                _client().PaymentIntent.cancel(order.stripe_payment_intent)
+            except stripe.StripeError:
+                logger.exception(
+                    'Cancelling PaymentIntent for order %s failed',
+                    order.order_number,
+                )
+                continue
+        with transaction.atomic():
+            # Skip orders paid, cancelled or given an intent meanwhile
+            locked = list(
+                Order.objects.select_for_update().filter(
+                    pk=order.pk,
+                    status='pending',
+                    stripe_payment_intent=order.stripe_payment_intent,
+                )
+            )
+            _cancel_orders(locked)
+        expired += len(locked)
+    return expired
+
+
+def payment_intent_client_secret(order):
+    """Client secret the payment page needs to confirm the intent.
+
+    Read from the order; only intents created before the secret was
+    stored are fetched from Stripe, once, and the secret saved.
+    """
+    if not order.stripe_payment_intent or order.stripe_client_secret:
+        return order.stripe_client_secret
+    intent = _client().PaymentIntent.retrieve(order.stripe_payment_intent)
+    Order.objects.filter(
+        pk=order.pk, stripe_payment_intent=order.stripe_payment_intent
+    ).update(stripe_client_secret=intent.client_secret)
+    order.stripe_client_secret = intent.client_secret
+    return intent.client_secret
+
+
+# ============================================================================
+# WEBHOOK EVENTS
+# ============================================================================
+
+def verify_event(payload, signature):
+    """Return the event dict for a signed webhook body.
+
+    Raises:
+        ValueError: the body is not a valid event
+        stripe.SignatureVerificationError: the signature does not match
+    """
+    event = stripe.Webhook.construct_event(
+        payload, signature, settings.STRIPE_WEBHOOK_SECRET
+    )
+    return event.to_dict()
+
+
+def record_event(event):
+    """Add ``event`` to the ledger; a redelivered event is ignored."""
+    StripeEvent.objects.bulk_create(
+        [
+            StripeEvent(
+                event_id=event['id'],
+                event_type=event['type'],
+                payload=event,
+            )
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def _orders_for_intent(intent_id):
+    return Order.objects.filter(stripe_payment_intent=intent_id)
+
+
+def _charged_in_full(order, intent):
+    """Whether ``intent`` paid exactly the order's total and currency."""
+    return (
+        intent.get('amount') == amount_in_minor_units(order.total_amount)
+        and str(intent.get('currency', '')).lower()
+        == settings.STRIPE_CURRENCY.lower()
+    )
+
+
+def _payment_succeeded(intent):
+    orders = []
+    for order in (
+        _orders_for_intent(intent['id']).filter(status='pending')
+        .select_for_update()
+    ):
+        if _charged_in_full(order, intent):
+            orders.append(order)
+        else:
+            # Left pending for the owner to check by hand
+            logger.error(
+                'PaymentIntent %s charged %s %s, but order %s is %s %s',
+                intent['id'], intent.get('amount'), intent.get('currency'),
+                order.order_number,
+                amount_in_minor_units(order.total_amount),
+                settings.STRIPE_CURRENCY,
+            )
+    Order.objects.filter(pk__in=[o.pk for o in orders]).update(
+        status='processing', updated_at=timezone.now()
+    )
+    # Confirmation emails go out once, on the transition to paid
+    for order in orders:
+        order.status = 'processing'
+        queue_order_emails(order)
+
+
+def _cancel_orders(orders):
+    """Cancel the locked pending ``orders`` and restock their items."""
+    if not orders:
+        return
+    Order.objects.filter(pk__in=[o.pk for o in orders]).update(
+        status='cancelled', updated_at=timezone.now()
+    )
+    inventory.restock(OrderItem.objects.filter(order__in=orders))
+
+
+def _payment_canceled(intent):
+    _cancel_orders(list(
+        _orders_for_intent(intent['id']).filter(status='pending')
+        .select_for_update()
+    ))
+
+
+def _charge_refunded(charge):
+    # Partial refunds leave the order as it is
+    if not charge.get('refunded') or not charge.get('payment_intent'):
+        return
+    _orders_for_intent(charge['payment_intent']).filter(
+        status__in=('processing', 'completed')
+    ).update(status='refunded', updated_at=timezone.now())
+
+
+# Event type -> handler taking the event's data.object. Other types are
+# recorded and marked processed without side effects.
+EVENT_HANDLERS = {
+    'payment_intent.succeeded': _payment_succeeded,
+    'payment_intent.canceled': _payment_canceled,
+    'charge.refunded': _charge_refunded,
+}
+
+
+def _apply(event_row):
+    handler = EVENT_HANDLERS.get(event_row.event_type)
+    if handler is not None:
+        handler(event_row.payload['data']['object'])
+
+
+def process_pending_events(limit=100):
+    """Apply up to ``limit`` pending ledger events; returns how many ran.
+
+    Each event is applied in its own savepoint, so one failing event is
+    recorded and retried later without blocking the rest.
+    """
+    processed = 0
+    with transaction.atomic():
+        rows = list(
+            StripeEvent.objects.select_for_update(skip_locked=True)
+            .filter(status=StripeEvent.PENDING)
+            .order_by('received_at')[:limit]
+        )
+        for row in rows:
+            row.attempts += 1
+            try:
+                with transaction.atomic():
+                    _apply(row)
+            except Exception as exc:
+                logger.exception('Stripe event %s failed', row.event_id)
+                row.last_error = repr(exc)
+                if row.attempts >= MAX_EVENT_ATTEMPTS:
+                    row.status = StripeEvent.FAILED
+            else:
+                row.status = StripeEvent.PROCESSED
+                row.processed_at = timezone.now()
+                row.last_error = ''
+                processed += 1
+        StripeEvent.objects.bulk_update(
+            rows, ['status', 'attempts', 'last_error', 'processed_at']
+        )
+    return processed
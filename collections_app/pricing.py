@@ -0,0 +1,78 @@
+"""Price facets for the storefront filter UI.
+
+Buckets count the same thing the price filter matches
+(Art.storefront.in_price_range): art with an available variant priced in
+the bucket. An artwork sold as a poster and as an original therefore
+counts in both buckets, and picking a bucket's range shows the artworks
+it counted. A histogram over any storefront queryset is two aggregate
+queries: the bounds from the min/max_available_price projection, then one
+COUNT(DISTINCT art) FILTER (...) per bucket over the available variants in
+a single SELECT.
+"""
+import math
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Count, Max, Min, Q
+
+from .models import ArtVariant
+
+
+def nice_step(span, buckets):
+    """Bucket width of 1, 2 or 5 × 10^k covering ``span`` in ``buckets``."""
+    raw = span / buckets
+    if raw <= 0:
+        return Decimal(1)
+    magnitude = Decimal(10) ** math.floor(math.log10(raw))
+    for factor in (1, 2, 5, 10):
+        step = magnitude * factor
+        if step >= raw:
+            return step
+    return magnitude * 10
+
+
+def price_histogram(queryset, buckets=None):
+    """Count ``queryset`` rows by available variant price.
+
+    Returns a JSON-ready dict with the price bounds, the number of priced
+    rows and a list of ``{"min", "max", "count"}`` buckets; each bucket
+    includes its lower edge and excludes its upper edge. A row is counted
+    once in every bucket holding one of its available variants' prices, so
+    the bucket counts may add up to more than the total.
+    """
+    buckets = buckets or getattr(settings, 'PRICE_HISTOGRAM_BUCKETS', 10)
+    queryset = queryset.priced().order_by()
+    bounds = queryset.aggregate(
+        low=Min('min_available_price'),
+        high=Max('max_available_price'),
+        total=Count('pk'),
+    )
+    low, high = bounds['low'], bounds['high']
+    if low is None:
+        return {'min': None, 'max': None, 'total': 0, 'buckets': []}
+
+    step = nice_step(high - low, buckets)
+    start = (low // step) * step
+    edges = [
+        start + step * i
+        for i in range(int((high - start) // step) + 2)
+    ]
+    variants = ArtVariant.objects.filter(
+        art__in=queryset.values('pk'), is_available=True,
+        price__isnull=False,
+    ).order_by()
+    counts = variants.aggregate(**{
+        f'bucket_{i}': Count('art', distinct=True, filter=Q(
+            price__gte=lower, price__lt=upper,
+        ))
+        for i, (lower, upper) in enumerate(zip(edges, edges[1:]))
+    })
+    return {
+        'min': low,
+        'max': high,
+        'total': bounds['total'],
+        'buckets': [
+            {'min': lower, 'max': upper, 'count': counts[f'bucket_{i}']}
+            for i, (lower, upper) in enumerate(zip(edges, edges[1:]))
+        ],
+    }
@@ -0,0 +1,103 @@
+"""Storefront artwork search.
+
+On Postgres, Art rows carry a maintained ``search_vector`` (title, medium,
+description, collection name and artist name) backed by a GIN index, and
+searches are ranked full-text matches. When a query has no full-text hits
+(typically a typo) the search falls back to trigram similarity on the title
+and artist name. Other databases keep the plain ``icontains`` search.
+
+The vector is refreshed from collections_app.signals whenever an Art,
+Collection or ArtistProfile is saved.
+"""
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+)
+from django.db import connection
+from django.db.models import FloatField, OuterRef, Q, Subquery
+from django.db.models.functions import Cast, Greatest
+
+# Text search configuration used for both the stored vector and queries
+SEARCH_CONFIG = 'english'
+
+
+def search_enabled():
+    """True when the database supports the full-text search index."""
+    return connection.vendor == 'postgresql'
+
+
+def art_search_vector():
+    """Weighted SearchVector expression for an Art row."""
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector(
+            'collection__artist__name', weight='A', config=SEARCH_CONFIG
+        )
+        + SearchVector('collection__name', weight='B', config=SEARCH_CONFIG)
+        + SearchVector('medium', weight='B', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def refresh_search_vectors(queryset):
+    """Recompute ``search_vector`` for every Art in ``queryset``.
+
+    Runs as a single UPDATE with a correlated subquery, because an UPDATE
+    cannot reference the joined collection/artist columns directly.
+    No-op on databases without full-text search.
+    """
+    if not search_enabled():
+        return 0
+    from .models import Art
+
+    vector = (
+        Art.objects.filter(pk=OuterRef('pk'))
+        .annotate(vector=art_search_vector())
+        .values('vector')[:1]
+    )
+    return queryset.order_by().update(search_vector=Subquery(vector))
+
+
+def search_artworks(queryset, query):
+    """Filter ``queryset`` to Art matching ``query``.
+
+    On Postgres the result is annotated with ``search_rank`` (a double, so
+    the value survives a round trip through a pagination cursor) and should
+    be ordered by it. Elsewhere it falls back to ``icontains`` matching and
+    no rank is annotated.
+    """
+    if not search_enabled():
+        return queryset.filter(
+            Q(title__icontains=query) |
+            Q(medium__icontains=query) |
+            Q(collection__artist__name__icontains=query)
+        )
+
+    search_query = SearchQuery(
+        query, config=SEARCH_CONFIG, search_type='websearch'
+    )
+    ranked = queryset.filter(search_vector=search_query).annotate(
+        search_rank=Cast(
+            SearchRank('search_vector', search_query), FloatField()
+        ),
+    )
+    if ranked.exists():
+        return ranked
+
+    # Typo fallback: the trigram_similar lookup uses pg_trgm's `%`
+    # operator (pg_trgm.similarity_threshold, 0.3 by default), which the
+    # title trigram index can serve.
+    return queryset.filter(
+        Q(title__trigram_similar=query) |
+        Q(collection__artist__name__trigram_similar=query)
+    ).annotate(
+        search_rank=Cast(
+            Greatest(
+                TrigramSimilarity('title', query),
+                TrigramSimilarity('collection__artist__name', query),
+            ),
+            FloatField(),
+        ),
+    )
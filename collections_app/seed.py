@@ -0,0 +1,316 @@
+"""Deterministic synthetic data for benchmarks.
+
+``seed_catalog`` fills the database with a catalog shaped like the real one
+(artists, collections, art with original/poster/digital variants, homepage
+media, exhibitions, shoppers with baskets, past orders and an owner inbox).
+The same ``seed`` always produces the same rows, so query plans and timings
+can be compared across runs. ``manage.py seed_catalog`` is the command-line
+entry point; ``manage.py explain_storefront`` and ``benchmark_storefront``
+use it too.
+
+Rows are written with ``bulk_create``, which skips save() and signals. The
+storefront price projection, the art search documents and basket totals
+are refreshed explicitly and the caches fed by those signals (homepage,
+page cache, unread counter) are dropped at the end.
+"""
+import random
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+BATCH_SIZE = 500
+
+# Fixed reference point so created_at values do not depend on the clock
+EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+MEDIUMS = ('Oil', 'Acrylic', 'Ink', 'Watercolour', 'Charcoal', 'Mixed media')
+EXHIBITION_STATUSES = ('upcoming', 'ongoing', 'finished', 'cancelled')
+ORDER_STATUSES = ('pending', 'processing', 'completed', 'cancelled')
+
+
+class AlreadySeeded(Exception):
+    """Raised when rows for the requested seed already exist."""
+
+
+def _email(seed, kind, i):
+    return f'seed-{seed}-{kind}-{i}@example.invalid'
+
+
+@transaction.atomic
+def seed_catalog(arts=1000, seed=0, arts_per_collection=20,
+                 collections_per_artist=3, featured_ratio=0.05,
+                 media=30, exhibitions=40, shoppers=None, orders=None,
+                 messages=500):
+    """Create a synthetic catalog of ``arts`` Art rows; returns row counts.
+
+    Every piece has an original (about a third already sold), a poster and
+    a digital copy; roughly ``featured_ratio`` of the art is featured and
+    one Media row carries each homepage placement flag. ``shoppers``
+    (default arts / 50) each get a basket of one to four variants, and
+    ``orders`` (default arts / 10) past orders are spread across them.
+    """
+    from owner_app.models import ArtistProfile
+
+    if ArtistProfile.objects.filter(email=_email(seed, 'artist', 0)).exists():
+        raise AlreadySeeded(f'Seed {seed} is already loaded')
+
+    rng = random.Random(seed)
+    if shoppers is None:
+        shoppers = max(1, arts // 50)
+    if orders is None:
+        orders = arts // 10
+
+    art_rows, variants = _seed_art(
+        rng, seed, arts, arts_per_collection, collections_per_artist,
+        featured_ratio,
+    )
+    counts = {
+        'artists': ArtistProfile.objects.filter(
+            email__startswith=f'seed-{seed}-artist-'
+        ).count(),
+        'collections': len({a.collection_id for a in art_rows}),
+        'arts': len(art_rows),
+        'variants': len(variants),
+    }
+    counts['media'] = _seed_media(seed, media)
+    counts['exhibitions'] = _seed_exhibitions(rng, seed, exhibitions, art_rows)
+    counts.update(_seed_shop(rng, seed, shoppers, orders, variants, art_rows))
+    owner = _seed_inbox(rng, seed, messages)
+    counts['messages'] = messages
+    counts['owner_id'] = owner.pk
+
+    transaction.on_commit(lambda: _forget_caches(owner.pk))
+    return counts
+
+
+def _seed_art(rng, seed, arts, arts_per_collection, collections_per_artist,
+              featured_ratio):
+    from owner_app.models import ArtistProfile
+
+    from .models import Art, ArtVariant, Collection
+    from .search import refresh_search_vectors
+
+    n_collections = max(1, -(-arts // arts_per_collection))
+    n_artists = max(1, -(-n_collections // collections_per_artist))
+
+    artists = ArtistProfile.objects.bulk_create(
+        [
+            ArtistProfile(
+                name=f'Seed Artist {i}', email=_email(seed, 'artist', i)
+            )
+            for i in range(n_artists)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    collections = Collection.objects.bulk_create(
+        [
+            Collection(
+                artist=artists[i % n_artists],
+                name=f'Seed Collection {seed}-{i}',
+                description='Synthetic collection for benchmarks.',
+            )
+            for i in range(n_collections)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+    art_rows = []
+    for i in range(arts):
+        width = Decimal(rng.randrange(20, 200))
+        art_rows.append(Art(
+            collection=collections[i % n_collections],
+            title=f'Seed Art {seed}-{i}',
+            medium=rng.choice(MEDIUMS),
+            year_created=rng.randrange(1990, 2025),
+            width_cm=width,
+            height_cm=width * Decimal('1.25'),
+            price=Decimal(rng.randrange(50, 5000)),
+            currency='USD',
+            is_available=rng.random() < 0.8,
+            is_featured=rng.random() < featured_ratio,
+            description=' '.join(rng.choices(MEDIUMS, k=60)),
+            created_at=EPOCH + timedelta(minutes=rng.randrange(0, 10 ** 6)),
+            updated_at=EPOCH,
+        ))
+    art_rows = Art.objects.bulk_create(art_rows, batch_size=BATCH_SIZE)
+
+    variants = []
+    for art in art_rows:
+        # A sold original is sold out: no stock left
+        sold = rng.random() >= 0.66
+        variants.append(ArtVariant(
+            art=art, medium=ArtVariant.ORIGINAL, price=art.price,
+            is_available=not sold, stock=0 if sold else 1,
+        ))
+        variants.append(ArtVariant(
+            art=art, medium=ArtVariant.POSTER,
+            price=Decimal(rng.randrange(15, 120)), is_available=True,
+        ))
+        variants.append(ArtVariant(
+            art=art, medium=ArtVariant.DIGITAL,
+            price=Decimal(rng.randrange(5, 40)),
+            is_available=rng.random() < 0.5,
+        ))
+    variants = ArtVariant.objects.bulk_create(variants, batch_size=BATCH_SIZE)
+    Art.refresh_storefront_prices(a.pk for a in art_rows)
+    refresh_search_vectors(Art.objects.filter(pk__in=[a.pk for a in art_rows]))
+    return art_rows, variants
+
+
+def _seed_media(seed, count):
+    from .models import Media
+
+    Media.objects.bulk_create(
+        [
+            Media(
+                media_type=Media.IMAGE,
+                caption=f'Seed media {seed}-{i}',
+                hero=(i == 0),
+                second_section=(i == 1),
+                third_section=(i == 2),
+            )
+            for i in range(count)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    return count
+
+
+def _seed_exhibitions(rng, seed, count, art_rows):
+    from events_app.models import Exhibition, ExhibitionArt
+
+    start = date(2024, 1, 1)
+    exhibitions = []
+    for i in range(count):
+        begins = start + timedelta(days=rng.randrange(0, 900))
+        exhibitions.append(Exhibition(
+            title=f'Seed Exhibition {seed}-{i}',
+            start_date=begins,
+            end_date=begins + timedelta(days=rng.randrange(7, 90)),
+            status=rng.choice(EXHIBITION_STATUSES),
+        ))
+    exhibitions = Exhibition.objects.bulk_create(
+        exhibitions, batch_size=BATCH_SIZE
+    )
+    ExhibitionArt.objects.bulk_create(
+        [
+            ExhibitionArt(exhibition=exhibition, art=art)
+            for exhibition in exhibitions
+            for art in rng.sample(art_rows, min(10, len(art_rows)))
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    return len(exhibitions)
+
+
+def _seed_shop(rng, seed, shoppers, orders, variants, art_rows):
+    from .models import Basket, BasketItem, Order, OrderItem
+
+    arts_by_pk = {a.pk: a for a in art_rows}
+    users = User.objects.bulk_create(
+        [
+            User(
+                username=f'seed-{seed}-shopper-{i}',
+                email=_email(seed, 'shopper', i),
+            )
+            for i in range(shoppers)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+    baskets = Basket.objects.bulk_create(
+        [Basket(user=user) for user in users], batch_size=BATCH_SIZE
+    )
+    items = []
+    for basket in baskets:
+        picks = rng.sample(variants, min(rng.randint(1, 4), len(variants)))
+        for variant in picks:
+            items.append(BasketItem(
+                basket=basket,
+                art_id=variant.art_id,
+                variant=variant,
+                quantity=1,
+                price_at_addition=variant.price,
+            ))
+    BasketItem.objects.bulk_create(items, batch_size=BATCH_SIZE)
+    Basket.objects.filter(pk__in=[b.pk for b in baskets]).refresh_totals()
+
+    order_rows, order_lines = [], []
+    for i in range(orders):
+        user = rng.choice(users)
+        lines = rng.sample(variants, min(rng.randint(1, 3), len(variants)))
+        order_rows.append(Order(
+            user=user,
+            order_number=f'SEED-{seed}-{i:07d}',
+            status=rng.choice(ORDER_STATUSES),
+            total_amount=sum(v.price for v in lines),
+            email=user.email,
+            full_name=f'Seed Shopper {user.pk}',
+            address_line1='1 Benchmark Road',
+            city='Testville',
+            postal_code='00000',
+            country='US',
+        ))
+        order_lines.append(lines)
+    order_rows = Order.objects.bulk_create(order_rows, batch_size=BATCH_SIZE)
+    OrderItem.objects.bulk_create(
+        [
+            OrderItem(
+                order=order,
+                art_id=variant.art_id,
+                artwork_title=arts_by_pk[variant.art_id].title,
+                artwork_artist=f'Seed Artist {seed}',
+                artwork_medium=arts_by_pk[variant.art_id].medium,
+                quantity=1,
+                price=variant.price,
+                variant_id=variant.pk,
+                variant_medium=variant.medium,
+            )
+            for order, lines in zip(order_rows, order_lines)
+            for variant in lines
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    return {
+        'shoppers': len(users),
+        'basket_items': len(items),
+        'orders': len(order_rows),
+    }
+
+
+def _seed_inbox(rng, seed, count):
+    from owner_app.models import Messages
+
+    owner, _ = User.objects.get_or_create(
+        username=f'seed-owner-{seed}',
+        defaults={'email': _email(seed, 'owner', 0), 'is_superuser': True,
+                  'is_staff': True},
+    )
+    Messages.objects.bulk_create(
+        [
+            Messages(
+                name=f'Visitor {i}',
+                email=_email(seed, 'visitor', i),
+                message='Synthetic enquiry.',
+                owner=owner,
+                unread=rng.random() < 0.2,
+                subject=rng.choice(('general', 'artwork', 'exhibition')),
+            )
+            for i in range(count)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    return owner
+
+
+def _forget_caches(owner_id):
+    from config.cache import bump_page_cache_version
+    from owner_app.unread import reset_unread_count
+
+    from .homepage import invalidate_homepage_cache
+
+    invalidate_homepage_cache()
+    bump_page_cache_version('catalog', 'events')
+    reset_unread_count(owner_id)
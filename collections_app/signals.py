@@ -0,0 +1,81 @@
+"""Signal receivers for collections_app.
+
+Connected from CollectionsAppConfig.ready().
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from config.cache import bump_page_cache_version
+from owner_app.models import ArtistProfile
+
+from .homepage import invalidate_homepage_cache
+from .models import Art, ArtVariant, Collection, Media
+from .search import refresh_search_vectors
+
+
+@receiver(post_save, sender=ArtVariant)
+@receiver(post_delete, sender=ArtVariant)
+def refresh_art_storefront_price(sender, instance, **kwargs):
+    """Keep the Art storefront price projection current.
+
+    A bare Art(pk=...) is enough here: the refresh only needs the id and
+    updates via the queryset, so an Art that is being cascade-deleted is
+    simply a no-op.
+    """
+    if instance.art_id is None:
+        return
+    Art(pk=instance.art_id).refresh_storefront_price()
+
+
+@receiver(post_save, sender=Art)
+def refresh_art_search_vector(sender, instance, raw=False, **kwargs):
+    """Rebuild the saved Art's full-text search document."""
+    if raw:
+        return
+    refresh_search_vectors(Art.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Collection)
+def refresh_collection_search_vectors(sender, instance, raw=False, **kwargs):
+    """The collection name is part of every member Art's document."""
+    if raw:
+        return
+    refresh_search_vectors(Art.objects.filter(collection=instance))
+
+
+@receiver(post_save, sender=ArtistProfile)
+def refresh_artist_search_vectors(sender, instance, raw=False, **kwargs):
+    """The artist name is part of the documents of all their Art."""
+    if raw:
+        return
+    refresh_search_vectors(Art.objects.filter(collection__artist=instance))
+
+
+@receiver(post_save, sender=Media)
+@receiver(post_delete, sender=Media)
+@receiver(post_save, sender=Art)
+@receiver(post_delete, sender=Art)
+@receiver(post_save, sender=ArtVariant)
+@receiver(post_delete, sender=ArtVariant)
+def invalidate_homepage(sender, **kwargs):
+    """Hero media and the featured carousel are cached; drop them.
+
+    Dropped on commit: a request arriving before then would otherwise
+    cache the old rows again, and a rollback needs no invalidation.
+    """
+    transaction.on_commit(invalidate_homepage_cache)
+
+
+@receiver(post_save, sender=Art)
+@receiver(post_delete, sender=Art)
+@receiver(post_save, sender=ArtVariant)
+@receiver(post_delete, sender=ArtVariant)
+@receiver(post_save, sender=Collection)
+@receiver(post_delete, sender=Collection)
+def invalidate_catalog_pages(sender, **kwargs):
+    """Gallery, collection and artwork pages are cached for visitors.
+
+    Bumped on commit, like invalidate_homepage.
+    """
+    transaction.on_commit(lambda: bump_page_cache_version('catalog'))
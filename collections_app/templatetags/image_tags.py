@@ -0,0 +1,69 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from collections_app.images import (
+    DEFAULT_WIDTHS,
+    FALLBACK_WIDTH,
+    image_srcset,
+    image_url,
+    is_image,
+)
+
+register = template.Library()
+
+
+def _widths(widths):
+    if not widths:
+        return DEFAULT_WIDTHS
+    if isinstance(widths, str):
+        return tuple(int(w) for w in widths.split(',') if w.strip())
+    return tuple(widths)
+
+
+@register.simple_tag
+def responsive_image(resource, alt='', sizes='100vw', widths=None,
+                     loading='lazy', **attrs):
+    """Render an ``<img>`` for a CloudinaryField value with a srcset.
+
+    ``sizes`` should describe the rendered width of the slot so the browser
+    can pick from ``widths`` (comma-separated, default
+    collections_app.images.DEFAULT_WIDTHS). Images are lazy-loaded unless
+    ``loading="eager"`` is passed, which also raises the fetch priority for
+    the page's largest image. Any other keyword (``class``, ``style``, ...)
+    becomes an attribute.
+
+    Usage in template::
+        {% load image_tags %}
+        {% responsive_image art.image art.title sizes="(min-width: 992px) 25vw, 100vw" class="card-img-top" %}
+    """
+    if not resource:
+        return ''
+    widths = _widths(widths)
+    attributes = {'alt': alt}
+    if is_image(resource):
+        attributes.update(
+            src=image_url(resource, min(FALLBACK_WIDTH, max(widths))),
+            srcset=image_srcset(resource, widths),
+            sizes=sizes,
+        )
+    else:
+        attributes['src'] = image_url(resource)
+    attributes['loading'] = loading
+    attributes['decoding'] = 'async'
+    if loading == 'eager':
+        attributes['fetchpriority'] = 'high'
+    attributes.update(attrs)
+    return format_html(
+        '<img {}>',
+        format_html_join(' ', '{}="{}"', attributes.items()),
+    )
+
+
+@register.filter
+def cloudinary_url(resource, width=None):
+    """Optimised URL for a CloudinaryField value, capped at ``width``.
+
+    Usage in template::
+        {% with url=collection.cover_image|cloudinary_url:1280 %}
+    """
+    return image_url(resource, width)
@@ -5,30 +5,16 @@ register = template.Library()
 
 @register.simple_tag(takes_context=True)
 def message_count(context):
-    """Return unread message count if available, otherwise total messages.
+    """Return the signed-in user's unread message count.
 
-    This checks for a `Messages` model in `owner_app.models`. If that model
-    has an `unread` boolean field, it returns the count of unread messages.
-    Otherwise it falls back to the total count. Any import/DB errors return 0.
+    Uses the same per-request memoized, cache-backed counter as the
+    ``unread_message_count`` context variable (see owner_app.unread), so
+    using the tag several times on a page costs a single lookup. Returns 0
+    without a request or for anonymous visitors.
     """
-    try:
-        from owner_app.models import Messages as MsgModel
+    from owner_app.unread import request_unread_count
 
-        # If we have a request/user in the context, show unread count for
-        # that owner. Otherwise fall back to the global unread count.
-        request = context.get('request')
-        if (
-            request
-            and getattr(request, 'user', None)
-            and request.user.is_authenticated
-        ):
-            return (
-                MsgModel.objects.filter(owner=request.user, unread=True).count()
-            )
-
-        # Prefer unread count if the field exists.
-        if hasattr(MsgModel, 'unread'):
-            return MsgModel.objects.filter(unread=True).count()
-        return MsgModel.objects.count()
-    except Exception:
+    request = context.get('request')
+    if request is None:
         return 0
+    return request_unread_count(request)
@@ -1,8 +1,13 @@
-from django.test import TestCase, Client
+import os
+from unittest import skipIf, skipUnless
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.contrib.auth.models import User
 from decimal import Decimal
-from .models import Collection, Art, ArtVariant
+from .models import Collection, Art, ArtVariant, Basket, BasketItem
 from owner_app.models import ArtistProfile
 
 
@@ -327,7 +332,7 @@ class ArtworkListViewTest(TestCase):
         artworks = response.context['artworks']
         
         # Should contain 2 available artworks
-        self.assertEqual(artworks.count(), 2)
+        self.assertEqual(len(artworks), 2)
         self.assertIn(self.artwork1, artworks)
         self.assertIn(self.artwork2, artworks)
         # Should NOT contain unavailable artwork
@@ -383,7 +388,7 @@ class ArtworkListViewTest(TestCase):
             {'search': 'Artwork 1'}
         )
         artworks = response.context['artworks']
-        self.assertEqual(artworks.count(), 1)
+        self.assertEqual(len(artworks), 1)
         self.assertIn(self.artwork1, artworks)
         
         # Search by medium
@@ -392,7 +397,7 @@ class ArtworkListViewTest(TestCase):
             {'search': 'Acrylic'}
         )
         artworks = response.context['artworks']
-        self.assertEqual(artworks.count(), 1)
+        self.assertEqual(len(artworks), 1)
         self.assertIn(self.artwork2, artworks)
     
     def test_artwork_list_price_filter(self):
@@ -406,7 +411,7 @@ class ArtworkListViewTest(TestCase):
             {'min_price': '1200'}
         )
         artworks = response.context['artworks']
-        self.assertEqual(artworks.count(), 1)
+        self.assertEqual(len(artworks), 1)
         self.assertIn(self.artwork2, artworks)
         
         # Filter by maximum price
@@ -415,7 +420,7 @@ class ArtworkListViewTest(TestCase):
             {'max_price': '1200'}
         )
         artworks = response.context['artworks']
-        self.assertEqual(artworks.count(), 1)
+        self.assertEqual(len(artworks), 1)
         self.assertIn(self.artwork1, artworks)
 
 
@@ -654,3 +659,2313 @@ class MediaManageViewTest(TestCase):
         # m2 should be hero, m1 should have been cleared by Media.save()
         self.assertTrue(m2.hero)
         self.assertFalse(m1.hero)
+
+
+# ============================================================================
+# STOREFRONT PRICE PROJECTION TESTS
+# Art.storefront_* columns are kept current from ArtVariant saves/deletes
+# ============================================================================
+
+class StorefrontPriceProjectionTest(TestCase):
+    """Tests for the denormalized storefront price on Art."""
+
+    def setUp(self):
+        self.artist = ArtistProfile.objects.create(
+            name='Projection Artist', email='projection@example.com'
+        )
+        coll = Collection.objects.create(artist=self.artist, name='Proj')
+        self.art = Art.objects.create(collection=coll, title='Projected')
+
+    def test_variant_save_updates_projection(self):
+        ArtVariant.objects.create(
+            art=self.art, medium=ArtVariant.POSTER, is_available=True,
+            price=Decimal('40.00'), currency='USD',
+        )
+        self.art.refresh_from_db()
+        self.assertEqual(self.art.storefront_price, Decimal('40.00'))
+        self.assertEqual(self.art.storefront_medium, ArtVariant.POSTER)
+        self.assertTrue(self.art.storefront_original_unavailable)
+        self.assertEqual(self.art.display_price, 'USD 40.00')
+        self.assertEqual(self.art.display_format_label, 'Printed poster')
+
+        # An available original takes precedence over the poster
+        ArtVariant.objects.create(
+            art=self.art, medium=ArtVariant.ORIGINAL, is_available=True,
+            price=Decimal('1200.00'), currency='USD',
+        )
+        self.art.refresh_from_db()
+        self.assertEqual(self.art.storefront_price, Decimal('1200.00'))
+        self.assertFalse(self.art.storefront_original_unavailable)
+
+    def test_variant_delete_updates_projection(self):
+        original = ArtVariant.objects.create(
+            art=self.art, medium=ArtVariant.ORIGINAL, is_available=True,
+            price=Decimal('900.00'), currency='USD',
+        )
+        original.delete()
+        self.art.refresh_from_db()
+        self.assertIsNone(self.art.storefront_price)
+        self.assertEqual(self.art.display_price, 'Price not available')
+
+    def test_artwork_list_uses_selected_format_price(self):
+        ArtVariant.objects.create(
+            art=self.art, medium=ArtVariant.ORIGINAL, is_available=True,
+            price=Decimal('1500.00'), currency='USD',
+        )
+        ArtVariant.objects.create(
+            art=self.art, medium=ArtVariant.DIGITAL, is_available=True,
+            price=Decimal('25.00'), currency='USD',
+        )
+        response = self.client.get(
+            reverse('collections_app:artwork_list'),
+            {'format': ArtVariant.DIGITAL},
+        )
+        self.assertContains(response, 'USD 25.00')
+        self.assertNotContains(response, 'Original unavailable')
+
+        response = self.client.get(reverse('collections_app:artwork_list'))
+        self.assertContains(response, 'USD 1,500.00')
+
+
+# ============================================================================
+# KEYSET PAGINATION TESTS
+# /artworks/ pages by (-created_at, id); artwork_list_page serves the rest
+# ============================================================================
+
+@override_settings(ARTWORK_LIST_PAGE_SIZE=2)
+class ArtworkListPaginationTest(TestCase):
+    """Tests for cursor pagination of the storefront listing."""
+
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+
+        self.artist = ArtistProfile.objects.create(
+            name='Paging Artist', email='paging@example.com'
+        )
+        now = timezone.now()
+        self.arts = []
+        for i in range(5):
+            art = create_artwork_equivalent(
+                f'Paged {i}', self.artist,
+                medium='Ink' if i % 2 else 'Oil',
+                price=Decimal('100.00'),
+                is_available=True,
+            )
+            # Two rows share a timestamp to exercise the id tie-breaker
+            art.created_at = now - timedelta(days=min(i, 3))
+            art.save()
+            self.arts.append(art)
+
+    def collect_pages(self, params=None):
+        params = dict(params or {})
+        response = self.client.get(
+            reverse('collections_app:artwork_list'), params
+        )
+        seen = [a.pk for a in response.context['artworks']]
+        cursor = response.context['next_cursor']
+        while cursor:
+            page = self.client.get(
+                reverse('collections_app:artwork_list_page'),
+                {**params, 'cursor': cursor},
+            ).json()
+            self.assertLessEqual(page['count'], 2)
+            seen.extend(
+                a.pk for a in self.arts
+                if f'/artwork/{a.pk}/' in page['html']
+            )
+            cursor = page['next_cursor']
+        return seen
+
+    def test_pages_cover_catalog_once_in_order(self):
+        seen = self.collect_pages()
+        expected = [
+            a.pk for a in sorted(
+                self.arts, key=lambda a: (-a.created_at.timestamp(), a.pk)
+            )
+        ]
+        self.assertEqual(seen, expected)
+
+    def test_filters_are_preserved_across_pages(self):
+        seen = self.collect_pages({'search': 'Ink'})
+        self.assertEqual(
+            sorted(seen),
+            sorted(a.pk for a in self.arts if a.medium == 'Ink'),
+        )
+
+    def test_page_query_count_is_constant(self):
+        first = self.client.get(reverse('collections_app:artwork_list'))
+        cursor = first.context['next_cursor']
+        with self.assertNumQueries(1):
+            self.client.get(
+                reverse('collections_app:artwork_list_page'),
+                {'cursor': cursor},
+            )
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(
+            reverse('collections_app:artwork_list_page'),
+            {'cursor': 'not-a-cursor'},
+        )
+        self.assertEqual(response.status_code, 400)
+
+    @skipUnless(connection.vendor == 'sqlite', 'plan text is SQLite-specific')
+    def test_pages_are_served_by_listing_index(self):
+        from .listings import ARTWORK_CARD_FIELDS, ARTWORK_LIST_ORDERING
+        from .pagination import KeysetPaginator
+
+        paginator = KeysetPaginator(
+            Art.storefront.available().only(*ARTWORK_CARD_FIELDS),
+            ARTWORK_LIST_ORDERING, 2,
+        )
+        first = paginator.page_queryset().explain()
+        later = paginator.page_queryset(
+            paginator.get_page().next_cursor
+        ).explain()
+        for plan in (first, later):
+            self.assertIn('art_listing_idx', plan)
+            # Read in index order: no separate sort of the catalog
+            self.assertNotIn('TEMP B-TREE', plan)
+        # A later page seeks to the cursor instead of scanning from the top
+        self.assertIn('USING INDEX art_listing_idx (created_at<?)', later)
+
+
+# ============================================================================
+# STOREFRONT QUERYSET TESTS
+# Art.storefront availability is EXISTS-based and never duplicates rows
+# ============================================================================
+
+class StorefrontQuerySetTest(TestCase):
+    """Tests for Art.storefront.available(), featured() and with_format()."""
+
+    def setUp(self):
+        self.artist = ArtistProfile.objects.create(
+            name='Storefront Artist', email='storefront@example.com'
+        )
+        self.collection = Collection.objects.create(
+            artist=self.artist, name='Storefront'
+        )
+
+    def make_art(self, title, is_available=False, is_featured=False,
+                 variants=()):
+        art = Art.objects.create(
+            collection=self.collection, title=title,
+            is_available=is_available, is_featured=is_featured,
+        )
+        for medium, available, price in variants:
+            ArtVariant.objects.create(
+                art=art, medium=medium, is_available=available, price=price,
+            )
+        return art
+
+    def test_available_uses_art_flag_or_any_variant(self):
+        flagged = self.make_art('Flagged', is_available=True)
+        multi = self.make_art('Multi', variants=[
+            (ArtVariant.ORIGINAL, True, Decimal('300.00')),
+            (ArtVariant.POSTER, True, Decimal('40.00')),
+            (ArtVariant.DIGITAL, True, Decimal('10.00')),
+        ])
+        self.make_art('Hidden', variants=[
+            (ArtVariant.POSTER, False, Decimal('40.00')),
+        ])
+
+        available = list(Art.storefront.available())
+        # Three available variants must not yield three rows
+        self.assertCountEqual(available, [flagged, multi])
+
+    def test_available_sql_has_no_join_or_distinct(self):
+        sql = str(Art.storefront.available().query).upper()
+        self.assertIn('EXISTS', sql)
+        self.assertNotIn('DISTINCT', sql)
+        self.assertNotIn('JOIN', sql)
+
+    def test_featured_requires_availability(self):
+        shown = self.make_art('Shown', is_featured=True, variants=[
+            (ArtVariant.POSTER, True, Decimal('40.00')),
+        ])
+        self.make_art('Unavailable', is_featured=True)
+        self.make_art('Not featured', is_available=True)
+
+        self.assertEqual(list(Art.storefront.featured()), [shown])
+
+    def test_with_format_annotates_format_price(self):
+        art = self.make_art('Formats', variants=[
+            (ArtVariant.ORIGINAL, True, Decimal('300.00')),
+            (ArtVariant.POSTER, True, Decimal('40.00')),
+        ])
+        self.make_art('Original only', variants=[
+            (ArtVariant.ORIGINAL, True, Decimal('500.00')),
+        ])
+
+        result = list(Art.storefront.with_format(ArtVariant.POSTER))
+        self.assertEqual(result, [art])
+        self.assertEqual(result[0].format_price, Decimal('40.00'))
+        self.assertEqual(result[0].display_price, 'USD 40.00')
+
+
+# ============================================================================
+# ARTWORK SEARCH TESTS
+# Ranked full-text search on Postgres, icontains everywhere else
+# ============================================================================
+
+class ArtworkSearchTest(TestCase):
+    """Tests for collections_app.search via the artwork_list view."""
+
+    def setUp(self):
+        self.artist = ArtistProfile.objects.create(
+            name='Hokusai Katsushika', email='hokusai@example.com'
+        )
+        self.wave = create_artwork_equivalent(
+            'The Great Wave', self.artist, medium='Woodblock print',
+            price=Decimal('900.00'), is_available=True,
+        )
+        self.fuji = create_artwork_equivalent(
+            'Red Fuji', self.artist, medium='Woodblock print',
+            description='A wave of colour over the mountain',
+            price=Decimal('700.00'), is_available=True,
+        )
+        self.other = create_artwork_equivalent(
+            'Water Lilies', ArtistProfile.objects.create(
+                name='Claude Monet', email='monet@example.com'
+            ),
+            medium='Oil', price=Decimal('1500.00'), is_available=True,
+        )
+
+    def search(self, query):
+        response = self.client.get(
+            reverse('collections_app:artwork_list'), {'search': query}
+        )
+        return list(response.context['artworks'])
+
+    @skipIf(connection.vendor == 'postgresql', 'icontains fallback only')
+    def test_search_falls_back_to_icontains(self):
+        self.assertCountEqual(self.search('wave'), [self.wave])
+        self.assertCountEqual(self.search('hokusai'), [self.wave, self.fuji])
+        self.assertCountEqual(self.search('oil'), [self.other])
+
+    @skipUnless(connection.vendor == 'postgresql', 'requires Postgres')
+    def test_search_ranks_title_matches_first(self):
+        # Title carries weight A, description weight C
+        self.assertEqual(self.search('wave'), [self.wave, self.fuji])
+
+    @skipUnless(connection.vendor == 'postgresql', 'requires Postgres')
+    def test_search_vector_follows_artist_rename(self):
+        self.artist.name = 'Utagawa Hiroshige'
+        self.artist.save()
+        self.assertCountEqual(self.search('hiroshige'), [self.wave, self.fuji])
+
+    @skipUnless(connection.vendor == 'postgresql', 'requires Postgres')
+    def test_search_trigram_fallback_for_typos(self):
+        self.assertIn(self.wave, self.search('Grate Wave'))
+
+
+# ============================================================================
+# HOMEPAGE CACHE TESTS
+# collections_app.homepage caches the index context until Media/Art change
+# ============================================================================
+
+class HomepageCacheTest(TestCase):
+    """Tests for the cached homepage context and its invalidation."""
+
+    def setUp(self):
+        from .homepage import invalidate_homepage_cache
+
+        invalidate_homepage_cache()
+        self.artist = ArtistProfile.objects.create(
+            name='Home Artist', email='home@example.com'
+        )
+        self.art = create_artwork_equivalent(
+            'Carousel Piece', self.artist, price=Decimal('100.00'),
+            is_available=True, is_featured=True,
+        )
+
+    def featured_titles(self):
+        response = self.client.get(reverse('collections_app:index'))
+        return [a['title'] for a in response.context['featured_artworks']]
+
+    def test_cached_homepage_skips_database(self):
+        self.assertEqual(self.featured_titles(), ['Carousel Piece'])
+        with self.assertNumQueries(0):
+            self.client.get(reverse('collections_app:index'))
+
+    @override_settings(
+        HOMEPAGE_CACHE_TIMEOUT=3600, HOMEPAGE_LOCAL_CACHE_TIMEOUT=30
+    )
+    def test_process_local_cache_uses_short_timeout(self):
+        from unittest import mock
+        from .homepage import _cache
+
+        # The test cache is locmem, which other processes cannot invalidate
+        with mock.patch.object(_cache(), 'set') as cache_set:
+            self.client.get(reverse('collections_app:index'))
+        self.assertEqual(cache_set.call_args.args[2], 30)
+
+    def test_art_change_invalidates_cache(self):
+        self.featured_titles()
+        self.art.is_featured = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.art.save()
+        self.assertEqual(self.featured_titles(), [])
+
+    def test_variant_change_invalidates_cache(self):
+        self.featured_titles()
+        # Queryset update() sends no signals, so only the variant save
+        # below can invalidate the cached carousel
+        Art.objects.filter(pk=self.art.pk).update(is_available=False)
+        variant = self.art.variants.get()
+        variant.is_available = False
+        with self.captureOnCommitCallbacks(execute=True):
+            variant.save()
+        self.assertEqual(self.featured_titles(), [])
+
+    def test_media_change_invalidates_cache(self):
+        from django.db import connection as db_connection
+        from django.test.utils import CaptureQueriesContext
+        from .models import Media
+
+        self.client.get(reverse('collections_app:index'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Media.objects.create(caption='New hero', hero=True)
+        with CaptureQueriesContext(db_connection) as queries:
+            self.client.get(reverse('collections_app:index'))
+        # The context was rebuilt rather than served from the cache
+        self.assertGreater(len(queries), 0)
+
+
+# ============================================================================
+# ANONYMOUS PAGE CACHE TESTS
+# config.cache caches public pages under versioned keys
+# ============================================================================
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class AnonymousPageCacheTest(TestCase):
+    """Tests for cache_anonymous_page and MediaCacheMiddleware headers."""
+
+    def setUp(self):
+        from config.cache import page_cache
+
+        page_cache().clear()
+        self.artist = ArtistProfile.objects.create(
+            name='Cached Artist', email='cached@example.com'
+        )
+        self.art = create_artwork_equivalent(
+            'Cached Piece', self.artist, price=Decimal('100.00'),
+            is_available=True,
+        )
+        self.url = reverse('collections_app:artwork_detail', args=[self.art.pk])
+
+    def test_second_anonymous_request_is_served_from_cache(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first['X-Page-Cache'], 'miss')
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second['X-Page-Cache'], 'hit')
+        self.assertEqual(second.content, first.content)
+        self.assertIn('public', second['Cache-Control'])
+        self.assertIn('Cookie', second['Vary'])
+
+    def test_model_write_bumps_version(self):
+        self.client.get(self.url)
+        self.art.title = 'Renamed Piece'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.art.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertContains(response, 'Renamed Piece')
+
+    def test_version_is_bumped_only_on_commit(self):
+        self.client.get(self.url)
+        self.art.title = 'Uncommitted Piece'
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.art.save()
+            # Still inside the writing transaction: the old page stands
+            self.assertEqual(self.client.get(self.url)['X-Page-Cache'], 'hit')
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.client.get(self.url)['X-Page-Cache'], 'miss')
+
+    def test_artist_write_bumps_about_page(self):
+        about = reverse('about')
+        self.client.get(about)
+        self.artist.name = 'Renamed Artist'
+        self.artist.save()
+        response = self.client.get(about)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertContains(response, 'Renamed Artist')
+
+    def test_assigning_art_bumps_events_page(self):
+        from datetime import date
+        from events_app.models import Exhibition
+
+        exhibition = Exhibition.objects.create(
+            title='Spring Show', start_date=date(2030, 3, 1),
+        )
+        events = reverse('events_app:index')
+        self.client.get(events)
+        self.assertEqual(self.client.get(events)['X-Page-Cache'], 'hit')
+
+        owner = User.objects.create_superuser('curator', password='pw')
+        owner_client = Client()
+        owner_client.force_login(owner)
+        # The ExhibitionArt post_save receiver bumps the events page
+        with self.captureOnCommitCallbacks(execute=True):
+            owner_client.post(
+                reverse('owner_app:assign_art', args=[exhibition.pk]),
+                {'art': [self.art.pk]},
+            )
+        self.assertTrue(exhibition.exhibition_arts.filter(
+            art=self.art
+        ).exists())
+        self.assertEqual(self.client.get(events)['X-Page-Cache'], 'miss')
+        self.assertEqual(self.client.get(events)['X-Page-Cache'], 'hit')
+
+        # Unassigning is picked up by the post_delete receiver too
+        with self.captureOnCommitCallbacks(execute=True):
+            owner_client.post(
+                reverse('owner_app:assign_art', args=[exhibition.pk]), {}
+            )
+        self.assertFalse(exhibition.exhibition_arts.exists())
+        self.assertEqual(self.client.get(events)['X-Page-Cache'], 'miss')
+
+    def test_responses_setting_a_cookie_are_not_public(self):
+        # SESSION_SAVE_EVERY_REQUEST re-sends the session cookie on every
+        # response once the session holds data
+        session = self.client.session
+        session['seen'] = True
+        session.save()
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertNotIn('public', response['Cache-Control'])
+
+    @override_settings(PAGE_CACHE_ENABLED=None, DEBUG=False)
+    def test_process_local_cache_disables_page_caching(self):
+        # locmem cannot carry a version bump to other workers
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertNotIn('public', response.get('Cache-Control', ''))
+
+    def test_authenticated_requests_bypass_cache(self):
+        user = User.objects.create_user('visitor', password='pw')
+        self.client.force_login(user)
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertIn('private', response['Cache-Control'])
+
+
+# ============================================================================
+# BASKET TOTALS TESTS
+# Basket.item_count/total_amount are maintained with F-expression updates
+# ============================================================================
+
+class BasketTotalsTest(TestCase):
+    """Tests for the denormalized basket totals and their repair command."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        # Cached badge counts are keyed by user id, which tests reuse
+        cache.clear()
+        self.user = User.objects.create_user('shopper', password='pw')
+        self.client.force_login(self.user)
+        artist = ArtistProfile.objects.create(
+            name='Basket Artist', email='basket@example.com'
+        )
+        self.art = create_artwork_equivalent(
+            'Basket Piece', artist, price=Decimal('100.00'), is_available=True,
+        )
+        self.original = self.art.variants.get()
+        self.poster = ArtVariant.objects.create(
+            art=self.art, medium=ArtVariant.POSTER, is_available=True,
+            price=Decimal('25.50'),
+        )
+        self.basket = Basket.objects.create(user=self.user)
+
+    def assertTotals(self, count, total):
+        self.basket.refresh_from_db()
+        self.assertEqual(self.basket.item_count, count)
+        self.assertEqual(self.basket.total_amount, Decimal(total))
+        self.assertEqual(
+            self.basket.aggregate_totals(),
+            {'item_count': count, 'total_amount': Decimal(total)},
+        )
+
+    def add(self, variant, quantity=1):
+        return BasketItem.objects.create(
+            basket=self.basket, art=self.art, variant=variant,
+            quantity=quantity,
+        )
+
+    def test_item_mutations_keep_totals_in_step(self):
+        item = self.add(self.original)
+        self.add(self.poster, quantity=2)
+        self.assertTotals(3, '151.00')
+
+        item = BasketItem.objects.get(pk=item.pk)
+        item.quantity = 3
+        item.save()
+        self.assertTotals(5, '351.00')
+
+        item.delete()
+        self.assertTotals(2, '51.00')
+
+        self.basket.clear()
+        self.assertTotals(0, '0.00')
+
+    def test_basket_count_endpoint_reads_counter(self):
+        from django.db import connection as db_connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.add(self.poster, quantity=4)
+        with CaptureQueriesContext(db_connection) as queries:
+            response = self.client.get(reverse('collections_app:basket_count'))
+        self.assertEqual(response.json(), {'count': 4})
+        # No BasketItem rows are loaded to produce the count
+        self.assertFalse(any(
+            'collections_app_basketitem' in q['sql']
+            for q in queries.captured_queries
+        ))
+
+    def test_ajax_update_returns_fresh_totals(self):
+        item = self.add(self.poster)
+        response = self.client.post(
+            reverse('collections_app:update_basket_item', args=[item.pk]),
+            {'quantity': 3},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        self.assertEqual(response.json()['basket_count'], 3)
+        self.assertEqual(response.json()['basket_total'], 76.5)
+
+    def test_repair_command_fixes_drift(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        self.add(self.original)
+        Basket.objects.filter(pk=self.basket.pk).update(
+            item_count=9, total_amount=Decimal('1.00')
+        )
+        out = StringIO()
+        call_command('repair_basket_totals', stdout=out)
+        self.assertIn('Repaired totals on 1 baskets', out.getvalue())
+        self.assertTotals(1, '100.00')
+
+
+# ============================================================================
+# BASKET BADGE TESTS
+# The navbar basket count is rendered server-side from a cached value
+# ============================================================================
+
+class BasketBadgeTest(TestCase):
+    """Tests for the basket context processor and its cached count."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.user = User.objects.create_user('badge', password='pw')
+        self.client.force_login(self.user)
+        artist = ArtistProfile.objects.create(
+            name='Badge Artist', email='badge@example.com'
+        )
+        self.art = create_artwork_equivalent(
+            'Badge Piece', artist, price=Decimal('10.00'), is_available=True,
+        )
+        self.variant = self.art.variants.get()
+        # Unlimited stock so quantities above one can be added
+        ArtVariant.objects.filter(pk=self.variant.pk).update(stock=None)
+
+    def test_badge_count_is_rendered_into_page(self):
+        basket = Basket.objects.create(user=self.user)
+        BasketItem.objects.create(
+            basket=basket, art=self.art, variant=self.variant, quantity=2
+        )
+        response = self.client.get(reverse('collections_app:basket'))
+        self.assertEqual(response.context['basket_count'], 2)
+        self.assertContains(response, 'data-count="2"')
+
+    def test_cached_count_is_dropped_on_change(self):
+        from .basket_count import basket_count
+
+        basket = Basket.objects.create(user=self.user)
+        self.assertEqual(basket_count(self.user.pk), 0)
+        with self.assertNumQueries(0):
+            basket_count(self.user.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('collections_app:add_to_basket', args=[self.art.pk]),
+                {'variant_id': self.variant.pk, 'quantity': 3},
+                HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+            )
+        self.assertEqual(response.json()['basket_count'], 3)
+        self.assertEqual(basket_count(self.user.pk), 3)
+
+
+# ============================================================================
+# ORDER PLACEMENT TESTS
+# collections_app.orders.place_order is atomic and size-independent
+# ============================================================================
+
+class PlaceOrderTest(TestCase):
+    """Tests for the atomic checkout service."""
+
+    BILLING = {
+        'email': 'buyer@example.com',
+        'full_name': 'Buyer Person',
+        'address_line1': '1 Gallery Road',
+        'address_line2': '',
+        'city': 'Dublin',
+        'postal_code': 'D01',
+        'country': 'IE',
+    }
+
+    def setUp(self):
+        self.user = User.objects.create_user('buyer', password='pw')
+        self.artist = ArtistProfile.objects.create(
+            name='Order Artist', email='order@example.com'
+        )
+        self.basket = Basket.objects.create(user=self.user)
+
+    def fill_basket(self, size):
+        for i in range(size):
+            art = create_artwork_equivalent(
+                f'Order Piece {i}', self.artist, medium='Ink',
+                price=Decimal('10.00'), is_available=True,
+            )
+            # Two of each; originals default to a stock of one
+            variant = art.variants.get()
+            ArtVariant.objects.filter(pk=variant.pk).update(stock=2)
+            BasketItem.objects.create(
+                basket=self.basket, art=art, variant=variant, quantity=2,
+            )
+
+    def place(self):
+        from .orders import place_order
+
+        return place_order(
+            self.user, dict(self.BILLING), payment_method='admin-test',
+            stripe_payment_intent='TEST',
+        )
+
+    def test_order_snapshots_basket_and_empties_it(self):
+        from .models import OrderItem
+
+        self.fill_basket(2)
+        order = self.place()
+
+        self.assertEqual(order.total_amount, Decimal('40.00'))
+        items = list(OrderItem.objects.filter(order=order))
+        self.assertEqual(len(items), 2)
+        self.assertEqual(items[0].artwork_artist, 'Order Artist')
+        self.assertEqual(items[0].artwork_medium, 'Ink')
+        self.assertEqual(items[0].variant_medium, 'Original piece')
+        self.basket.refresh_from_db()
+        self.assertEqual(self.basket.item_count, 0)
+        self.assertFalse(self.basket.items.exists())
+
+    def test_query_count_is_independent_of_basket_size(self):
+        from django.db import connection as db_connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.fill_basket(1)
+        with CaptureQueriesContext(db_connection) as small:
+            self.place()
+
+        self.fill_basket(6)
+        with CaptureQueriesContext(db_connection) as large:
+            self.place()
+        self.assertEqual(len(small), len(large))
+
+    def test_failure_leaves_no_partial_order(self):
+        from unittest import mock
+        from .models import Order, OrderItem
+
+        self.fill_basket(2)
+        with mock.patch.object(
+            OrderItem.objects, 'bulk_create', side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                self.place()
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(self.basket.items.count(), 2)
+
+    def test_empty_basket_is_rejected(self):
+        from .orders import EmptyBasketError
+
+        with self.assertRaises(EmptyBasketError):
+            self.place()
+
+
+# ============================================================================
+# STOCK RESERVATION TESTS
+# collections_app.inventory holds originals per basket and claims at checkout
+# ============================================================================
+
+class StockReservationTest(TestCase):
+    """Tests for basket holds and checkout stock claims."""
+
+    def setUp(self):
+        self.artist = ArtistProfile.objects.create(
+            name='Stock Artist', email='stock@example.com'
+        )
+        self.art = create_artwork_equivalent(
+            'One Of One', self.artist, medium='Oil',
+            price=Decimal('500.00'), is_available=True,
+        )
+        self.variant = self.art.variants.get()
+        self.buyer = User.objects.create_user('first', password='pw')
+        self.rival = User.objects.create_user('second', password='pw')
+        self.basket = Basket.objects.create(user=self.buyer)
+        self.rival_basket = Basket.objects.create(user=self.rival)
+
+    def test_originals_default_to_single_stock(self):
+        self.assertEqual(self.variant.stock, 1)
+        self.assertTrue(self.variant.is_stocked)
+
+    def test_hold_blocks_other_baskets(self):
+        from .inventory import OutOfStockError, reserve
+
+        reserve(self.basket, self.variant, 1)
+        with self.assertRaises(OutOfStockError):
+            reserve(self.rival_basket, self.variant, 1)
+        # The holder can re-reserve its own unit
+        reserve(self.basket, self.variant, 1)
+
+    def test_expired_hold_is_ignored_and_swept(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from .inventory import reserve, sweep_expired
+        from .models import StockReservation
+
+        reserve(self.basket, self.variant, 1)
+        StockReservation.objects.update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+        reserve(self.rival_basket, self.variant, 1)
+        self.assertEqual(sweep_expired(), 1)
+        self.assertEqual(
+            StockReservation.objects.get().basket, self.rival_basket
+        )
+
+    def test_payment_worker_sweeps_expired_holds(self):
+        from datetime import timedelta
+        from io import StringIO
+        from django.core.management import call_command
+        from django.utils import timezone
+        from .inventory import reserve
+        from .models import StockReservation
+
+        reserve(self.basket, self.variant, 1)
+        StockReservation.objects.update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+        out = StringIO()
+        call_command('process_payments', once=True, stdout=out)
+        self.assertFalse(StockReservation.objects.exists())
+        self.assertIn('removed 1 expired reservations', out.getvalue())
+
+    def test_add_to_basket_view_rejects_held_original(self):
+        from .inventory import reserve
+
+        reserve(self.rival_basket, self.variant, 1)
+        client = Client()
+        client.force_login(self.buyer)
+        response = client.post(
+            reverse('collections_app:add_to_basket', args=[self.art.pk]),
+            {'variant_id': self.variant.pk},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(response.json()['success'])
+        self.assertFalse(self.basket.items.exists())
+
+    def test_checkout_claims_stock_and_marks_sold_out(self):
+        from .models import StockReservation
+        from .orders import place_order
+
+        client = Client()
+        client.force_login(self.buyer)
+        client.post(
+            reverse('collections_app:add_to_basket', args=[self.art.pk]),
+            {'variant_id': self.variant.pk},
+        )
+        self.assertTrue(StockReservation.objects.filter(
+            basket=self.basket
+        ).exists())
+
+        place_order(self.buyer, {'email': 'b@example.com'}, 'admin-test')
+
+        self.variant.refresh_from_db()
+        self.assertEqual(self.variant.stock, 0)
+        self.assertFalse(self.variant.is_available)
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_checkout_fails_when_held_elsewhere(self):
+        from .inventory import OutOfStockError, reserve
+        from .models import Order
+        from .orders import place_order
+
+        BasketItem.objects.create(
+            basket=self.basket, art=self.art, variant=self.variant,
+        )
+        reserve(self.rival_basket, self.variant, 1)
+        with self.assertRaises(OutOfStockError):
+            place_order(self.buyer, {'email': 'b@example.com'}, 'admin-test')
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(self.basket.items.count(), 1)
+
+
+# ============================================================================
+# STRIPE PAYMENT TESTS
+# Signed webhooks land in the StripeEvent ledger and are applied out of band
+# ============================================================================
+
+WEBHOOK_SECRET = 'whsec_test_secret'
+
+
+def signed_stripe_header(payload, secret=WEBHOOK_SECRET):
+    """Build a Stripe-Signature header for ``payload`` the way Stripe does."""
+    import hashlib
+    import hmac
+    import time
+
+    timestamp = int(time.time())
+    signature = hmac.new(
+        secret.encode(), f'{timestamp}.{payload}'.encode(), hashlib.sha256
+    ).hexdigest()
+    return f't={timestamp},v1={signature}'
+
+
+@override_settings(
+    STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET,
+    STRIPE_PAYMENTS_ENABLED=True,
+)
+class StripePaymentTest(TestCase):
+    """Tests for the PaymentIntent worker and the webhook event ledger."""
+
+    def setUp(self):
+        from .models import Order
+
+        self.user = User.objects.create_user('payer', password='pw')
+        self.order = Order.objects.create(
+            user=self.user, total_amount=Decimal('25.50'),
+            payment_method='stripe', stripe_payment_intent='pi_123',
+            email='payer@example.com', full_name='Payer',
+            address_line1='1 Road', city='Cork', postal_code='T12',
+            country='IE',
+        )
+
+    def event(self, event_id='evt_1', event_type='payment_intent.succeeded',
+              obj=None):
+        import json
+
+        return json.dumps({
+            'id': event_id,
+            'object': 'event',
+            'type': event_type,
+            'data': {'object': obj or {
+                'id': 'pi_123', 'object': 'payment_intent',
+                'amount': 2550, 'currency': 'usd',
+            }},
+        })
+
+    def deliver(self, payload, signature=None):
+        return self.client.post(
+            reverse('collections_app:stripe_webhook'),
+            data=payload,
+            content_type='application/json',
+            HTTP_STRIPE_SIGNATURE=signature or signed_stripe_header(payload),
+        )
+
+    def test_webhook_rejects_bad_signature(self):
+        from .models import StripeEvent
+
+        payload = self.event()
+        response = self.deliver(
+            payload, signed_stripe_header(payload, 'whsec_wrong')
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(StripeEvent.objects.exists())
+
+    def test_redelivered_event_is_recorded_once(self):
+        from .models import StripeEvent
+
+        payload = self.event()
+        self.assertEqual(self.deliver(payload).status_code, 200)
+        self.assertEqual(self.deliver(payload).status_code, 200)
+        self.assertEqual(StripeEvent.objects.count(), 1)
+        # Acknowledged only: the order is untouched until the worker runs
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, 'pending')
+
+    def test_worker_applies_events_once(self):
+        from .models import StripeEvent
+        from .payments import process_pending_events
+
+        self.deliver(self.event())
+        self.assertEqual(process_pending_events(), 1)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, 'processing')
+        self.assertEqual(
+            StripeEvent.objects.get().status, StripeEvent.PROCESSED
+        )
+
+        # A replay after processing changes nothing
+        self.deliver(self.event())
+        self.assertEqual(process_pending_events(), 0)
+
+        self.deliver(self.event('evt_2', 'charge.refunded', {
+            'id': 'ch_1', 'object': 'charge',
+            'payment_intent': 'pi_123', 'refunded': True,
+        }))
+        process_pending_events()
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, 'refunded')
+
+    def test_underpaid_intent_leaves_order_pending(self):
+        from .payments import process_pending_events
+
+        for event_id, amount, currency in (
+            ('evt_short', 100, 'usd'), ('evt_eur', 2550, 'eur'),
+        ):
+            self.deliver(self.event(event_id, obj={
+                'id': 'pi_123', 'object': 'payment_intent',
+                'amount': amount, 'currency': currency,
+            }))
+        with self.assertLogs('collections_app.payments', 'ERROR') as logs:
+            self.assertEqual(process_pending_events(), 2)
+        self.assertEqual(len(logs.records), 2)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, 'pending')
+
+    def test_failing_event_is_kept_for_retry(self):
+        from unittest import mock
+        from .models import StripeEvent
+        from .payments import EVENT_HANDLERS, process_pending_events
+
+        self.deliver(self.event())
+        with mock.patch.dict(EVENT_HANDLERS, {
+            'payment_intent.succeeded': mock.Mock(side_effect=KeyError('x')),
+        }):
+            self.assertEqual(process_pending_events(), 0)
+        row = StripeEvent.objects.get()
+        self.assertEqual(row.status, StripeEvent.PENDING)
+        self.assertEqual(row.attempts, 1)
+        self.assertIn('KeyError', row.last_error)
+
+        self.assertEqual(process_pending_events(), 1)
+
+    def test_checkout_defers_payment_intent_to_worker(self):
+        from types import SimpleNamespace
+        from unittest import mock
+        from .models import Order
+        from .payments import create_pending_payment_intents
+
+        artist = ArtistProfile.objects.create(
+            name='Pay Artist', email='pay@example.com'
+        )
+        art = create_artwork_equivalent(
+            'Paid Piece', artist, price=Decimal('40.00'), is_available=True,
+        )
+        basket = Basket.objects.create(user=self.user)
+        BasketItem.objects.create(
+            basket=basket, art=art, variant=art.variants.get(),
+        )
+        self.client.force_login(self.user)
+        with mock.patch('stripe.PaymentIntent.create') as create:
+            response = self.client.post(reverse('collections_app:checkout'), {
+                'email': 'payer@example.com', 'first_name': 'Pay',
+                'last_name': 'Er', 'address_line1': '1 Road', 'city': 'Cork',
+                'postal_code': 'T12', 'country': 'IE',
+            })
+            self.assertFalse(create.called)
+
+        order = Order.objects.exclude(pk=self.order.pk).get()
+        self.assertRedirects(
+            response,
+            reverse('collections_app:order_payment', args=[order.pk]),
+            fetch_redirect_response=False,
+        )
+        self.assertIsNone(order.stripe_payment_intent)
+
+        with mock.patch(
+            'stripe.PaymentIntent.create',
+            return_value=SimpleNamespace(
+                id='pi_new', client_secret='pi_new_secret'
+            ),
+        ) as create:
+            self.assertEqual(create_pending_payment_intents(), 1)
+        kwargs = create.call_args.kwargs
+        self.assertEqual(kwargs['amount'], 4000)
+        self.assertEqual(
+            kwargs['idempotency_key'],
+            f'payment-intent-{order.order_number}',
+        )
+        order.refresh_from_db()
+        self.assertEqual(order.stripe_payment_intent, 'pi_new')
+        self.assertEqual(order.stripe_client_secret, 'pi_new_secret')
+
+        # The payment page's polls read the stored secret
+        status_url = reverse(
+            'collections_app:order_payment_status', args=[order.pk]
+        )
+        with mock.patch('stripe.PaymentIntent.retrieve') as retrieve:
+            response = self.client.get(status_url)
+        self.assertFalse(retrieve.called)
+        self.assertEqual(response.json(), {
+            'status': 'pending', 'client_secret': 'pi_new_secret',
+        })
+
+    def claimed_order(self, intent_id='pi_sold', currency='USD'):
+        """Place a Stripe order that claims a one-of-one original."""
+        from .orders import place_order
+
+        artist = ArtistProfile.objects.create(
+            name='Claim Artist', email='claim@example.com'
+        )
+        art = create_artwork_equivalent(
+            'Claimed Piece', artist, price=Decimal('300.00'),
+            is_available=True, currency=currency,
+        )
+        variant = art.variants.get()
+        basket, _ = Basket.objects.get_or_create(user=self.user)
+        BasketItem.objects.create(basket=basket, art=art, variant=variant)
+        order = place_order(
+            self.user, {'email': 'payer@example.com'}, 'stripe',
+            stripe_payment_intent=intent_id,
+        )
+        return order, variant
+
+    def test_cancelled_payment_restocks_the_order(self):
+        from .payments import process_pending_events
+
+        order, variant = self.claimed_order()
+        variant.refresh_from_db()
+        self.assertEqual((variant.stock, variant.is_available), (0, False))
+
+        cancelled = self.event('evt_cancel', 'payment_intent.canceled', {
+            'id': 'pi_sold', 'object': 'payment_intent',
+        })
+        self.deliver(cancelled)
+        with self.captureOnCommitCallbacks(execute=True):
+            process_pending_events()
+        order.refresh_from_db()
+        variant.refresh_from_db()
+        self.assertEqual(order.status, 'cancelled')
+        self.assertEqual((variant.stock, variant.is_available), (1, True))
+        self.assertEqual(
+            Art.objects.get(pk=variant.art_id).storefront_price,
+            Decimal('300.00'),
+        )
+
+        # A redelivered cancellation does not restock twice
+        self.deliver(self.event('evt_cancel_2', 'payment_intent.canceled', {
+            'id': 'pi_sold', 'object': 'payment_intent',
+        }))
+        process_pending_events()
+        variant.refresh_from_db()
+        self.assertEqual(variant.stock, 1)
+
+    def test_restock_keeps_delisted_variants_off_sale(self):
+        from .inventory import restock
+        from .models import ArtVariant, OrderItem
+
+        order, variant = self.claimed_order()
+        # The owner takes the piece off sale while the order is pending
+        ArtVariant.objects.filter(pk=variant.pk).update(stock=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            restock(OrderItem.objects.filter(order=order))
+        variant.refresh_from_db()
+        self.assertEqual((variant.stock, variant.is_available), (2, False))
+
+    def test_stale_pending_orders_are_expired(self):
+        from datetime import timedelta
+        from unittest import mock
+        from django.utils import timezone
+        from .models import Order
+        from .payments import expire_stale_orders
+
+        order, variant = self.claimed_order()
+        with mock.patch('stripe.PaymentIntent.cancel') as cancel:
+            self.assertEqual(expire_stale_orders(), 0)
+            self.assertFalse(cancel.called)
+
+            Order.objects.filter(pk=order.pk).update(
+                created_at=timezone.now() - timedelta(hours=2)
+            )
+            self.assertEqual(expire_stale_orders(), 1)
+        cancel.assert_called_once_with('pi_sold')
+        order.refresh_from_db()
+        variant.refresh_from_db()
+        self.assertEqual(order.status, 'cancelled')
+        self.assertEqual((variant.stock, variant.is_available), (1, True))
+
+    def test_stale_order_kept_when_intent_cannot_be_cancelled(self):
+        import stripe
+        from datetime import timedelta
+        from unittest import mock
+        from django.utils import timezone
+        from .models import Order
+        from .payments import expire_stale_orders
+
+        order, variant = self.claimed_order()
+        Order.objects.filter(pk=order.pk).update(
+            created_at=timezone.now() - timedelta(hours=2)
+        )
+        with mock.patch(
+            'stripe.PaymentIntent.cancel',
+            side_effect=stripe.InvalidRequestError('already paid', None),
+        ):
+            self.assertEqual(expire_stale_orders(), 0)
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'pending')
+
+    def test_stripe_checkout_rejects_other_currencies(self):
+        from .models import Order
+        from .orders import CurrencyMismatchError
+
+        with self.assertRaises(CurrencyMismatchError):
+            self.claimed_order(currency='EUR')
+        self.assertEqual(Order.objects.count(), 1)
+        variant = ArtVariant.objects.get(currency='EUR')
+        self.assertEqual(variant.stock, 1)
+
+    @skipUnless(
+        os.environ.get('STRIPE_MOCK_URL'),
+        'set STRIPE_MOCK_URL to a running stripe-mock server',
+    )
+    def test_payment_intent_against_stub_server(self):
+        from .payments import create_payment_intent
+
+        self.order.stripe_payment_intent = None
+        self.order.save()
+        with self.settings(
+            STRIPE_API_BASE=os.environ['STRIPE_MOCK_URL'],
+            STRIPE_SECRET_KEY='sk_test_123',
+        ):
+            intent = create_payment_intent(self.order)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.stripe_payment_intent, intent.id)
+
+
+# ============================================================================
+# ORDER EMAIL TESTS
+# Confirmation and owner emails are rendered at confirmation and queued
+# ============================================================================
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    ORDER_NOTIFICATION_EMAILS=['owner@example.com'],
+    STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET,
+    STRIPE_PAYMENTS_ENABLED=True,
+)
+class OrderEmailTest(TestCase):
+    """Tests for the queued order confirmation and owner notification."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('mailbuyer', password='pw')
+        artist = ArtistProfile.objects.create(
+            name='Mail Artist', email='mail@example.com'
+        )
+        self.basket = Basket.objects.create(user=self.user)
+        for title in ('Blue Study', 'Red Study'):
+            art = create_artwork_equivalent(
+                title, artist, price=Decimal('30.00'), is_available=True,
+            )
+            BasketItem.objects.create(
+                basket=self.basket, art=art, variant=art.variants.get(),
+            )
+
+    def place(self, payment_method):
+        from .orders import place_order
+
+        return place_order(
+            self.user,
+            {'email': 'buyer@example.com', 'full_name': 'Mail Buyer'},
+            payment_method=payment_method,
+            stripe_payment_intent='pi_mail',
+        )
+
+    def test_emails_are_queued_from_the_item_snapshot(self):
+        from django.core import mail
+        from owner_app.models import OutboundEmail
+        from owner_app.outbox import send_batch
+
+        order = self.place('admin-test')
+        self.assertEqual(len(mail.outbox), 0)
+        confirmation, notification = OutboundEmail.objects.order_by('pk')
+        self.assertEqual(confirmation.to, ['buyer@example.com'])
+        self.assertIn(order.order_number, confirmation.subject)
+        self.assertIn('Blue Study', confirmation.body)
+        self.assertIn('Red Study', confirmation.html_body)
+        self.assertIn('$60.00', confirmation.body)
+        self.assertEqual(notification.to, ['owner@example.com'])
+        self.assertIn('Mail Buyer', notification.body)
+
+        self.assertEqual(send_batch(), (2, 0))
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_stripe_orders_are_confirmed_once_paid(self):
+        import json
+        from owner_app.models import OutboundEmail
+        from .payments import amount_in_minor_units, process_pending_events
+
+        order = self.place('stripe')
+        self.assertFalse(OutboundEmail.objects.exists())
+
+        payload = json.dumps({
+            'id': 'evt_paid', 'object': 'event',
+            'type': 'payment_intent.succeeded',
+            'data': {'object': {
+                'id': 'pi_mail', 'object': 'payment_intent',
+                'amount': amount_in_minor_units(order.total_amount),
+                'currency': 'usd',
+            }},
+        })
+        for event_id in ('evt_paid', 'evt_paid_again'):
+            body = payload.replace('evt_paid', event_id)
+            self.client.post(
+                reverse('collections_app:stripe_webhook'), data=body,
+                content_type='application/json',
+                HTTP_STRIPE_SIGNATURE=signed_stripe_header(body),
+            )
+        process_pending_events()
+        # Two deliveries of the success, but only one confirmation
+        self.assertEqual(OutboundEmail.objects.count(), 2)
+
+
+# ============================================================================
+# RESPONSIVE IMAGE TESTS
+# collections_app.images builds f_auto,q_auto,w_N Cloudinary URLs
+# ============================================================================
+
+class ResponsiveImageTest(TestCase):
+    """Tests for the responsive_image tag and cloudinary_url filter."""
+
+    def render(self, source, **context):
+        from django.template import Context, Template
+
+        return Template('{% load image_tags %}' + source).render(
+            Context(context)
+        )
+
+    def resource(self, resource_type='image', fmt='jpg'):
+        from cloudinary import CloudinaryResource
+
+        return CloudinaryResource(
+            'art/piece', format=fmt, version='1', resource_type=resource_type,
+            type='upload',
+        )
+
+    def test_tag_emits_srcset_sizes_and_lazy_loading(self):
+        html = self.render(
+            '{% responsive_image image "Piece" sizes="50vw" widths="320,640"'
+            ' class="card-img-top" %}',
+            image=self.resource(),
+        )
+        self.assertIn('c_limit,f_auto,q_auto,w_320/v1/art/piece.jpg 320w', html)
+        self.assertIn('w_640/v1/art/piece.jpg 640w', html)
+        self.assertIn('sizes="50vw"', html)
+        self.assertIn('loading="lazy"', html)
+        self.assertIn('class="card-img-top"', html)
+        self.assertIn('alt="Piece"', html)
+
+    def test_eager_image_gets_high_priority(self):
+        html = self.render(
+            '{% responsive_image image "Hero" loading="eager" %}',
+            image=self.resource(),
+        )
+        self.assertIn('fetchpriority="high"', html)
+        self.assertNotIn('loading="lazy"', html)
+
+    def test_videos_and_empty_values_pass_through(self):
+        video = self.resource('video', 'mp4')
+        self.assertEqual(
+            self.render('{{ v|cloudinary_url:640 }}', v=video), video.url
+        )
+        self.assertEqual(
+            self.render('{% responsive_image image "x" %}', image=None), ''
+        )
+
+    def test_cards_use_transformed_urls(self):
+        artist = ArtistProfile.objects.create(
+            name='Image Artist', email='image@example.com'
+        )
+        art = create_artwork_equivalent(
+            'Framed', artist, price=Decimal('5.00'), is_available=True,
+        )
+        Art.objects.filter(pk=art.pk).update(
+            image='image/upload/v1/art/framed.jpg'
+        )
+        response = self.client.get(reverse('collections_app:artwork_list'))
+        self.assertContains(response, 'f_auto,q_auto,w_320')
+        self.assertContains(response, 'srcset=')
+
+
+# ============================================================================
+# CLOUDINARY URL CACHE TESTS
+# collections_app.images.resource_url memoizes built delivery URLs
+# ============================================================================
+
+class CloudinaryUrlCacheTest(TestCase):
+    """Tests for the LRU and shared-cache backed URL resolver."""
+
+    def setUp(self):
+        from .images import _cached_url
+
+        _cached_url.cache_clear()
+        self.addCleanup(_cached_url.cache_clear)
+
+    def resource(self, version='1'):
+        from cloudinary import CloudinaryResource
+
+        return CloudinaryResource(
+            'art/cached', format='jpg', version=version,
+            resource_type='image', type='upload',
+        )
+
+    def test_urls_are_built_once_per_key(self):
+        from unittest import mock
+        from . import images
+
+        with mock.patch.object(
+            images, 'cloudinary_url', wraps=images.cloudinary_url
+        ) as build:
+            first = images.image_url(self.resource(), 640)
+            self.assertEqual(images.image_url(self.resource(), 640), first)
+            self.assertEqual(build.call_count, 1)
+
+            # A new version or transformation is a different key
+            images.image_url(self.resource(version='2'), 640)
+            images.image_url(self.resource(), 320)
+            self.assertEqual(build.call_count, 3)
+        self.assertEqual(first, self.resource().build_url(
+            fetch_format='auto', quality='auto', width=640, crop='limit',
+        ))
+
+    @override_settings(CLOUDINARY_URL_CACHE_ALIAS='default')
+    def test_shared_cache_is_filled_and_reused(self):
+        from unittest import mock
+        from django.core.cache import cache
+        from . import images
+
+        cache.clear()
+        url = images.resource_url(self.resource())
+        images._cached_url.cache_clear()
+        with mock.patch.object(images, 'cloudinary_url') as build:
+            # Another process: its LRU is empty but the shared cache is not
+            self.assertEqual(images.resource_url(self.resource()), url)
+            self.assertFalse(build.called)
+
+    def test_admin_preview_uses_thumbnail_url(self):
+        from django.contrib.admin.sites import site
+
+        artist = ArtistProfile.objects.create(
+            name='Admin Artist', email='admin-img@example.com'
+        )
+        art = create_artwork_equivalent('Preview', artist)
+        Art.objects.filter(pk=art.pk).update(
+            image='image/upload/v1/art/preview.jpg'
+        )
+        art.refresh_from_db()
+        html = site._registry[Art].image_preview(art)
+        self.assertIn('c_limit,f_auto,q_auto,w_160/v1/art/preview.jpg', html)
+
+
+# ============================================================================
+# GALLERY CAROUSEL TESTS
+# Gallery carousels load a window of arts per collection, plus "Load more"
+# ============================================================================
+
+@override_settings(GALLERY_CAROUSEL_SIZE=3)
+class GalleryCarouselTest(TestCase):
+    """Tests for the windowed carousel prefetch and its fragment endpoint."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.artist = ArtistProfile.objects.create(
+            name='Gallery Artist', email='gallery@example.com'
+        )
+        self.big = Collection.objects.create(artist=self.artist, name='Big')
+        self.small = Collection.objects.create(
+            artist=self.artist, name='Small'
+        )
+        self.big_arts = [
+            Art.objects.create(collection=self.big, title=f'Big {i}')
+            for i in range(7)
+        ]
+        self.small_arts = [
+            Art.objects.create(collection=self.small, title=f'Small {i}')
+            for i in range(2)
+        ]
+
+    def test_gallery_prefetches_only_the_first_window(self):
+        response = self.client.get(reverse('collections_app:gallery'))
+        collections = {c.pk: c for c in response.context['collections']}
+
+        big = collections[self.big.pk]
+        self.assertEqual(
+            [a.pk for a in big.carousel_arts],
+            [a.pk for a in self.big_arts[:3]],
+        )
+        self.assertEqual(big.art_count, 7)
+        self.assertEqual(
+            [a.pk for a in collections[self.small.pk].carousel_arts],
+            [a.pk for a in self.small_arts],
+        )
+        self.assertContains(response, 'Big 2')
+        self.assertNotContains(response, 'Big 3')
+        # Only the collection that has more arts offers "Load more"
+        self.assertContains(response, 'Load more (7 artworks)', count=1)
+
+    def test_carousel_arts_defer_unused_columns(self):
+        response = self.client.get(reverse('collections_app:gallery'))
+        art = next(iter(response.context['collections'])).carousel_arts[0]
+        self.assertEqual(
+            art.get_deferred_fields() & {'id', 'title', 'image'}, set()
+        )
+        self.assertIn('description', art.get_deferred_fields())
+
+    def test_gallery_query_count_does_not_grow_with_collections(self):
+        url = reverse('collections_app:gallery_debug')
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+        extra = Collection.objects.create(artist=self.artist, name='Extra')
+        for i in range(5):
+            Art.objects.create(collection=extra, title=f'Extra {i}')
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+    def test_load_more_returns_the_next_window(self):
+        url = reverse(
+            'collections_app:gallery_collection_arts', args=[self.big.pk]
+        )
+        page = self.client.get(url, {'offset': 3}).json()
+        self.assertEqual(page['count'], 3)
+        self.assertEqual(page['next_offset'], 6)
+        self.assertTrue(page['has_more'])
+        self.assertIn('Big 3', page['html'])
+        self.assertIn('Big 5', page['html'])
+        self.assertNotIn('Big 6', page['html'])
+        self.assertNotIn('active', page['html'])
+
+        last = self.client.get(url, {'offset': 6}).json()
+        self.assertEqual(last['count'], 1)
+        self.assertFalse(last['has_more'])
+
+    def test_load_more_rejects_a_bad_offset(self):
+        url = reverse(
+            'collections_app:gallery_collection_arts', args=[self.big.pk]
+        )
+        self.assertEqual(
+            self.client.get(url, {'offset': 'x'}).status_code, 400
+        )
+
+
+# ============================================================================
+# LISTING COLUMN TESTS
+# Listing views select only the columns their templates read
+# ============================================================================
+
+def selected_columns(obj):
+    """Concrete columns loaded on ``obj`` (everything not deferred)."""
+    loaded = {f.attname for f in obj._meta.concrete_fields}
+    return loaded - obj.get_deferred_fields()
+
+
+class ListingColumnsTest(TestCase):
+    """Tests for the collections_app.listings projections."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.artist = ArtistProfile.objects.create(
+            name='Column Artist', email='columns@example.com'
+        )
+        self.add_artworks(2)
+
+    def add_artworks(self, count):
+        for i in range(count):
+            create_artwork_equivalent(
+                f'Column {Art.objects.count()}', self.artist,
+                price=Decimal('120.00'), is_available=True,
+                is_featured=True, description='Long text ' * 200,
+                width_cm=Decimal('30'), height_cm=Decimal('40'),
+            )
+
+    def assertQueriesDoNotGrow(self, url, params=None):
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as before:
+            self.client.get(url, params)
+        self.add_artworks(3)
+        with self.assertNumQueries(len(before)):
+            response = self.client.get(url, params)
+        return response
+
+    def test_artwork_list_selects_card_columns(self):
+        response = self.client.get(reverse('collections_app:artwork_list'))
+        expected = {
+            'id', 'title', 'image', 'price', 'currency', 'is_available',
+            'created_at', 'storefront_price', 'storefront_currency',
+            'storefront_medium', 'storefront_original_unavailable',
+        }
+        for art in response.context['artworks']:
+            self.assertEqual(selected_columns(art), expected)
+        for art in response.context['featured_artworks']:
+            self.assertEqual(selected_columns(art), expected)
+        self.assertQueriesDoNotGrow(reverse('collections_app:artwork_list'))
+
+    def test_artworks_by_artist_selects_row_columns(self):
+        url = reverse(
+            'collections_app:artworks_by_artist', args=[self.artist.pk]
+        )
+        response = self.client.get(url)
+        art = response.context['artworks'][0]
+        self.assertEqual(selected_columns(art), {
+            'id', 'title', 'image', 'medium', 'year_created', 'width_cm',
+            'height_cm', 'depth_cm', 'price', 'currency', 'is_featured',
+        })
+        self.assertContains(response, '30.00 x 40.00 cm')
+        self.assertQueriesDoNotGrow(url)
+
+    def test_price_search_selects_row_columns_and_artist_name(self):
+        url = reverse('collections_app:artwork_search_by_price')
+        response = self.client.get(url)
+        art = response.context['artworks'][0]
+        self.assertEqual(selected_columns(art), {
+            'id', 'collection_id', 'title', 'image', 'medium', 'width_cm',
+            'height_cm', 'depth_cm', 'currency', 'storefront_currency',
+            'min_available_price', 'max_available_price',
+        })
+        self.assertNotIn('description', selected_columns(art))
+        self.assertContains(response, 'Column Artist')
+        self.assertQueriesDoNotGrow(url)
+
+
+# ============================================================================
+# STOREFRONT INDEX TESTS
+# explain_storefront compares query plans with and without the new indexes
+# ============================================================================
+
+class ExplainStorefrontCommandTest(TestCase):
+    """Tests for the seeded EXPLAIN before/after benchmark."""
+
+    def test_plans_are_written_and_everything_is_rolled_back(self):
+        import json
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+
+        with tempfile.NamedTemporaryFile(suffix='.json') as fh:
+            call_command(
+                'explain_storefront', seed_arts=40, output=fh.name,
+                stdout=StringIO(),
+            )
+            report = json.load(open(fh.name))
+
+        self.assertEqual(set(report['before']), set(report['after']))
+        self.assertIn('artwork_list', report['after'])
+        self.assertIn('inbox', report['after'])
+        if connection.vendor == 'sqlite':
+            # The keyset pages walk art_listing_idx instead of sorting,
+            # and a "Load more" page starts at the cursor
+            for name in ('artwork_list', 'artwork_list_next'):
+                self.assertIn('art_listing_idx', report['after'][name])
+                self.assertNotIn('TEMP B-TREE', report['after'][name])
+                self.assertIn('TEMP B-TREE', report['before'][name])
+            self.assertIn('(created_at<?)', report['after']['artwork_list_next'])
+        # The seeded rows and the dropped indexes did not survive
+        self.assertFalse(Art.objects.exists())
+        with connection.cursor() as cursor:
+            indexes = connection.introspection.get_constraints(
+                cursor, Art._meta.db_table
+            )
+        self.assertIn('art_listing_idx', indexes)
+
+    def test_seed_is_deterministic(self):
+        from django.db import transaction
+        from .seed import seed_catalog
+
+        def load():
+            with transaction.atomic():
+                seed_catalog(arts=30, seed=7, messages=5)
+                rows = list(
+                    Art.objects.order_by('title').values_list(
+                        'title', 'price', 'storefront_price', 'created_at'
+                    )
+                )
+                transaction.set_rollback(True)
+            return rows
+
+        first = load()
+        self.assertEqual(first, load())
+        self.assertTrue(any(row[2] is not None for row in first))
+
+    def test_seed_fills_the_shop(self):
+        from io import StringIO
+        from unittest import mock
+        from django.core.management import CommandError, call_command
+        from .models import Basket, Order
+        from .search import refresh_search_vectors
+
+        out = StringIO()
+        with mock.patch(
+            'collections_app.search.refresh_search_vectors',
+            wraps=refresh_search_vectors,
+        ) as refresh:
+            call_command(
+                'seed_catalog', arts=100, exhibitions=5, seed=3, messages=5,
+                stdout=out,
+            )
+        self.assertEqual(Art.objects.count(), 100)
+        self.assertEqual(ArtVariant.objects.count(), 300)
+        # Search documents were built for the bulk-inserted art
+        self.assertEqual(refresh.call_args.args[0].count(), 100)
+        # Sold originals are sold out, the rest have their one unit
+        originals = ArtVariant.objects.filter(medium=ArtVariant.ORIGINAL)
+        self.assertTrue(originals.filter(is_available=False).exists())
+        self.assertFalse(originals.filter(is_available=False, stock=1).exists())
+        self.assertFalse(originals.filter(is_available=True, stock=0).exists())
+        self.assertEqual(Order.objects.count(), 10)
+        self.assertFalse(Order.objects.filter(items__isnull=True).exists())
+        # Totals were refreshed after the bulk inserts
+        basket = Basket.objects.order_by('pk').first()
+        self.assertEqual(basket.item_count, basket.items.count())
+        self.assertIn('orders: 10', out.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command('seed_catalog', arts=10, seed=3, stdout=StringIO())
+
+
+class BenchmarkStorefrontCommandTest(TestCase):
+    """Tests for the per-page latency/query/memory benchmark."""
+
+    def run_command(self, **options):
+        import json
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+
+        with tempfile.NamedTemporaryFile(suffix='.json') as fh:
+            call_command(
+                'benchmark_storefront', seed_arts=40, iterations=3,
+                warmup=1, output=fh.name, stdout=StringIO(),
+                stderr=StringIO(), **options
+            )
+            return json.load(open(fh.name))
+
+    def test_report_covers_every_page(self):
+        report = self.run_command()
+
+        self.assertEqual(report['meta']['arts'], 40)
+        self.assertIn('checkout', report['results'])
+        for name, result in report['results'].items():
+            self.assertEqual(result['status'], 200, name)
+            self.assertGreater(result['queries'], 0, name)
+            self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+            self.assertGreater(result['peak_kib'], 0)
+        # The seeded rows were rolled back
+        self.assertFalse(Art.objects.exists())
+
+    def test_baseline_regressions_fail_the_command(self):
+        import json
+        import tempfile
+        from django.core.management import CommandError
+        from .benchmarks import compare
+
+        report = self.run_command(page=['artwork_list'])
+        baseline = json.loads(json.dumps(report))
+        self.assertEqual(compare(report, baseline), [])
+
+        baseline['results']['artwork_list']['queries'] -= 1
+        problems = compare(report, baseline)
+        self.assertEqual(len(problems), 1)
+        self.assertIn('artwork_list: queries', problems[0])
+
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as fh:
+            json.dump(baseline, fh)
+            fh.flush()
+            with self.assertRaises(CommandError):
+                self.run_command(page=['artwork_list'], baseline=fh.name)
+
+
+# ============================================================================
+# PRICE RANGE TESTS
+# Price search and facets read the min/max available variant price
+# ============================================================================
+
+class PriceRangeTest(TestCase):
+    """Tests for the min/max_available_price projection and its users."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.artist = ArtistProfile.objects.create(
+            name='Price Artist', email='price@example.com'
+        )
+        # Art.price is stale on purpose: variants are the source of truth
+        self.cheap = self.make_art('Cheap', poster='40.00')
+        self.mixed = self.make_art('Mixed', original='2400.00', poster='90.00')
+        self.dear = self.make_art('Dear', original='3000.00')
+
+    def make_art(self, title, original=None, poster=None):
+        collection, _ = Collection.objects.get_or_create(
+            artist=self.artist, name='Priced'
+        )
+        art = Art.objects.create(
+            collection=collection, title=title, price=Decimal('1.00')
+        )
+        for medium, price in (
+            (ArtVariant.ORIGINAL, original), (ArtVariant.POSTER, poster)
+        ):
+            if price is not None:
+                ArtVariant.objects.create(
+                    art=art, medium=medium, price=Decimal(price),
+                    is_available=True,
+                )
+        art.refresh_from_db()
+        return art
+
+    def search(self, **params):
+        response = self.client.get(
+            reverse('collections_app:artwork_search_by_price'), params
+        )
+        return [a.pk for a in response.context['artworks']]
+
+    def test_projection_follows_available_variants(self):
+        self.assertEqual(self.mixed.min_available_price, Decimal('90.00'))
+        self.assertEqual(self.mixed.max_available_price, Decimal('2400.00'))
+
+        poster = self.mixed.variants.get(medium=ArtVariant.POSTER)
+        poster.is_available = False
+        poster.save()
+        self.mixed.refresh_from_db()
+        self.assertEqual(self.mixed.min_available_price, Decimal('2400.00'))
+
+    def test_search_matches_variant_prices(self):
+        self.assertEqual(
+            self.search(min_price='50', max_price='100'), [self.mixed.pk]
+        )
+        self.assertEqual(
+            self.search(min_price='2500'), [self.dear.pk]
+        )
+        self.assertEqual(
+            self.search(max_price='50'), [self.cheap.pk]
+        )
+        # Junk bounds are ignored rather than failing the page
+        self.assertEqual(len(self.search(min_price='abc')), 3)
+
+    def test_search_sorts_by_lowest_available_price(self):
+        self.assertEqual(
+            self.search(),
+            [self.cheap.pk, self.mixed.pk, self.dear.pk],
+        )
+        self.assertEqual(
+            self.search(sort='desc'),
+            [self.dear.pk, self.mixed.pk, self.cheap.pk],
+        )
+
+    def test_search_shows_price_range(self):
+        response = self.client.get(
+            reverse('collections_app:artwork_search_by_price')
+        )
+        self.assertContains(response, 'USD 90.00 – 2,400.00')
+
+    def test_one_variant_must_fit_the_range(self):
+        # A 20.00 poster and a 2,000.00 original span 100-500 between
+        # them, but neither can be bought within it
+        split = self.make_art('Split', original='2000.00', poster='20.00')
+        self.assertEqual(self.search(min_price='100', max_price='500'), [])
+        self.assertEqual(
+            self.search(min_price='10', max_price='50'),
+            [split.pk, self.cheap.pk],
+        )
+        self.assertEqual(
+            self.search(min_price='1500', max_price='2100'), [split.pk]
+        )
+
+    @override_settings(ARTWORK_LIST_PAGE_SIZE=1)
+    def test_load_more_link_keeps_price_range(self):
+        response = self.client.get(
+            reverse('collections_app:artwork_list'),
+            {'min_price': '0', 'max_price': '100'},
+        )
+        self.assertContains(
+            response, 'min_price=0&amp;max_price=100&amp;cursor='
+        )
+
+    def test_range_query_narrows_on_projection(self):
+        sql = str(
+            Art.storefront.in_price_range(Decimal('10'), Decimal('20'))
+            .order_by('min_available_price').query
+        )
+        self.assertIn('max_available_price', sql)
+        self.assertIn('EXISTS', sql)
+        # Without bounds only the projection is read
+        self.assertNotIn(
+            'artvariant', str(Art.storefront.in_price_range().query)
+        )
+
+    def test_histogram_counts_variant_prices_ignoring_price_filter(self):
+        url = reverse('collections_app:artwork_price_histogram')
+        data = self.client.get(url, {'min_price': '2500'}).json()
+        self.assertEqual(data['total'], 3)
+        self.assertEqual(Decimal(data['min']), Decimal('40.00'))
+        self.assertEqual(Decimal(data['max']), Decimal('3000.00'))
+        self.assertEqual(Decimal(data['buckets'][0]['min']), Decimal('0'))
+        self.assertEqual(Decimal(data['buckets'][0]['max']), Decimal('500'))
+        self.assertEqual(data['buckets'][0]['count'], 2)
+        self.assertLessEqual(len(data['buckets']), 12)
+        # Mixed counts under its poster and its original, matching what
+        # the price filter returns for each bucket's range
+        for bucket in data['buckets']:
+            self.assertEqual(bucket['count'], len(self.search(
+                min_price=bucket['min'],
+                max_price=str(Decimal(bucket['max']) - Decimal('0.01')),
+            )))
+        self.assertEqual(sum(b['count'] for b in data['buckets']), 4)
+
+    def test_histogram_follows_other_filters(self):
+        url = reverse('collections_app:artwork_price_histogram')
+        data = self.client.get(url, {'search': 'Dear'}).json()
+        self.assertEqual(data['total'], 1)
+
+        empty = self.client.get(url, {'search': 'Nothing'}).json()
+        self.assertEqual(empty, {
+            'min': None, 'max': None, 'total': 0, 'buckets': [],
+        })
+
+    def test_migration_backfill_matches_projection(self):
+        from importlib import import_module
+        from django.apps import apps
+
+        migration = import_module(
+            'collections_app.migrations.0025_art_available_price_range'
+        )
+        Art.objects.update(min_available_price=None, max_available_price=None)
+        migration.backfill_price_range(apps, None)
+        self.mixed.refresh_from_db()
+        self.assertEqual(self.mixed.min_available_price, Decimal('90.00'))
+        self.assertEqual(self.mixed.max_available_price, Decimal('2400.00'))
+
+
+# ============================================================================
+# INSTRUMENTATION TESTS
+# config.instrumentation measures requests and enforces QUERY_BUDGETS
+# ============================================================================
+
+# Installs InstrumentationMiddleware with strict QUERY_BUDGETS, as
+# INSTRUMENTATION_ENABLED and QUERY_BUDGET_STRICT would in settings
+instrumented = override_settings(
+    MIDDLEWARE=[
+        'config.instrumentation.InstrumentationMiddleware',
+        *settings.MIDDLEWARE,
+    ],
+    INSTRUMENTATION_ENABLED=True,
+    QUERY_BUDGET_STRICT=True,
+)
+
+
+@instrumented
+class InstrumentationMiddlewareTest(TestCase):
+    """Tests for the per-request metrics, Server-Timing and budgets."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.artist = ArtistProfile.objects.create(
+            name='Metrics Artist', email='metrics@example.com'
+        )
+        create_artwork_equivalent(
+            'Measured', self.artist, price=Decimal('10.00'),
+            is_available=True,
+        )
+
+    def get_logged(self, url):
+        import json
+
+        with self.assertLogs('config.instrumentation', 'INFO') as logs:
+            response = self.client.get(url)
+        return response, json.loads(logs.records[-1].getMessage())
+
+    def test_metrics_are_logged_and_sent_as_server_timing(self):
+        from django.test.utils import CaptureQueriesContext
+
+        url = reverse('collections_app:artwork_list')
+        with CaptureQueriesContext(connection) as queries:
+            response, record = self.get_logged(url)
+
+        self.assertEqual(record['view'], 'collections_app:artwork_list')
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record['queries'], len(queries))
+        self.assertEqual(record['response_bytes'], len(response.content))
+        self.assertGreater(record['template_ms'], 0)
+        timing = response['Server-Timing']
+        self.assertIn(f'desc="{len(queries)} queries"', timing)
+        self.assertIn('tpl;dur=', timing)
+        self.assertIn('total;dur=', timing)
+
+    def test_budget_exceeded_fails_in_strict_mode(self):
+        from config.instrumentation import QueryBudgetExceeded
+
+        url = reverse('collections_app:artwork_list')
+        with self.settings(
+            QUERY_BUDGETS={'collections_app:artwork_list': 0}
+        ):
+            # django.request logs the failure as a server error
+            with self.assertLogs('django.request', 'ERROR'):
+                with self.assertRaises(QueryBudgetExceeded):
+                    self.client.get(url)
+
+    def test_budget_exceeded_only_warns_when_not_strict(self):
+        url = reverse('collections_app:artwork_list')
+        with self.settings(
+            QUERY_BUDGETS={'collections_app:artwork_list': 0},
+            QUERY_BUDGET_STRICT=False,
+        ):
+            with self.assertLogs('config.instrumentation', 'WARNING') as logs:
+                response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('QUERY_BUDGETS allows 0', logs.output[-1])
+
+    def test_homepage_logs_context_errors(self):
+        from unittest import mock
+
+        with mock.patch(
+            'collections_app.homepage.get_homepage_context',
+            side_effect=RuntimeError('boom'),
+        ):
+            with self.assertLogs('collections_app.views', 'ERROR') as logs:
+                response = self.client.get(reverse('collections_app:index'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('boom', logs.output[0])
+
+
+@instrumented
+class QueryBudgetTest(TestCase):
+    """Budgeted views stay within their QUERY_BUDGETS entry."""
+
+    def setUp(self):
+        from datetime import date
+        from events_app.models import Exhibition
+
+        self.artist = ArtistProfile.objects.create(
+            name='Budget Artist', email='budget@example.com'
+        )
+        self.arts = [
+            create_artwork_equivalent(
+                f'Budget {i}', self.artist, price=Decimal('10.00') * (i + 1),
+                is_available=True, is_featured=True,
+            )
+            for i in range(3)
+        ]
+        self.exhibition = Exhibition.objects.create(
+            title='Budget Show', start_date=date(2030, 1, 1),
+        )
+        self.owner = User.objects.create_superuser('budget', password='pw')
+
+    def assertWithinBudget(self, client, url):
+        # A strict budget raises QueryBudgetExceeded out of the request
+        with self.subTest(url=url):
+            with self.assertLogs('config.instrumentation', 'INFO'):
+                response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+    def test_storefront_views(self):
+        art = self.arts[0]
+        for url in (
+            reverse('collections_app:index'),
+            reverse('collections_app:gallery'),
+            reverse(
+                'collections_app:gallery_collection_arts',
+                args=[art.collection_id],
+            ),
+            reverse('collections_app:artwork_list'),
+            reverse('collections_app:artwork_list_page'),
+            reverse('collections_app:artwork_price_histogram'),
+            reverse('collections_app:artwork_search_by_price'),
+            reverse(
+                'collections_app:artworks_by_artist', args=[self.artist.pk]
+            ),
+            reverse('collections_app:artwork_detail', args=[art.pk]),
+        ):
+            self.assertWithinBudget(self.client, url)
+
+    def test_owner_views(self):
+        self.client.force_login(self.owner)
+        for url in (
+            reverse('collections_app:basket'),
+            reverse('collections_app:manage_media'),
+            reverse('collections_app:messages'),
+            reverse('owner_app:art_list'),
+            reverse('owner_app:assign_art', args=[self.exhibition.pk]),
+        ):
+            self.assertWithinBudget(self.client, url)
+
+    def test_assign_art_post(self):
+        url = reverse('owner_app:assign_art', args=[self.exhibition.pk])
+        self.client.force_login(self.owner)
+        for selected in ([a.pk for a in self.arts], [self.arts[0].pk]):
+            with self.assertLogs('config.instrumentation', 'INFO'):
+                response = self.client.post(url, {'art': selected})
+            self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            list(self.exhibition.exhibition_arts.values_list(
+                'art_id', flat=True
+            )),
+            [self.arts[0].pk],
+        )
+
+
+# ============================================================================
+# ART FORM TESTS
+# Variants are written by one upsert, reusing the variants loaded for editing
+# ============================================================================
+
+class ArtFormVariantUpsertTest(TestCase):
+    """Tests for ArtForm.save() and its variant upsert."""
+
+    def setUp(self):
+        self.artist = ArtistProfile.objects.create(
+            name='Form Artist', email='form-artist@example.com'
+        )
+        self.collection = Collection.objects.create(
+            artist=self.artist, name='Form Collection'
+        )
+
+    def form_data(self, **overrides):
+        data = {
+            'collection': self.collection.pk,
+            'title': 'Form Art',
+            'currency': 'EUR',
+            'original_available': 'on',
+            'original_price': '900.00',
+            'poster_available': 'on',
+            'poster_price': '40.00',
+            'digital_price': '10.00',
+        }
+        data.update(overrides)
+        return {k: v for k, v in data.items() if v is not None}
+
+    def variant_queries(self, queries):
+        table = ArtVariant._meta.db_table
+        return [q['sql'] for q in queries if table in q['sql']]
+
+    def edit(self, art, data):
+        from django.test.utils import CaptureQueriesContext
+        from .forms import ArtForm
+
+        art = Art.objects.prefetch_related('variants').get(pk=art.pk)
+        with CaptureQueriesContext(connection) as queries:
+            form = ArtForm(data, instance=art)
+            self.assertTrue(form.is_valid(), form.errors)
+            form.save()
+        return self.variant_queries(queries.captured_queries)
+
+    def test_create_writes_variants_and_projection(self):
+        from .forms import ArtForm
+
+        form = ArtForm(self.form_data())
+        self.assertTrue(form.is_valid(), form.errors)
+        art = form.save()
+
+        variants = {v.medium: v for v in art.variants.all()}
+        self.assertEqual(len(variants), 3)
+        self.assertEqual(variants[ArtVariant.ORIGINAL].stock, 1)
+        self.assertIsNone(variants[ArtVariant.POSTER].stock)
+        self.assertFalse(variants[ArtVariant.DIGITAL].is_available)
+        self.assertEqual(variants[ArtVariant.POSTER].currency, 'EUR')
+
+        art.refresh_from_db()
+        self.assertTrue(art.is_available)
+        self.assertEqual(art.storefront_price, Decimal('900.00'))
+        self.assertEqual(art.storefront_medium, ArtVariant.ORIGINAL)
+        self.assertEqual(art.min_available_price, Decimal('40.00'))
+
+    def test_edit_upserts_variants_in_one_query(self):
+        from .forms import ArtForm
+
+        form = ArtForm(self.form_data())
+        self.assertTrue(form.is_valid(), form.errors)
+        art = form.save()
+        original = art.variants.get(medium=ArtVariant.ORIGINAL)
+        original.stock = 0
+        original.save()
+
+        sql = self.edit(art, self.form_data(
+            original_available=None, poster_price='55.00',
+        ))
+        self.assertEqual(len(sql), 1)
+        self.assertIn('ON CONFLICT', sql[0].upper())
+
+        variants = {v.medium: v for v in art.variants.all()}
+        self.assertEqual(len(variants), 3)
+        # Stock and created_at are not the form's to change
+        self.assertEqual(variants[ArtVariant.ORIGINAL].stock, 0)
+        self.assertEqual(
+            variants[ArtVariant.ORIGINAL].created_at, original.created_at
+        )
+        self.assertFalse(variants[ArtVariant.ORIGINAL].is_available)
+        self.assertEqual(variants[ArtVariant.POSTER].price, Decimal('55.00'))
+        art.refresh_from_db()
+        self.assertEqual(art.storefront_medium, ArtVariant.POSTER)
+        self.assertEqual(art.max_available_price, Decimal('55.00'))
+
+    def test_unchanged_variants_are_not_written(self):
+        from .forms import ArtForm
+
+        form = ArtForm(self.form_data())
+        self.assertTrue(form.is_valid(), form.errors)
+        art = form.save()
+
+        sql = self.edit(art, self.form_data(title='Renamed'))
+        self.assertEqual(sql, [])
+        art.refresh_from_db()
+        self.assertEqual(art.title, 'Renamed')
+
+    def test_commit_false_writes_variants_on_save_m2m(self):
+        from .forms import ArtForm
+
+        form = ArtForm(self.form_data())
+        self.assertTrue(form.is_valid(), form.errors)
+        art = form.save(commit=False)
+        art.save()
+        self.assertFalse(art.variants.exists())
+        form.save_m2m()
+        self.assertEqual(art.variants.count(), 3)
+
+
+# ============================================================================
+# CATALOG IMPORT TESTS
+# import_catalog streams CSV/JSONL rows into batched upserts
+# ============================================================================
+
+class ImportCatalogCommandTest(TestCase):
+    """Tests for the import_catalog command and collections_app.importer."""
+
+    HEADER = (
+        'artist_email,collection,title,medium,price,'
+        'original_price,original_available,poster_price,poster_available\n'
+    )
+
+    def setUp(self):
+        self.artist = ArtistProfile.objects.create(
+            name='Import Artist', email='import@example.com'
+        )
+
+    def csv_rows(self, count, start=0):
+        return ''.join(
+            f'import@example.com,Imported,Piece {i},Oil,{100 + i}.00,'
+            f'{100 + i}.00,yes,25.00,yes\n'
+            for i in range(start, start + count)
+        )
+
+    def run_import(self, text, suffix='.csv', **options):
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+
+        with tempfile.NamedTemporaryFile('w', suffix=suffix) as fh:
+            fh.write(text)
+            fh.flush()
+            out = StringIO()
+            call_command(
+                'import_catalog', fh.name, stdout=out, stderr=StringIO(),
+                **options
+            )
+        return out.getvalue()
+
+    def test_csv_creates_collections_art_and_variants(self):
+        out = self.run_import(self.HEADER + self.csv_rows(3))
+
+        collection = Collection.objects.get(artist=self.artist)
+        self.assertEqual(collection.name, 'Imported')
+        self.assertEqual(collection.arts.count(), 3)
+        art = Art.objects.get(title='Piece 1')
+        self.assertTrue(art.is_available)
+        self.assertIsNotNone(art.created_at)
+        self.assertEqual(art.storefront_price, Decimal('101.00'))
+        self.assertEqual(art.min_available_price, Decimal('25.00'))
+        original = art.variants.get(medium=ArtVariant.ORIGINAL)
+        self.assertEqual(original.stock, 1)
+        self.assertEqual(art.variants.count(), 2)
+        self.assertIn('3 rows', out)
+
+    def test_reimport_updates_only_the_given_columns(self):
+        self.run_import(self.HEADER + self.csv_rows(2))
+        art = Art.objects.get(title='Piece 0')
+        original = art.variants.get(medium=ArtVariant.ORIGINAL)
+        original.stock = 0
+        original.save()
+
+        self.run_import(
+            '{"artist_email": "import@example.com", "collection": "Imported",'
+            ' "title": "Piece 0", "poster_price": 60, '
+            '"original_available": false}\n',
+            suffix='.jsonl',
+        )
+
+        self.assertEqual(Art.objects.count(), 2)
+        self.assertEqual(Collection.objects.count(), 1)
+        art.refresh_from_db()
+        self.assertEqual(art.medium, 'Oil')
+        self.assertEqual(art.price, Decimal('100.00'))
+        self.assertEqual(art.storefront_medium, ArtVariant.POSTER)
+        self.assertEqual(art.storefront_price, Decimal('60.00'))
+        original.refresh_from_db()
+        self.assertFalse(original.is_available)
+        self.assertEqual(original.stock, 0)
+
+    def test_invalid_rows_abort_the_import(self):
+        from django.core.management import CommandError
+
+        text = (
+            self.HEADER + self.csv_rows(2)
+            + 'import@example.com,Imported,Bad,Oil,lots,,,,\n'
+            + 'nobody@example.com,Imported,Orphan,Oil,1.00,,,,\n'
+        )
+        with self.assertRaisesMessage(CommandError, '2 invalid rows'):
+            self.run_import(text)
+        self.assertFalse(Art.objects.exists())
+        self.assertFalse(Collection.objects.exists())
+
+        self.run_import(text, skip_invalid=True)
+        self.assertEqual(
+            set(Art.objects.values_list('title', flat=True)),
+            {'Piece 0', 'Piece 1'},
+        )
+
+    def test_dry_run_writes_nothing(self):
+        out = self.run_import(
+            self.HEADER + self.csv_rows(2), dry_run=True
+        )
+        self.assertIn('Dry run', out)
+        self.assertFalse(Art.objects.exists())
+
+    def test_queries_per_batch_do_not_grow_with_rows(self):
+        from io import StringIO
+        from django.test.utils import CaptureQueriesContext
+        from .importer import import_catalog
+
+        def queries_for(text):
+            with CaptureQueriesContext(connection) as queries:
+                stats, errors = import_catalog(StringIO(text), 'csv')
+            self.assertEqual(errors, [])
+            return len(queries)
+
+        few = queries_for(self.HEADER + self.csv_rows(3))
+        # Creates and updates in one batch: 3 existing rows plus 27 new ones
+        many = queries_for(self.HEADER + self.csv_rows(30))
+        self.assertEqual(Art.objects.count(), 30)
+        self.assertLessEqual(many, few + 2)
@@ -14,6 +14,11 @@ urlpatterns = [
     path('', views.index, name='index'),
     path('gallery/', views.gallery, name='gallery'),
     path('gallery/debug/', views.gallery_debug, name='gallery_debug'),
+    path(
+        'gallery/collection/<int:pk>/arts/',
+        views.gallery_collection_arts,
+        name='gallery_collection_arts',
+    ),
     path(
         'collection/<int:pk>/', views.collection_detail, name='collection_detail'
     ),
@@ -25,6 +30,9 @@ urlpatterns = [
     
     # Display list of all available artworks with price, size, and medium
     path('artworks/', views.artwork_list, name='artwork_list'),
+
+    # Next page of artwork cards for infinite scroll (JSON fragment)
+    path('artworks/page/', views.artwork_list_page, name='artwork_list_page'),
     
     # Display detailed view of a specific artwork with all information
     path('artwork/<int:pk>/', views.artwork_detail, name='artwork_detail'),
@@ -37,6 +45,7 @@ urlpatterns = [
     
     # Search and filter artworks by price range
     path('artworks/search/price/', views.artwork_search_by_price, name='artwork_search_by_price'),
+    path('artworks/price-histogram/', views.artwork_price_histogram, name='artwork_price_histogram'),
 
     # Media management (superuser-only)
     path('media/manage/', views.manage_media, name='manage_media'),
@@ -74,6 +83,13 @@ urlpatterns = [
     # Checkout page with order summary and billing form
     path('checkout/', views.checkout, name='checkout'),
     path('order/success/<int:order_id>/', views.order_success, name='order_success'),
+
+    # Stripe card payment for a pending order, and the status it polls
+    path('order/<int:order_id>/pay/', views.order_payment, name='order_payment'),
+    path('order/<int:order_id>/pay/status/', views.order_payment_status, name='order_payment_status'),
+
+    # Stripe webhook (signature-verified, processed by process_payments)
+    path('stripe/webhook/', views.stripe_webhook, name='stripe_webhook'),
     
     # User dashboard
     path('dashboard/', views.user_dashboard, name='user_dashboard'),
@@ -1,62 +1,37 @@
+import logging
+
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponseForbidden
+from django.http import (
+    HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse,
+)
+from django.db import transaction
 from django.db.models import Q
+from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 from django.urls import reverse
-from .models import Order, OrderItem
+from django.template.loader import render_to_string
+from django.conf import settings
+from config.cache import cache_anonymous_page
+from .models import Order
+
+logger = logging.getLogger(__name__)
 
 
 def index(request):
-    # Serve the homepage at root by rendering Vistor_pages/home.html
-    from .models import Media
-    
-    context = {}
+    # Serve the homepage at root by rendering Vistor_pages/home.html.
+    # Media URLs and the featured carousel come from the cached homepage
+    # context (see collections_app.homepage), invalidated by signals.
+    from .homepage import get_homepage_context
+
     try:
-        # Get the hero media (should be a video)
-        hero_media = Media.objects.filter(hero=True).first()
-        
-        # Get the secondary media (second_section video)
-        secondary_media = Media.objects.filter(second_section=True).first()
-        
-        if hero_media and hero_media.file:
-            context['hero_video'] = hero_media.file.url
-            # Use the media caption as the hero caption when available
-            context['hero_caption'] = hero_media.caption or ''
-        else:
-            context['hero_video'] = None  # Or a fallback static video
-            context['hero_caption'] = ''
-            
-        if secondary_media and secondary_media.file:
-            context['secondary_video'] = secondary_media.file.url
-        else:
-            context['secondary_video'] = None  # Or a fallback static video
-        # Get tertiary/third section media for the Slow Looking preview
-        tertiary_media = Media.objects.filter(third_section=True).first()
-        if tertiary_media and tertiary_media.file:
-            # Provide both URL and media_type so templates can render
-            # image or video
-            context['tertiary_media_url'] = tertiary_media.file.url
-            context['tertiary_media_type'] = tertiary_media.media_type
-        else:
-            context['tertiary_media_url'] = None
-            context['tertiary_media_type'] = None
-        # Provide featured artworks for the homepage carousel
-        from .models import Art
-        featured_qs = (
-            Art.objects
-            .filter(is_featured=True)
-            .filter(Q(is_available=True) | Q(variants__is_available=True))
-            .distinct()
-            .order_by('-created_at')[:6]
-        )
-        context['featured_artworks'] = featured_qs
-    except Exception as e:
-        # Handle any database errors gracefully
-        context['hero_video'] = None
-        context['secondary_video'] = None
-        print(f"Media error: {e}")  # For debugging
+        context = get_homepage_context()
+    except Exception:
+        # Render the page without media rather than failing, but keep the
+        # traceback in the logs
+        logger.exception('Building the homepage context failed')
+        context = {'hero_video': None, 'secondary_video': None}
     
     return render(request, 'Vistor_pages/home.html', context)
 
@@ -69,26 +44,74 @@ def tint_demo(request):
     return render(request, 'debug/image_tint_demo.html', {})
 
 
-def gallery(request):
+def _carousel_arts():
+    """Arts queryset for the gallery carousels.
+
+    Only the columns the carousel renders are selected, and each art is
+    numbered within its collection (``ROW_NUMBER() OVER (PARTITION BY
+    collection_id ORDER BY id)``) so callers can filter to a window of
+    positions in SQL instead of loading every art of every collection.
+    """
+    from .models import Art
+    from django.db.models import F, Window
+    from django.db.models.functions import RowNumber
+    return (
+        Art.objects
+        .only('id', 'title', 'image', 'collection')
+        .annotate(
+            carousel_position=Window(
+                RowNumber(),
+                partition_by=F('collection_id'),
+                order_by=F('id').asc(),
+            )
+        )
+        .order_by('collection_id', 'id')
+    )
+
+
+def _gallery_collections():
+    """Collections for the gallery, each with its first carousel page.
+
+    Every collection gets ``carousel_arts`` (the first
+    GALLERY_CAROUSEL_SIZE arts, prefetched with a single windowed query)
+    and ``art_count`` so the template knows whether to offer "Load more".
+    """
     from .models import Collection
     # Ensure any collection literally named "More art" appears at the
     # end of the list
-    from django.db.models import Case, When, IntegerField, Value
-    collections = (
+    from django.db.models import (
+        Case, Count, IntegerField, Prefetch, Value, When,
+    )
+    return (
         Collection.objects
         .select_related('artist')
-        .prefetch_related('arts')
+        .prefetch_related(
+            Prefetch(
+                'arts',
+                queryset=_carousel_arts().filter(
+                    carousel_position__lte=settings.GALLERY_CAROUSEL_SIZE
+                ),
+                to_attr='carousel_arts',
+            )
+        )
         .annotate(
+            art_count=Count('arts'),
             _is_more=Case(
                 When(name__iexact='more art', then=Value(1)),
                 default=Value(0),
                 output_field=IntegerField(),
-            )
+            ),
         )
         .order_by('_is_more')
     )
+
+
+@cache_anonymous_page('catalog')
+def gallery(request):
     return render(
-        request, 'Vistor_pages/gallery.html', {'collections': collections}
+        request,
+        'Vistor_pages/gallery.html',
+        {'collections': _gallery_collections()},
     )
 
 
@@ -97,31 +120,56 @@ def gallery_debug(request):
 
     Visit /gallery/debug/ to see debug outlines and banner when debugging.
     """
-    from .models import Collection
-    from django.db.models import Case, When, IntegerField, Value
-    collections = (
-        Collection.objects
-        .select_related('artist')
-        .prefetch_related('arts')
-        .annotate(
-            _is_more=Case(
-                When(name__iexact='more art', then=Value(1)),
-                default=Value(0),
-                output_field=IntegerField(),
-            )
-        )
-        .order_by('_is_more')
-    )
     return render(
         request,
         'Vistor_pages/gallery.html',
         {
-            'collections': collections,
+            'collections': _gallery_collections(),
             'debug_layout': True,
         },
     )
 
 
+@cache_anonymous_page('catalog')
+def gallery_collection_arts(request, pk):
+    """
+    JSON fragment endpoint for a collection's gallery carousel.
+
+    Returns the next GALLERY_CAROUSEL_SIZE slides after `offset` (the number
+    of slides already shown):
+    {"html": "...", "count": n, "next_offset": n, "has_more": bool}
+    """
+    try:
+        offset = max(int(request.GET.get('offset', 0)), 0)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid offset'}, status=400)
+
+    size = settings.GALLERY_CAROUSEL_SIZE
+    # One extra row tells us whether another page exists
+    arts = list(
+        _carousel_arts().filter(
+            collection_id=pk,
+            carousel_position__gt=offset,
+            carousel_position__lte=offset + size + 1,
+        )
+    )
+    has_more = len(arts) > size
+    arts = arts[:size]
+
+    html = render_to_string(
+        'includes/gallery_carousel_items.html',
+        {'arts': arts},
+        request=request,
+    )
+    return JsonResponse({
+        'html': html,
+        'count': len(arts),
+        'next_offset': offset + len(arts),
+        'has_more': has_more,
+    })
+
+
+@cache_anonymous_page('catalog')
 def collection_detail(request, pk):
     from .models import Collection
     collection = Collection.objects.prefetch_related('arts').get(pk=pk)
@@ -148,6 +196,87 @@ def art_detail(request, pk):
 # NEW ARTWORK VIEWS - Display price, size, and medium information
 # ============================================================================
 
+def _price_param(request, name):
+    """Decimal value of a price query parameter; None if absent or bad."""
+    from decimal import Decimal, InvalidOperation
+
+    value = request.GET.get(name, '').strip()
+    if not value:
+        return None
+    try:
+        price = Decimal(value)
+    except InvalidOperation:
+        return None
+    return price if price.is_finite() and price >= 0 else None
+
+
+def _storefront_artworks(request, price_filter=True):
+    """Return the filtered storefront Art queryset and the active filters.
+
+    Shared by artwork_list, its infinite-scroll fragment endpoint and the
+    price histogram so all honour the same `search`, `collection`,
+    `format`, `min_price` and `max_price` parameters (the histogram passes
+    price_filter=False: its buckets describe the prices on offer before
+    the range is narrowed).
+    Display price, format label and the "original unavailable" flag come
+    from the denormalized storefront projection on Art, so no variants
+    need to be loaded per row, and only the columns the cards read are
+    selected (collections_app.listings).
+    """
+    from .listings import ARTWORK_CARD_FIELDS
+    from .models import Art
+    from .search import search_artworks
+
+    artworks = Art.storefront.available().only(*ARTWORK_CARD_FIELDS)
+
+    # Filter by collection (if provided)
+    selected_collection = request.GET.get('collection', '')
+    if selected_collection:
+        artworks = artworks.filter(collection__id=selected_collection)
+
+    # Filter by available format (ArtVariant.medium)
+    selected_format = request.GET.get('format', '')
+    if selected_format:
+        artworks = artworks.with_format(selected_format)
+
+    # Filter by price range across the available variants
+    min_price = _price_param(request, 'min_price')
+    max_price = _price_param(request, 'max_price')
+    if price_filter and (min_price is not None or max_price is not None):
+        artworks = artworks.in_price_range(min_price, max_price)
+
+    # Search last, so the trigram fallback check sees the other filters.
+    # Postgres ranks full-text matches; other databases use icontains.
+    search_query = request.GET.get('search', '')
+    if search_query:
+        artworks = search_artworks(artworks, search_query)
+
+    filters = {
+        'search_query': search_query,
+        'selected_collection': selected_collection,
+        'selected_format': selected_format,
+        'min_price': '' if min_price is None else min_price,
+        'max_price': '' if max_price is None else max_price,
+    }
+    return artworks, filters
+
+
+def _artwork_paginator(artworks):
+    """Keyset paginator over the storefront listing.
+
+    Newest first, or best match first when a ranked search is active.
+    """
+    from .listings import ARTWORK_LIST_ORDERING
+    from .pagination import KeysetPaginator
+
+    ordering = ARTWORK_LIST_ORDERING
+    if 'search_rank' in artworks.query.annotations:
+        ordering = ('-search_rank',) + ordering
+    return KeysetPaginator(
+        artworks, ordering, settings.ARTWORK_LIST_PAGE_SIZE
+    )
+
+
 def artwork_list(request):
     """
     View to display a list of all available artworks.
@@ -156,136 +285,103 @@ def artwork_list(request):
     Features:
     - Shows all available artworks
     - Displays price, size (dimensions), and medium
-    - Optimizes database queries using select_related
+    - Selects only the columns the cards read (collections_app.listings)
     - Supports filtering and search functionality
+    - Keyset pagination (newest first); further pages are appended by
+      infinite scroll from artwork_list_page
     """
+    from .listings import ARTWORK_CARD_FIELDS
     from .models import Art, Collection, ArtVariant
+    from .pagination import InvalidCursor
 
-    # Fetch all art rows (Art is canonical) and expose them as
-    # 'artworks' for templates
-    # Prefetch variants so templates can show per-medium pricing without N+1
-    artworks = (
-        Art.objects
-        .select_related('collection__artist')
-        .prefetch_related('variants')
-        .all()
-    )
-
-    # Only show arts that have at least one available variant
-    artworks = artworks.filter(variants__is_available=True).distinct()
-    
-    # Get search query from URL parameters (if provided)
-    search_query = request.GET.get('search', '')
-    if search_query:
-        # Filter artworks by title, medium, or artist name
-        artworks = artworks.filter(
-            Q(title__icontains=search_query) |
-            Q(medium__icontains=search_query) |
-            Q(collection__artist__name__icontains=search_query)
-        )
-    
-    # Filter by collection (if provided)
-    selected_collection = request.GET.get('collection', '')
-    if selected_collection:
-        artworks = artworks.filter(collection__id=selected_collection)
+    artworks, filters = _storefront_artworks(request)
 
-    # Filter by available format (ArtVariant.medium)
-    selected_format = request.GET.get('format', '')
-    if selected_format:
-        artworks = artworks.filter(
-            variants__medium=selected_format,
-            variants__is_available=True,
-        )
-    
-    # Order artworks by creation date (newest first)
-    artworks = artworks.order_by('-created_at')
+    # Fetch one page ordered by (-created_at, id). A stale or malformed
+    # cursor simply restarts from the first page.
+    paginator = _artwork_paginator(artworks)
+    try:
+        page = paginator.get_page(request.GET.get('cursor'))
+    except InvalidCursor:
+        page = paginator.get_page()
     
     # Prepare context data to pass to the template
     # Provide collections and format choices for the filter UI
     # and featured artworks
     collections = Collection.objects.select_related('artist').all()
     format_choices = ArtVariant.MEDIUM_CHOICES
-    # Include featured artworks even when `Art.is_available` is False but the
-    # artwork has at least one available ArtVariant. Availability is often
-    # derived from variants, so this ensures featured pieces surface correctly.
+    # Featured pieces count as available when either the Art or one of its
+    # ArtVariants is available (see Art.storefront).
     featured_artworks = (
-        Art.objects
-        .filter(is_featured=True)
-        .filter(Q(is_available=True) | Q(variants__is_available=True))
-        .distinct()
+        Art.storefront.featured()
+        .only(*ARTWORK_CARD_FIELDS)
         .order_by('-created_at')[:6]
     )
 
-    # Compute display price and selected format label for each
-    # artwork (used in templates)
-    def resolve_display_price(art_obj):
-        variants_qs = list(art_obj.variants.all())
-        variants_map = {v.medium: v for v in variants_qs}
-        # Try selected format first
-        price_display = None
-        format_label = None
-        if selected_format:
-            v = variants_map.get(selected_format)
-            if v and v.is_available and v.price is not None:
-                price_display = f"{v.currency} {v.price:,.2f}"
-                # look up human label
-                format_label = dict(ArtVariant.MEDIUM_CHOICES).get(v.medium)
-
-        # Fallback preferred order: ORIGINAL, POSTER, DIGITAL
-        if price_display is None:
-            preferred = [
-                ArtVariant.ORIGINAL,
-                ArtVariant.POSTER,
-                ArtVariant.DIGITAL,
-            ]
-            for m in preferred:
-                v = variants_map.get(m)
-                if v and v.is_available and v.price is not None:
-                    price_display = f"{v.currency} {v.price:,.2f}"
-                    format_label = (
-                        dict(ArtVariant.MEDIUM_CHOICES).get(v.medium)
-                    )
-                    break
-
-        # Final fallback: art-level price
-        if price_display is None:
-            price_display = art_obj.get_price_display()
-
-        # Attach to object for template access
-        try:
-            art_obj.display_price = price_display
-            art_obj.display_format_label = format_label
-            # Show flag only when user hasn't filtered by a specific format
-            orig = variants_map.get(ArtVariant.ORIGINAL)
-            if not selected_format:
-                art_obj.display_original_unavailable = (
-                    (orig is None) or (not orig.is_available)
-                )
-            else:
-                art_obj.display_original_unavailable = False
-        except Exception:
-            pass
-
-    # Resolve for artworks in the main list and featured
-    for a in artworks:
-        resolve_display_price(a)
-    for fa in featured_artworks:
-        resolve_display_price(fa)
-
     context = {
-        'artworks': artworks,
-        'search_query': search_query,
+        'artworks': page,
+        'next_cursor': page.next_cursor,
         'collections': collections,
         'format_choices': format_choices,
-        'selected_collection': selected_collection,
-        'selected_format': selected_format,
         'featured_artworks': featured_artworks,
+        **filters,
     }
     
     # Render the artwork list template with the context data
     return render(request, 'Vistor_pages/artwork_list.html', context)
 
 
+def artwork_list_page(request):
+    """
+    JSON fragment endpoint for infinite scroll on the artwork list.
+
+    Accepts the same filters as artwork_list plus a `cursor` token and
+    returns the rendered cards for the next page:
+    {"html": "...", "count": n, "next_cursor": "..." | null}
+    """
+    from .pagination import InvalidCursor
+
+    artworks, _filters = _storefront_artworks(request)
+    try:
+        page = _artwork_paginator(artworks).get_page(
+            request.GET.get('cursor')
+        )
+    except InvalidCursor:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+
+    html = render_to_string(
+        'includes/artwork_cards.html',
+        {'artworks': page},
+        request=request,
+    )
+    return JsonResponse({
+        'html': html,
+        'count': len(page),
+        'next_cursor': page.next_cursor,
+    })
+
+
+@cache_anonymous_page('catalog')
+def artwork_price_histogram(request):
+    """
+    JSON price facet for the storefront filter UI.
+
+    Accepts the artwork_list filters except the price range itself and
+    counts matching artworks by available variant price, as the price
+    filter matches them (an artwork counts in each bucket holding one of
+    its prices):
+    {"min": "20.00", "max": "4800.00", "total": n,
+     "buckets": [{"min": "0", "max": "500", "count": n}, ...]}
+    Bucket edges are rounded to 1, 2 or 5 × 10^k, and each bucket includes
+    its lower edge only. Two queries: the price bounds, then every bucket
+    count in one aggregate.
+    """
+    from .pricing import price_histogram
+
+    artworks, _filters = _storefront_artworks(request, price_filter=False)
+    return JsonResponse(price_histogram(artworks))
+
+
+@cache_anonymous_page('catalog')
 def artwork_detail(request, pk):
     """
     View to display detailed information about a specific artwork.
@@ -371,8 +467,8 @@ def featured_artworks(request):
     from .models import Art
 
     artworks = (
-        Art.objects.select_related('collection__artist')
-        .filter(is_featured=True, is_available=True)
+        Art.storefront.featured()
+        .select_related('collection__artist')
         .order_by('-created_at')
     )
     
@@ -401,6 +497,7 @@ def artworks_by_artist(request, artist_id):
     - Shows price, size, and medium information
     - Includes artist profile information
     """
+    from .listings import ARTIST_ARTWORK_FIELDS
     from .models import Art
     from owner_app.models import ArtistProfile
     
@@ -409,10 +506,12 @@ def artworks_by_artist(request, artist_id):
     
     # Fetch all artworks by this artist
     # Using filter to get artworks related to the artist
-    # Art does not have direct artist FK; filter via collection__artist
-    artworks = Art.objects.select_related('collection__artist').filter(
+    # Art does not have direct artist FK; filter via collection__artist.
+    # The template reads the artist from `artist`, so no join is selected.
+    artworks = Art.storefront.available().only(
+        *ARTIST_ARTWORK_FIELDS
+    ).filter(
         collection__artist=artist,
-        is_available=True
     ).order_by('-created_at')
     
     # Prepare context data
@@ -431,38 +530,39 @@ def artwork_search_by_price(request):
     Helps buyers find artworks within their budget.
     
     Features:
-    - Filter artworks by minimum and maximum price
-    - Display price, size, and medium for filtered results
-    - Sort by price (ascending or descending)
+    - Filter artworks by minimum and maximum price; a piece matches when
+      one of its available variants is priced within the range
+    - Display price range, size, and medium for filtered results
+    - Sort by lowest available price (ascending or descending)
+    - Sorting reads the min/max_available_price projection, which also
+      narrows the range test on art_price_range_idx (see
+      Art.storefront.in_price_range)
     """
+    from .listings import PRICE_SEARCH_FIELDS
     from .models import Art
 
-    min_price = request.GET.get('min_price')
-    max_price = request.GET.get('max_price')
+    min_price = _price_param(request, 'min_price')
+    max_price = _price_param(request, 'max_price')
     sort_order = request.GET.get('sort', 'asc')
 
     artworks = (
-        Art.objects.select_related('collection__artist')
-        .filter(is_available=True)
+        Art.storefront.available()
+        .in_price_range(min_price, max_price)
+        .select_related('collection__artist')
+        .only(*PRICE_SEARCH_FIELDS)
     )
     
-    # Apply price filters if provided
-    if min_price:
-        artworks = artworks.filter(price__gte=min_price)
-    if max_price:
-        artworks = artworks.filter(price__lte=max_price)
-    
-    # Sort by price based on sort_order parameter
+    # Sort by price based on sort_order parameter (id keeps ties stable)
     if sort_order == 'desc':
-        artworks = artworks.order_by('-price')
+        artworks = artworks.order_by('-min_available_price', '-id')
     else:
-        artworks = artworks.order_by('price')
+        artworks = artworks.order_by('min_available_price', 'id')
     
     # Prepare context data
     context = {
         'artworks': artworks,
-        'min_price': min_price,
-        'max_price': max_price,
+        'min_price': '' if min_price is None else min_price,
+        'max_price': '' if max_price is None else max_price,
         'sort_order': sort_order,
     }
     
@@ -535,6 +635,7 @@ def add_to_basket(request, artwork_id):
     - Creates basket if user doesn't have one
     - Adds artwork or updates quantity if already in basket
     - Stores current price as price_at_addition
+    - Holds stocked variants for BASKET_HOLD_MINUTES (409 when sold out)
     - Returns JSON response for AJAX requests
     - Redirects to basket or referrer for regular requests
     
@@ -632,17 +733,41 @@ def add_to_basket(request, artwork_id):
     else:
         defaults['price_at_addition'] = artwork.price
 
-    basket_item, item_created = BasketItem.objects.get_or_create(
-        basket=basket,
-        art=artwork,
-        variant=variant,
-        defaults=defaults,
-    )
-    
-    # If item already existed, update quantity
+    from .inventory import OutOfStockError, reserve
+
+    try:
+        with transaction.atomic():
+            basket_item, item_created = BasketItem.objects.get_or_create(
+                basket=basket,
+                art=artwork,
+                variant=variant,
+                defaults=defaults,
+            )
+
+            # If item already existed, update quantity
+            if not item_created:
+                basket_item.quantity += quantity
+                basket_item.save()
+
+            # Hold stocked variants (originals) for this basket; rolls the
+            # item change back if another basket holds the last unit
+            reserve(basket, variant, basket_item.quantity)
+    except OutOfStockError as exc:
+        msg = (
+            f"Sorry, {artwork.title} ({variant.get_medium_display()}) "
+            f"is reserved in another basket."
+            if exc.available == 0 else
+            f"Sorry, only {exc.available} of {artwork.title} "
+            f"({variant.get_medium_display()}) available."
+        )
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse({'success': False, 'message': msg}, status=409)
+        messages.error(request, msg)
+        return redirect(
+            request.META.get('HTTP_REFERER', 'collections_app:artwork_list')
+        )
+
     if not item_created:
-        basket_item.quantity += quantity
-        basket_item.save()
         messages.success(
             request,
             (
@@ -658,6 +783,8 @@ def add_to_basket(request, artwork_id):
     
     # Handle AJAX requests
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        # The item save updated the basket totals in SQL; reload them
+        basket.refresh_from_db(fields=['item_count', 'total_amount'])
         return JsonResponse({
             'success': True,
             'message': f"Added {artwork.title} to basket",
@@ -700,6 +827,8 @@ def update_basket_item(request, item_id):
         basket__user=request.user
     )
     
+    from .inventory import OutOfStockError, release, reserve
+
     # Get new quantity from request
     new_quantity = int(request.POST.get('quantity', 1))
     
@@ -707,12 +836,29 @@ def update_basket_item(request, item_id):
     if new_quantity <= 0:
         display = getattr(basket_item, 'display_artwork', None)
         artwork_title = display.title if display else 'Unknown artwork'
-        basket_item.delete()
+        with transaction.atomic():
+            basket_item.delete()
+            if basket_item.variant_id:
+                release(basket_item.basket_id, basket_item.variant_id)
         messages.success(request, f"Removed {artwork_title} from your basket.")
     else:
-        # Update quantity
-        basket_item.quantity = new_quantity
-        basket_item.save()
+        # Update quantity, resizing the stock hold to match
+        try:
+            with transaction.atomic():
+                basket_item.quantity = new_quantity
+                basket_item.save()
+                if basket_item.variant_id:
+                    reserve(
+                        basket_item.basket, basket_item.variant, new_quantity
+                    )
+        except OutOfStockError as exc:
+            msg = f"Sorry, only {exc.available} available."
+            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                return JsonResponse(
+                    {'success': False, 'message': msg}, status=409
+                )
+            messages.error(request, msg)
+            return redirect('collections_app:basket')
         display = getattr(basket_item, 'display_artwork', None)
         title = display.title if display else 'Unknown artwork'
         messages.success(
@@ -722,6 +868,7 @@ def update_basket_item(request, item_id):
     
     # Handle AJAX requests
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        # First access to the relation, so the totals are read fresh
         basket = basket_item.basket
         return JsonResponse({
             'success': True,
@@ -762,18 +909,25 @@ def remove_from_basket(request, item_id):
         basket__user=request.user
     )
     
+    from .inventory import release
+
     # Store artwork title before deletion
     display = getattr(basket_item, 'display_artwork', None)
     artwork_title = display.title if display else 'Unknown artwork'
     basket = basket_item.basket
     
-    # Delete the item
-    basket_item.delete()
+    # Delete the item and its stock hold
+    with transaction.atomic():
+        basket_item.delete()
+        if basket_item.variant_id:
+            release(basket, basket_item.variant_id)
     
     messages.success(request, f"Removed {artwork_title} from your basket.")
     
     # Handle AJAX requests
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        # The delete updated the basket totals in SQL; reload them
+        basket.refresh_from_db(fields=['item_count', 'total_amount'])
         return JsonResponse({
             'success': True,
             'message': f"Removed {artwork_title} from basket",
@@ -816,7 +970,9 @@ def clear_basket(request):
 def get_basket_count(request):
     """
     Get the number of items in the user's basket.
-    Used for displaying basket count in navigation bar.
+    The navbar badge is rendered with the count already filled in (see
+    collections_app.context_processors.basket); main.js only calls this
+    when the page came from a cache and lacks a per-user count.
     
     Returns:
     - JSON response with basket count
@@ -827,17 +983,10 @@ def get_basket_count(request):
     - Lightweight query for navbar display
     - Returns JSON for AJAX requests
     """
-    from .models import Basket
-    
-    # Return 0 if user is not authenticated
-    if not request.user.is_authenticated:
-        return JsonResponse({'count': 0})
-    
-    try:
-        basket = Basket.objects.get(user=request.user)
-        count = basket.get_item_count()
-    except Basket.DoesNotExist:
-        count = 0
+    from .basket_count import request_basket_count
+
+    # Anonymous visitors get 0; otherwise the cached Basket.item_count
+    count = request_basket_count(request)
     
     return JsonResponse({'count': count})
 
@@ -867,12 +1016,16 @@ def checkout(request):
     - Vistor_pages/checkout.html
     """
     from .models import Basket
+    from .inventory import OutOfStockError
+    from .orders import CurrencyMismatchError, EmptyBasketError, place_order
+    from .payments import stripe_enabled
     
     # Get user's basket
     try:
-        # Prefetch related art and artist via the art->collection->artist path
+        # Prefetch related art and artist via the art->collection->artist
+        # path, plus the variant shown as the item's format
         basket = Basket.objects.prefetch_related(
-            'items__art__collection__artist'
+            'items__art__collection__artist', 'items__variant'
         ).get(user=request.user)
 
         # Check if basket is empty
@@ -888,57 +1041,59 @@ def checkout(request):
 
         # If this is a POST from the checkout form, create an Order (admin test checkout)
         if request.method == 'POST':
-            # Create order using submitted billing fields
-            order = None
+            # Create the order and its items atomically (see
+            # collections_app.orders.place_order)
+            billing = {
+                'email': request.POST.get('email', request.user.email or ''),
+                'full_name': f"{request.POST.get('first_name','') } {request.POST.get('last_name','')}",
+                'address_line1': request.POST.get('address_line1',''),
+                'address_line2': request.POST.get('address_line2',''),
+                'city': request.POST.get('city',''),
+                'postal_code': request.POST.get('postal_code',''),
+                'country': request.POST.get('country','') or 'US',
+            }
+            # With Stripe enabled the order waits for payment; the
+            # PaymentIntent is created out of band (collections_app.payments)
+            use_stripe = stripe_enabled()
             try:
-                order = Order.objects.create(
-                    user=request.user,
-                    total_amount=total,
-                    payment_method='admin-test',
-                    stripe_payment_intent='TEST',
-                    email=request.POST.get('email', request.user.email or ''),
-                    full_name=f"{request.POST.get('first_name','') } {request.POST.get('last_name','')}",
-                    address_line1=request.POST.get('address_line1',''),
-                    address_line2=request.POST.get('address_line2',''),
-                    city=request.POST.get('city',''),
-                    postal_code=request.POST.get('postal_code',''),
-                    country=request.POST.get('country','') or 'US',
+                order = place_order(
+                    request.user,
+                    billing,
+                    payment_method='stripe' if use_stripe else 'admin-test',
+                    stripe_payment_intent=None if use_stripe else 'TEST',
+                    shipping_cost=shipping_cost,
                 )
-
-                # Create OrderItems from BasketItems
-                for bi in basket.items.all():
-                    display = getattr(bi, 'display_artwork', None)
-                    variant_obj = getattr(bi, 'variant', None)
-                    OrderItem.objects.create(
-                        order=order,
-                        art=(bi.art if getattr(bi, 'art', None) else None),
-                        artwork_title=(
-                            display.title if display else bi.price_at_addition
-                        ),
-                        artwork_artist=(
-                            display.artist.name
-                            if getattr(display, 'artist', None)
-                            else ''
-                        ),
-                        artwork_medium=(
-                            display.medium
-                            if getattr(display, 'medium', None)
-                            else ''
-                        ),
-                        quantity=bi.quantity,
-                        price=bi.price_at_addition,
-                        # snapshot selected variant info when available
-                        variant_id=(variant_obj.pk if variant_obj else None),
-                        variant_medium=(
-                            variant_obj.get_medium_display()
-                            if variant_obj
-                            else ''
-                        ),
+            except EmptyBasketError:
+                messages.warning(
+                    request,
+                    "Your basket is empty. Please add items before checking out.",
+                )
+                return redirect('collections_app:artwork_list')
+            except OutOfStockError as exc:
+                messages.error(
+                    request,
+                    f"Sorry, {exc.variant.art.title} "
+                    f"({exc.variant.get_medium_display()}) has just sold "
+                    f"out. Please remove it from your basket.",
+                )
+                return redirect('collections_app:basket')
+            except CurrencyMismatchError as exc:
+                messages.error(
+                    request,
+                    f"Online payment is only available in "
+                    f"{settings.STRIPE_CURRENCY.upper()}. Please remove items "
+                    f"priced in {', '.join(sorted(exc.currencies))} from "
+                    f"your basket.",
+                )
+                return redirect('collections_app:basket')
+            except Exception as exc:
+                messages.error(request, f"Failed to create order: {exc}")
+                # Fall through to render the checkout page with an error
+            else:
+                if use_stripe:
+                    return redirect(
+                        'collections_app:order_payment', order_id=order.id
                     )
-
-                # Clear the basket
-                basket.clear()
-
                 messages.success(
                     request,
                     f'Payment successful! Order #{order.order_number}',
@@ -947,10 +1102,6 @@ def checkout(request):
                     'collections_app:order_success', order_id=order.id
                 )
 
-            except Exception as exc:
-                messages.error(request, f"Failed to create order: {exc}")
-                # Fall through to render the checkout page with an error
-
     except Basket.DoesNotExist:
         messages.warning(
             request,
@@ -975,6 +1126,81 @@ def order_success(request, order_id):
     return render(request, 'Vistor_pages/order_success.html', {'order': order})
 
 
+@login_required
+def order_payment(request, order_id):
+    """
+    Card payment page for a pending Stripe order.
+
+    Features:
+    - Mounts the Stripe Payment Element once the PaymentIntent exists
+    - Polls order_payment_status while the worker creates the intent
+    - Sends paid or cancelled orders straight to the confirmation page
+
+    Template:
+    - Vistor_pages/order_payment.html
+    """
+    order = get_object_or_404(
+        Order, pk=order_id, user=request.user, payment_method='stripe'
+    )
+    if order.status != 'pending':
+        return redirect('collections_app:order_success', order_id=order.id)
+    return render(request, 'Vistor_pages/order_payment.html', {
+        'order': order,
+        'stripe_public_key': settings.STRIPE_PUBLIC_KEY,
+    })
+
+
+@login_required
+def order_payment_status(request, order_id):
+    """
+    JSON status of a Stripe order, polled by the payment page.
+
+    Returns:
+    - status: the order status
+    - client_secret: the PaymentIntent secret once the worker has created
+      it (stored on the order), otherwise null
+    """
+    import stripe
+    from .payments import payment_intent_client_secret
+
+    order = get_object_or_404(
+        Order, pk=order_id, user=request.user, payment_method='stripe'
+    )
+    client_secret = None
+    if order.status == 'pending':
+        try:
+            client_secret = payment_intent_client_secret(order)
+        except stripe.StripeError:
+            # Treated as not ready yet; the page keeps polling
+            client_secret = None
+    return JsonResponse({'status': order.status, 'client_secret': client_secret})
+
+
+@csrf_exempt
+@require_POST
+def stripe_webhook(request):
+    """
+    Stripe webhook endpoint.
+
+    Features:
+    - Rejects bodies whose Stripe-Signature does not verify (400)
+    - Records the event in the StripeEvent ledger and answers 200 at once;
+      ``manage.py process_payments`` applies it out of band
+    - Redelivered events are ignored by the ledger's unique event ID
+    """
+    import stripe
+    from .payments import record_event, verify_event
+
+    try:
+        event = verify_event(
+            request.body, request.META.get('HTTP_STRIPE_SIGNATURE', '')
+        )
+    except (ValueError, stripe.SignatureVerificationError):
+        return HttpResponse(status=400)
+    record_event(event)
+    return HttpResponse(status=200)
+
+
 # ============================================================================
 # USER DASHBOARD VIEW
 # ============================================================================
@@ -1245,6 +1471,7 @@ def messages_view(request):
     Message model or an external mailbox.
     """
     from owner_app.models import Messages as MsgModel
+    from owner_app.unread import adjust_unread_count
 
     # Handle marking a message as read via POST or GET for convenience.
     if request.method == 'POST':
@@ -1296,9 +1523,12 @@ def messages_view(request):
         if 'mark_read' in request.POST:
             try:
                 mid = int(request.POST.get('mark_read'))
-                MsgModel.objects.filter(
-                    pk=mid, owner=request.user
+                # update() skips the post_save receivers, so adjust the
+                # cached unread counter by the rows actually changed
+                changed = MsgModel.objects.filter(
+                    pk=mid, owner=request.user, unread=True
                 ).update(unread=False)
+                adjust_unread_count(request.user.pk, -changed)
                 return redirect('collections_app:messages')
             except Exception:
                 pass
@@ -1358,9 +1588,8 @@ def message_detail(request, pk):
             if body:
                 # Defer importing the reply model until needed
                 from owner_app.models import MessageReply
+                from owner_app.outbox import enqueue
                 from django.contrib import messages as dj_messages
-                from django.core.mail import send_mail
-                from django.conf import settings
                 # If the original sender is a registered user, store the
                 # reply internally and associate the replying user.
                 if getattr(msg, 'sender', None):
@@ -1416,6 +1645,23 @@ def message_detail(request, pk):
                     # will submit confirm_send_to_email=1 when the owner
                     # confirms.
                     confirm = request.POST.get('confirm_send_to_email')
+                    if confirm != '1':
+                        # No confirmation provided: do not persist the reply.
+                        dj_messages.warning(
+                            request,
+                            'Visitor is not a registered user. Confirm '
+                            'sending email to that address to deliver '
+                            'this reply.',
+                        )
+                        confirm_url = (
+                            reverse(
+                                'collections_app:message_detail',
+                                kwargs={'pk': pk},
+                            )
+                            + '?confirm_email=1'
+                        )
+                        return redirect(confirm_url)
+
                     subject = (
                         "Reply from "
                         + (
@@ -1423,132 +1669,48 @@ def message_detail(request, pk):
                             or request.user.username
                         )
                     )
-                    full_body = body + "\n\nReply sent via site owner"
-                    try:
-                        # Only create/send the reply if the owner explicitly
-                        # confirmed.
-                        if confirm == '1':
-                            send_mail(
-                                subject,
-                                full_body,
-                                settings.DEFAULT_FROM_EMAIL,
-                                [msg.email],
-                                fail_silently=False,
-                            )
-                            reply = MessageReply.objects.create(
-                                message=msg,
-                                sender=(
-                                    request.user
-                                    if getattr(request, 'user', None)
-                                    and request.user.is_authenticated
-                                    else None
-                                ),
-                                body=body,
-                                via_email=True,
-                            )
-                            dj_messages.success(
-                                request, 'Reply saved and emailed to visitor.'
-                            )
-                        else:
-                            # No confirmation provided: do not persist
-                            # the reply.
-                            dj_messages.warning(
-                                request,
-                                'Visitor is not a registered user. Confirm '
-                                'sending email to that address to deliver '
-                                'this reply.',
-                            )
-                            confirm_url = (
-                                reverse(
-                                    'collections_app:message_detail',
-                                    kwargs={'pk': pk},
-                                )
-                                + '?confirm_email=1'
-                            )
-                            return redirect(confirm_url)
-                    except Exception:
-                        # Sending email failed; record the reply
-                        # (via_email False)
+                    # Store the reply and queue its email together; the
+                    # outbox worker sends it and records the delivery
+                    # status on the reply (owner_app.outbox)
+                    with transaction.atomic():
                         reply = MessageReply.objects.create(
                             message=msg,
-                            sender=(
-                                request.user
-                                if getattr(request, 'user', None)
-                                and request.user.is_authenticated
-                                else None
-                            ),
+                            sender=request.user,
                             body=body,
                             via_email=False,
                         )
-                        dj_messages.error(
-                            request,
-                            'Reply saved but email sending failed. '
-                            'You can retry.',
-                        )
-                        retry_url = (
-                            reverse(
-                                'collections_app:message_detail',
-                                kwargs={'pk': pk},
-                            )
-                            + '?reply_failed_id=' + str(reply.pk)
+                        enqueue(
+                            subject,
+                            body + "\n\nReply sent via site owner",
+                            [msg.email],
+                            reply=reply,
                         )
-                        return redirect(retry_url)
+                    dj_messages.success(
+                        request, 'Reply saved and queued for email to visitor.'
+                    )
             return redirect('collections_app:message_detail', pk=pk)
 
         if action == 'retry_reply':
-            # Attempt to resend a previously failed reply email
+            # Queue a reply whose email delivery failed for another round
             from django.contrib import messages as dj_messages
-            from django.core.mail import send_mail
-            from django.conf import settings
-            reply_id = request.POST.get('reply_id')
-            if reply_id:
-                try:
-                    reply = MessageReply.objects.get(
-                        pk=int(reply_id), message=msg
-                    )
-                    recipient_email = None
-                    if getattr(msg, 'sender', None) and getattr(
-                        msg.sender, 'email', None
-                    ):
-                        recipient_email = msg.sender.email
-                    if not recipient_email and getattr(msg, 'email', None):
-                        recipient_email = msg.email
-                    if recipient_email:
-                        username_label = (
-                            request.user.get_full_name()
-                            or request.user.username
-                        )
-                        subject = "Reply from " + username_label
-                        full_body = (
-                            reply.body + "\n\nReply sent via site owner"
-                        )
-                        try:
-                            send_mail(
-                                subject,
-                                full_body,
-                                settings.DEFAULT_FROM_EMAIL,
-                                [recipient_email],
-                                fail_silently=False,
-                            )
-                            reply.via_email = True
-                            reply.save(update_fields=['via_email'])
-                            dj_messages.success(
-                                request,
-                                'Email retry succeeded; user notified.',
-                            )
-                        except Exception:
-                            dj_messages.error(
-                                request,
-                                'Email retry failed. Please check your mail '
-                                'settings and try again.',
-                            )
-                    else:
-                        dj_messages.error(
-                            request,
-                            'No recipient email found for this message.',
-                        )
-                except MessageReply.DoesNotExist:
-                    dj_messages.error(request, 'Reply record not found.')
+            from owner_app.models import MessageReply, OutboundEmail
+            from owner_app.outbox import retry
+
+            try:
+                reply_id = int(request.POST.get('reply_id', ''))
+            except ValueError:
+                return HttpResponseBadRequest('Invalid reply_id')
+            reply = get_object_or_404(MessageReply, pk=reply_id, message=msg)
+            email = (
+                reply.emails.filter(status=OutboundEmail.FAILED)
+                .order_by('-created_at')
+                .first()
+            )
+            if email is None:
+                dj_messages.error(request, 'No failed email found for this reply.')
+            else:
+                retry(email)
+                dj_messages.success(request, 'Reply email queued for another attempt.')
             return redirect('collections_app:message_detail', pk=pk)
 
     # Mark as read when viewed if it's unread
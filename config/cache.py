@@ -0,0 +1,228 @@
+"""Page caching for anonymous visitors.
+
+Public pages (gallery, collection and artwork detail, events, about) are
+identical for every anonymous visitor, so their rendered HTML is cached
+under a key built from one or more *namespaces* and the request URL::
+
+    @cache_anonymous_page('catalog')
+    def gallery(request): ...
+
+Each namespace has a version stored in the cache. Model signal receivers
+call ``bump_page_cache_version('catalog')`` on writes, which switches every
+page in that namespace to fresh keys at once; stale entries are never read
+again and simply expire.
+
+A response is only cached when it cannot contain per-visitor state: the
+user is anonymous, no flash messages are pending, the CSRF token was not
+used and the response sets no cookies.
+
+Invalidation only works when every process reads the same cache: a bump
+made by one gunicorn worker, ``manage.py`` command or the payments worker
+must reach the worker serving the page. A per-process backend (LocMemCache,
+the CACHE_URL default) cannot do that, so page caching is off there unless
+DEBUG is on (a single runserver process) or PAGE_CACHE_ENABLED says
+otherwise. Use a shared backend (``redis://`` or ``file://``) in production.
+
+Settings:
+    PAGE_CACHE_ALIAS    cache alias from CACHES (default 'default')
+    PAGE_CACHE_TIMEOUT  seconds a cached page lives (default 10 minutes)
+    PAGE_CACHE_ENABLED  True/False to force page caching on or off; None
+                        (default) enables it for shared backends and DEBUG
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache as default_cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.functional import SimpleLazyObject
+
+PAGE_CACHE_PREFIX = 'pagecache'
+
+
+def page_cache():
+    """Return the cache backend used for anonymous pages."""
+    return caches[getattr(settings, 'PAGE_CACHE_ALIAS', 'default')]
+
+
+def is_shared_cache(cache):
+    """False when ``cache`` lives in this process's memory only."""
+    return not isinstance(cache, LocMemCache)
+
+
+def page_cache_enabled():
+    """Whether cache_anonymous_page caches at all (see module docstring)."""
+    enabled = getattr(settings, 'PAGE_CACHE_ENABLED', None)
+    if enabled is None:
+        return settings.DEBUG or is_shared_cache(page_cache())
+    return enabled
+
+
+def _version_key(namespace):
+    return f'{PAGE_CACHE_PREFIX}:version:{namespace}'
+
+
+def _new_version():
+    # Time based rather than a counter, so a version that was evicted from
+    # the cache can never be recreated with a value used before.
+    return time.time_ns()
+
+
+def page_cache_versions(namespaces):
+    """Return the current version of each namespace, creating missing ones."""
+    cache = page_cache()
+    keys = {_version_key(ns): ns for ns in namespaces}
+    found = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return [found[_version_key(ns)] for ns in namespaces]
+
+
+def bump_page_cache_version(*namespaces):
+    """Invalidate every cached page in the given namespaces."""
+    page_cache().set_many(
+        {_version_key(ns): _new_version() for ns in namespaces}, None
+    )
+
+
+def page_cache_key(request, namespaces):
+    versions = page_cache_versions(namespaces)
+    scope = ':'.join(f'{ns}.{v}' for ns, v in zip(namespaces, versions))
+    url = hashlib.md5(
+        request.build_absolute_uri().encode(), usedforsecurity=False
+    ).hexdigest()
+    return f'{PAGE_CACHE_PREFIX}:{scope}:{url}'
+
+
+def _request_is_cacheable(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return False
+    # len() does not mark pending messages as used
+    return len(get_messages(request)) == 0
+
+
+def _response_is_cacheable(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_USED')
+    )
+
+
+def cache_anonymous_page(*namespaces, timeout=None):
+    """Cache a view's HTML for anonymous visitors under versioned keys.
+
+    Responses carry ``X-Page-Cache: hit|miss`` and are marked
+    ``page_cacheable`` so MediaCacheMiddleware can add public
+    Cache-Control headers.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if not (page_cache_enabled() and _request_is_cacheable(request)):
+                return view(request, *args, **kwargs)
+
+            cache = page_cache()
+            key = page_cache_key(request, namespaces)
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+                response['X-Page-Cache'] = 'hit'
+                response.page_cacheable = True
+                return response
+
+            response = view(request, *args, **kwargs)
+            if _response_is_cacheable(request, response):
+                if timeout is None:
+                    ttl = getattr(settings, 'PAGE_CACHE_TIMEOUT', 600)
+                else:
+                    ttl = timeout
+                cache.set(
+                    key, (response.content, response['Content-Type']), ttl
+                )
+                response['X-Page-Cache'] = 'miss'
+                response.page_cacheable = True
+            return response
+        return wrapped
+    return decorator
+
+
+class UserCounter:
+    """A per-user count for a navbar badge, kept in the default cache.
+
+    ``load(user_id)`` reads the count from the database on a miss, and the
+    result is cached for ``timeout_setting`` seconds (default 5 minutes).
+    Writers call ``forget`` or ``adjust``, which touch the cache once the
+    surrounding transaction commits. Within a request the count is
+    memoized on the request under ``request_attr``, so a context processor
+    built on ``lazy`` and any template tag share a single lookup.
+    """
+
+    def __init__(self, prefix, load, timeout_setting, request_attr):
+        self.prefix = prefix
+        self.load = load
+        self.timeout_setting = timeout_setting
+        self.request_attr = request_attr
+
+    def key(self, user_id):
+        return f'{self.prefix}:{user_id}'
+
+    def get(self, user_id):
+        """Return the user's count, loading it on a cache miss."""
+        key = self.key(user_id)
+        count = default_cache.get(key)
+        if count is None:
+            count = self.load(user_id)
+            default_cache.add(
+                key, count, getattr(settings, self.timeout_setting, 300)
+            )
+        return count
+
+    def forget(self, *user_ids):
+        """Drop cached counts once the surrounding transaction commits."""
+        keys = [
+            self.key(user_id) for user_id in user_ids if user_id is not None
+        ]
+        if keys:
+            transaction.on_commit(lambda: default_cache.delete_many(keys))
+
+    def adjust(self, user_id, delta):
+        """Add ``delta`` to a cached count once the write commits."""
+        if user_id is None or not delta:
+            return
+        transaction.on_commit(lambda: self._apply(user_id, delta))
+
+    def _apply(self, user_id, delta):
+        key = self.key(user_id)
+        try:
+            if default_cache.incr(key, delta) < 0:
+                default_cache.delete(key)
+        except ValueError:
+            # No cached count: the next read loads it from the database
+            pass
+
+    def for_request(self, request):
+        """Per-request memoized count for the signed-in user (0 if none)."""
+        if not hasattr(request, self.request_attr):
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                count = self.get(user.pk)
+            else:
+                count = 0
+            setattr(request, self.request_attr, count)
+        return getattr(request, self.request_attr)
+
+    def lazy(self, request):
+        """The request's count, looked up only if a template renders it."""
+        return SimpleLazyObject(lambda: self.for_request(request))
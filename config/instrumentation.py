@@ -0,0 +1,155 @@
+"""Per-request instrumentation.
+
+``InstrumentationMiddleware`` (installed when INSTRUMENTATION_ENABLED is on)
+measures every request:
+
+- the number of SQL queries and the time spent in them, on every database
+  connection, through ``connection.execute_wrapper``;
+- the time spent rendering templates (outermost ``Template.render`` calls
+  only, so includes are not counted twice; lazy querysets evaluated by the
+  template count towards both figures);
+- the response size in bytes (None for streaming responses, whose body and
+  any queries it runs are produced after the middleware returns).
+
+The figures are keyed by URL name (``resolver_match.view_name``), logged as
+one JSON object per request on the ``config.instrumentation`` logger and
+sent to the browser in a ``Server-Timing`` header, where the network panel
+of the developer tools shows them.
+
+QUERY_BUDGETS maps URL names to the most SQL queries the view may run.
+A view over budget is logged as a warning, or raises QueryBudgetExceeded
+when QUERY_BUDGET_STRICT is on. The budget tests install the middleware
+with strict budgets through override_settings, so a change that adds
+queries to a budgeted view fails the test suite.
+"""
+import contextvars
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.template.base import Template
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A view ran more SQL queries than its QUERY_BUDGETS entry allows."""
+
+
+class RequestMetrics:
+    """Counters for the request being handled."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+
+
+def current_metrics():
+    """Metrics of the request in progress, or None outside one."""
+    return _current.get()
+
+
+def _count_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - start
+
+
+_original_render = Template.render
+
+
+def _timed_render(self, context):
+    metrics = _current.get()
+    if metrics is None:
+        return _original_render(self, context)
+    metrics.template_depth += 1
+    start = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        metrics.template_depth -= 1
+        if not metrics.template_depth:
+            metrics.template_time += time.perf_counter() - start
+
+
+def install_template_timer():
+    """Wrap Template.render once; a no-op outside instrumented requests."""
+    if Template.render is not _timed_render:
+        Template.render = _timed_render
+
+
+def server_timing(metrics, total):
+    """``Server-Timing`` header value for ``metrics`` (durations in ms)."""
+    return ', '.join([
+        f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+        f'tpl;dur={metrics.template_time * 1000:.1f}',
+        f'total;dur={total * 1000:.1f}',
+    ])
+
+
+class InstrumentationMiddleware:
+    """Measure queries, DB/template time and size of every response."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.budgets = getattr(settings, 'QUERY_BUDGETS', {})
+        self.strict = getattr(settings, 'QUERY_BUDGET_STRICT', False)
+        install_template_timer()
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(_count_query)
+                    )
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else None
+        budget = self.budgets.get(view)
+        record = {
+            'view': view,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            'query_budget': budget,
+            'db_ms': round(metrics.db_time * 1000, 1),
+            'template_ms': round(metrics.template_time * 1000, 1),
+            'total_ms': round(total * 1000, 1),
+            'response_bytes': (
+                None if response.streaming else len(response.content)
+            ),
+        }
+        response['Server-Timing'] = server_timing(metrics, total)
+        logger.info(json.dumps(record), extra={'instrumentation': record})
+
+        if budget is not None and metrics.queries > budget:
+            message = (
+                f'{view} ran {metrics.queries} SQL queries; '
+                f'QUERY_BUDGETS allows {budget}'
+            )
+            if self.strict:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message, extra={'instrumentation': record})
+        return response
@@ -0,0 +1,62 @@
+"""Project-wide middleware."""
+from django.conf import settings
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+
+def _sets_cookies(request, response):
+    # SessionMiddleware runs inside this middleware, so its cookie is
+    # already on the response; a modified session is checked as well in
+    # case the middleware order changes.
+    session = getattr(request, 'session', None)
+    return bool(response.cookies) or (
+        session is not None and session.modified
+    )
+
+
+class MediaCacheMiddleware:
+    """Add Cache-Control headers that views did not set themselves.
+
+    - Files served under MEDIA_URL are immutable uploads and may be cached
+      by browsers and CDNs for MEDIA_CACHE_MAX_AGE seconds.
+    - Pages cached for anonymous visitors (see config.cache) may be cached
+      publicly for PAGE_BROWSER_CACHE_MAX_AGE seconds, varying on Cookie so
+      a signed-in visitor never receives the anonymous copy. A response
+      that sets a cookie (with SESSION_SAVE_EVERY_REQUEST, any visitor with
+      a non-empty session) is marked private instead, so a shared cache
+      never replays one visitor's Set-Cookie to another.
+    - Everything else served to a signed-in user is marked private.
+
+    Static files are left to WhiteNoise, which sets its own headers.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.media_url = settings.MEDIA_URL
+        self.media_max_age = getattr(
+            settings, 'MEDIA_CACHE_MAX_AGE', 60 * 60 * 24 * 30
+        )
+        self.page_max_age = getattr(settings, 'PAGE_BROWSER_CACHE_MAX_AGE', 60)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.has_header('Cache-Control'):
+            return response
+
+        if self.media_url and request.path.startswith(self.media_url):
+            if response.status_code == 200:
+                patch_cache_control(
+                    response, public=True, max_age=self.media_max_age
+                )
+        elif getattr(response, 'page_cacheable', False):
+            if _sets_cookies(request, response):
+                patch_cache_control(response, private=True)
+            else:
+                patch_cache_control(
+                    response, public=True, max_age=self.page_max_age
+                )
+            patch_vary_headers(response, ('Cookie',))
+        else:
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                patch_cache_control(response, private=True)
+        return response
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 from pathlib import Path
 import os    # Val added 
 import sys
+from urllib.parse import urlparse
 import dj_database_url
 import cloudinary
 import cloudinary.uploader
@@ -73,6 +74,12 @@ LOGGING = {
             'level': 'ERROR',
             'propagate': False,
         },
+        # One JSON line per request from config.instrumentation
+        'config.instrumentation': {
+            'handlers': ['console'],
+            'level': os.environ.get('INSTRUMENTATION_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
     },
 }
 
@@ -89,6 +96,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.sitemaps',
+    'django.contrib.postgres',
     'cloudinary_storage',
     'django.contrib.sites',
     'allauth',
@@ -112,7 +120,7 @@ MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
 
-    # 'config.middleware.MediaCacheMiddleware',  # Custom media cache headers
+    'config.middleware.MediaCacheMiddleware',  # Custom media cache headers
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -124,6 +132,38 @@ MIDDLEWARE = [
 
 ]
 
+# Request instrumentation (config.instrumentation): SQL query count and
+# time, template time and response size per request, logged as JSON and
+# sent in a Server-Timing header. Opt-in; the tests that check the query
+# budgets below switch it on with override_settings.
+INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION_ENABLED') == 'True'
+if INSTRUMENTATION_ENABLED:
+    # Outermost, so the timings cover every other middleware
+    MIDDLEWARE.insert(0, 'config.instrumentation.InstrumentationMiddleware')
+
+# Most SQL queries each URL name may run. Exceeding a budget logs a
+# warning, or raises QueryBudgetExceeded (failing the test) when
+# QUERY_BUDGET_STRICT is on.
+QUERY_BUDGETS = {
+    'collections_app:index': 4,
+    'collections_app:gallery': 4,
+    'collections_app:gallery_debug': 4,
+    'collections_app:gallery_collection_arts': 3,
+    'collections_app:artwork_list': 6,
+    'collections_app:artwork_list_page': 4,
+    'collections_app:artwork_price_histogram': 4,
+    'collections_app:artwork_search_by_price': 4,
+    'collections_app:artworks_by_artist': 4,
+    'collections_app:artwork_detail': 10,
+    'collections_app:basket': 12,
+    'collections_app:checkout': 30,
+    'collections_app:manage_media': 10,
+    'collections_app:messages': 10,
+    'owner_app:art_list': 10,
+    'owner_app:assign_art': 10,
+}
+QUERY_BUDGET_STRICT = os.environ.get('QUERY_BUDGET_STRICT') == 'True'
+
 # Security Headers - Improve Best Practices Score
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
@@ -142,6 +182,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'owner_app.context_processors.unread_messages',
+                'collections_app.context_processors.basket',
             ],
         },
     },
@@ -186,6 +228,74 @@ except Exception as exc:
     raise RuntimeError(f"Unable to parse DATABASE_URL={_raw_db!r}: {exc}") from exc
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Select the backend with CACHE_URL:
+#   locmem://                 per-process memory (default); not shared
+#                             between gunicorn workers or manage.py
+#                             commands, so anonymous page caching is off
+#                             with it unless DEBUG is on (config.cache)
+#   file:///var/tmp/cache     filesystem, shared by workers on one host
+#   redis://host:6379/0       Redis or a compatible server (rediss:// for
+#                             TLS); requires the `redis` package
+#   dummy://                  disable caching
+_cache_url = urlparse(os.environ.get('CACHE_URL', 'locmem://'))
+_cache_backends = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'rediss': 'django.core.cache.backends.redis.RedisCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+if _cache_url.scheme not in _cache_backends:
+    raise RuntimeError(f"Unsupported CACHE_URL scheme: {_cache_url.scheme!r}")
+if _cache_url.scheme in ('redis', 'rediss'):
+    _cache_location = _cache_url.geturl()
+elif _cache_url.scheme == 'file':
+    _cache_location = _cache_url.path
+else:
+    _cache_location = _cache_url.netloc
+CACHES = {
+    'default': {
+        'BACKEND': _cache_backends[_cache_url.scheme],
+        'LOCATION': _cache_location,
+        'KEY_PREFIX': os.environ.get('CACHE_KEY_PREFIX', 'cc'),
+        'TIMEOUT': int(os.environ.get('CACHE_TIMEOUT', 300)),
+    }
+}
+
+# Anonymous page cache (config.cache) and browser cache lifetimes
+# (config.middleware.MediaCacheMiddleware)
+PAGE_CACHE_ALIAS = os.environ.get('PAGE_CACHE_ALIAS', 'default')
+PAGE_CACHE_TIMEOUT = int(os.environ.get('PAGE_CACHE_TIMEOUT', 600))
+# Unset: page caching is on for shared backends (redis, file) and under
+# DEBUG. 'True'/'False' force it on or off.
+PAGE_CACHE_ENABLED = (
+    os.environ['PAGE_CACHE_ENABLED'] == 'True'
+    if 'PAGE_CACHE_ENABLED' in os.environ else None
+)
+PAGE_BROWSER_CACHE_MAX_AGE = int(
+    os.environ.get('PAGE_BROWSER_CACHE_MAX_AGE', 60)
+)
+MEDIA_CACHE_MAX_AGE = int(os.environ.get('MEDIA_CACHE_MAX_AGE', 2592000))
+
+# Cached per-owner unread message counters (owner_app.unread). They are
+# updated incrementally; the timeout bounds how long any drift can last.
+UNREAD_MESSAGES_CACHE_TIMEOUT = int(
+    os.environ.get('UNREAD_MESSAGES_CACHE_TIMEOUT', 300)
+)
+
+# Cached navbar basket counts (collections_app.basket_count), dropped
+# whenever a basket's totals change.
+BASKET_COUNT_CACHE_TIMEOUT = int(
+    os.environ.get('BASKET_COUNT_CACHE_TIMEOUT', 300)
+)
+
+# Minutes a stocked variant (e.g. an original) stays held for a basket
+# before other shoppers can buy it (collections_app.inventory).
+BASKET_HOLD_MINUTES = int(os.environ.get('BASKET_HOLD_MINUTES', 15))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -268,6 +378,31 @@ WHITENOISE_SKIP_COMPRESS_EXTENSIONS = [
 # Enable static file compression for better transfer efficiency
 # STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
 
+# Storefront listing: number of artworks per keyset page (infinite scroll)
+ARTWORK_LIST_PAGE_SIZE = int(os.environ.get('ARTWORK_LIST_PAGE_SIZE', 24))
+
+# Storefront price filter: target number of histogram buckets
+# (collections_app.pricing; edges are rounded, so a few more may appear)
+PRICE_HISTOGRAM_BUCKETS = int(os.environ.get('PRICE_HISTOGRAM_BUCKETS', 10))
+
+# Gallery: slides per collection carousel on first render and per
+# "Load more" request
+GALLERY_CAROUSEL_SIZE = int(os.environ.get('GALLERY_CAROUSEL_SIZE', 8))
+
+# Owner exports (owner_app.exports): rows fetched per database round trip
+# while streaming, which bounds the memory an export uses
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 2000))
+
+# Homepage context cache (collections_app.homepage). Invalidated by
+# Media/Art/ArtVariant signals; the timeout is only a safety net. On a
+# per-process cache (locmem) invalidation cannot reach other workers, so
+# the timeout is capped at HOMEPAGE_LOCAL_CACHE_TIMEOUT there.
+HOMEPAGE_CACHE_ALIAS = os.environ.get('HOMEPAGE_CACHE_ALIAS', 'default')
+HOMEPAGE_CACHE_TIMEOUT = int(os.environ.get('HOMEPAGE_CACHE_TIMEOUT', 3600))
+HOMEPAGE_LOCAL_CACHE_TIMEOUT = int(
+    os.environ.get('HOMEPAGE_LOCAL_CACHE_TIMEOUT', 30)
+)
+
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
@@ -289,6 +424,14 @@ else:
     )
 
 DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
+
+# Memoized Cloudinary delivery URLs (collections_app.images.resource_url):
+# entries kept in each process's LRU, plus an optional shared cache alias
+# from CACHES so workers reuse each other's URLs.
+CLOUDINARY_URL_CACHE_SIZE = int(
+    os.environ.get('CLOUDINARY_URL_CACHE_SIZE', 4096)
+)
+CLOUDINARY_URL_CACHE_ALIAS = os.environ.get('CLOUDINARY_URL_CACHE_ALIAS') or None
 MEDIA_URL = '/media/'  # Django won't serve these in production; Cloudinary URLs will be returned for uploaded files
 
 # ============================================================================
@@ -320,9 +463,24 @@ STRIPE_WEBHOOK_SECRET = os.environ.get(
 # Stripe API version (optional, uses Stripe's default if not set)
 STRIPE_API_VERSION = '2024-11-20.acacia'
 
-# Currency for payments (ISO 4217 code)
+# Take real payments through collections_app.payments. While off, checkout
+# keeps creating admin test orders without contacting Stripe.
+STRIPE_PAYMENTS_ENABLED = os.environ.get('STRIPE_PAYMENTS_ENABLED') == 'True'
+
+# Override the Stripe API host, e.g. http://localhost:12111 for a local
+# stripe-mock server in development and CI.
+STRIPE_API_BASE = os.environ.get('STRIPE_API_BASE') or None
+
+# Currency for payments (ISO 4217 code). Checkout refuses Stripe orders
+# for items priced in any other currency.
 STRIPE_CURRENCY = 'usd'
 
+# Stripe orders still unpaid after this long are cancelled and their stock
+# put back by the process_payments worker.
+STRIPE_PENDING_ORDER_MINUTES = int(
+    os.environ.get('STRIPE_PENDING_ORDER_MINUTES', 60)
+)
+
 # Enable Stripe payment logging for debugging
 STRIPE_LOGGING_ENABLED = DEBUG
 
@@ -345,3 +503,27 @@ else:
         'EMAIL_BACKEND',
         'django.core.mail.backends.smtp.EmailBackend',
     )
+
+# Database outbox (owner_app.outbox), drained by `manage.py send_outbox`.
+# Each pass sends up to OUTBOX_BATCH_SIZE emails over one connection; a
+# failed email waits OUTBOX_RETRY_BASE_SECONDS, doubling per attempt up to
+# OUTBOX_RETRY_MAX_SECONDS, and is given up after OUTBOX_MAX_ATTEMPTS.
+# A worker leases the emails it picks for OUTBOX_LEASE_SECONDS; keep it
+# longer than a batch takes to send.
+OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', 50))
+OUTBOX_LEASE_SECONDS = int(os.environ.get('OUTBOX_LEASE_SECONDS', 300))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 6))
+OUTBOX_RETRY_BASE_SECONDS = int(
+    os.environ.get('OUTBOX_RETRY_BASE_SECONDS', 60)
+)
+OUTBOX_RETRY_MAX_SECONDS = int(
+    os.environ.get('OUTBOX_RETRY_MAX_SECONDS', 60 * 60)
+)
+
+# Comma-separated addresses told about new orders; defaults to the
+# superusers' emails (collections_app.order_emails).
+ORDER_NOTIFICATION_EMAILS = [
+    address.strip()
+    for address in os.environ.get('ORDER_NOTIFICATION_EMAILS', '').split(',')
+    if address.strip()
+]
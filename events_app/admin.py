@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from .models import Exhibition, ExhibitionArt
+from collections_app.images import THUMBNAIL_WIDTH, image_url
 
 
 @admin.register(Exhibition)
@@ -22,7 +23,7 @@ class ExhibitionAdmin(admin.ModelAdmin):
         if obj.cover_image:
             return format_html(
                 '<img src="{}" style="max-height:75px;" />',
-                obj.cover_image.url,
+                image_url(obj.cover_image, THUMBNAIL_WIDTH),
             )
         return ''
 
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class EventsAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'events_app'
+
+    def ready(self):
+        # Register signal receivers (page cache invalidation)
+        from . import signals  # noqa: F401
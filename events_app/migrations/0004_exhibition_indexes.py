@@ -0,0 +1,21 @@
+# Generated by Django 4.2.24 on 2026-10-17 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events_app', '0003_exhibitionmedia'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='exhibition',
+            index=models.Index(condition=models.Q(('status', 'finished'), _negated=True), fields=['start_date'], name='exhibition_upcoming_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exhibition',
+            index=models.Index(condition=models.Q(('status', 'finished')), fields=['-end_date'], name='exhibition_previous_idx'),
+        ),
+    ]
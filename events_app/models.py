@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from cloudinary.models import CloudinaryField
 
 
@@ -24,6 +25,23 @@ class Exhibition(models.Model):
     # allow either image or video uploads for exhibition cover
     cover_image = CloudinaryField(resource_type='auto', blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # Events page: upcoming = status <> 'finished' ORDER BY
+            # start_date, previous = status = 'finished' ORDER BY
+            # end_date DESC
+            models.Index(
+                fields=['start_date'],
+                name='exhibition_upcoming_idx',
+                condition=~Q(status='finished'),
+            ),
+            models.Index(
+                fields=['-end_date'],
+                name='exhibition_previous_idx',
+                condition=Q(status='finished'),
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -0,0 +1,32 @@
+"""Signal receivers for events_app.
+
+Connected from EventsAppConfig.ready().
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from collections_app.models import Art, Media
+from config.cache import bump_page_cache_version
+
+from .models import Exhibition, ExhibitionArt, ExhibitionMedia
+
+
+@receiver(post_save, sender=Exhibition)
+@receiver(post_delete, sender=Exhibition)
+@receiver(post_save, sender=ExhibitionArt)
+@receiver(post_delete, sender=ExhibitionArt)
+@receiver(post_save, sender=ExhibitionMedia)
+@receiver(post_delete, sender=ExhibitionMedia)
+@receiver(post_save, sender=Art)
+@receiver(post_delete, sender=Art)
+@receiver(post_save, sender=Media)
+@receiver(post_delete, sender=Media)
+def invalidate_events_page(sender, **kwargs):
+    """The events index is cached for anonymous visitors.
+
+    It lists each exhibition with its assigned art and media, so links
+    being added or removed and the art or media itself changing all count.
+    Bumped on commit, like collections_app's cache receivers.
+    """
+    transaction.on_commit(lambda: bump_page_cache_version('events'))
@@ -1,7 +1,9 @@
 from django.shortcuts import render, get_object_or_404
+from config.cache import cache_anonymous_page
 from .models import Exhibition
 
 
+@cache_anonymous_page('events')
 def index(request):
     """Show events page with upcoming and previous exhibitions.
 
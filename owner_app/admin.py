@@ -1,6 +1,9 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import ArtistProfile, Contact, Messages
+from .models import ArtistProfile, Contact, Messages, OutboundEmail
+from .outbox import retry
+from .unread import reset_unread_count
+from collections_app.images import THUMBNAIL_WIDTH, image_url
 
 
 @admin.register(ArtistProfile)
@@ -11,7 +14,8 @@ class ArtistProfileAdmin(admin.ModelAdmin):
     def image_preview(self, obj):
         if obj.image:
             return format_html(
-                '<img src="{}" style="max-height:75px;" />', obj.image.url
+                '<img src="{}" style="max-height:75px;" />',
+                image_url(obj.image, THUMBNAIL_WIDTH),
             )
         return ''
 
@@ -40,12 +44,34 @@ class UserMessages(admin.ModelAdmin):
     def mark_read(self, request, queryset):
         queryset.update(unread=False)
         cnt = queryset.count()
+        # update() sends no signals; drop the affected cached counters
+        reset_unread_count(*queryset.values_list('owner_id', flat=True))
         self.message_user(request, f'Marked {cnt} messages as read')
 
     def mark_unread(self, request, queryset):
         queryset.update(unread=True)
         cnt = queryset.count()
+        reset_unread_count(*queryset.values_list('owner_id', flat=True))
         self.message_user(request, f'Marked {cnt} messages as unread')
 
     mark_read.short_description = 'Mark selected messages as read'
     mark_unread.short_description = 'Mark selected messages as unread'
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at'
+    )
+    list_filter = ('status',)
+    search_fields = ('subject',)
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
+    actions = ['retry_failed']
+
+    def retry_failed(self, request, queryset):
+        failed = list(queryset.filter(status=OutboundEmail.FAILED))
+        for email in failed:
+            retry(email)
+        self.message_user(request, f'Queued {len(failed)} emails for retry')
+
+    retry_failed.short_description = 'Retry selected failed emails'
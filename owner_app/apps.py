@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class OwnerAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'owner_app'
+
+    def ready(self):
+        # Register signal receivers (page cache invalidation)
+        from . import signals  # noqa: F401
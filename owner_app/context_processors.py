@@ -0,0 +1,13 @@
+"""Template context processors for owner_app."""
+from .unread import UNREAD_COUNT
+
+
+def unread_messages(request):
+    """Expose ``unread_message_count`` to every template.
+
+    Lazy, so pages that never render the badge never look it up, and
+    memoized on the request, so rendering it several times costs one lookup.
+    """
+    return {
+        'unread_message_count': UNREAD_COUNT.lazy(request),
+    }
@@ -0,0 +1,232 @@
+"""Streaming data exports for the owner.
+
+Each dataset is a generator of records read with
+``.iterator(chunk_size=EXPORT_CHUNK_SIZE)``: rows are fetched a chunk at a
+time (through a server-side cursor on Postgres) and related rows are
+prefetched per chunk, so an export holds at most one chunk in memory
+whatever the table size. ``stream_export`` turns the records into CSV or
+JSON Lines text for a StreamingHttpResponse.
+
+- ``catalog``: one record per Art, with its variants as the
+  ``original_*``/``poster_*``/``digital_*`` columns. The columns are those
+  ``manage.py import_catalog`` reads, so an export can be edited and
+  imported back.
+- ``orders``: one record per Order with its OrderItem snapshots under
+  ``items``; the CSV has one line per item, repeating the order columns.
+- ``messages``: the owner's inbox.
+"""
+import csv
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+# Art columns exported as they are
+ART_COLUMNS = (
+    'medium',
+    'year_created',
+    'width_cm',
+    'height_cm',
+    'depth_cm',
+    'price',
+    'currency',
+    'is_available',
+    'is_featured',
+    'description',
+    'created_at',
+)
+
+CATALOG_COLUMNS = (
+    'id',
+    'artist_email',
+    'collection',
+    'title',
+    *ART_COLUMNS,
+    'original_price',
+    'original_available',
+    'poster_price',
+    'poster_available',
+    'digital_price',
+    'digital_available',
+)
+
+ORDER_COLUMNS = (
+    'order_number',
+    'status',
+    'created_at',
+    'total_amount',
+    'payment_method',
+    'email',
+    'full_name',
+    'address_line1',
+    'address_line2',
+    'city',
+    'postal_code',
+    'country',
+)
+
+ORDER_ITEM_COLUMNS = (
+    'art_id',
+    'artwork_title',
+    'artwork_artist',
+    'artwork_medium',
+    'variant_id',
+    'variant_medium',
+    'quantity',
+    'price',
+)
+
+MESSAGE_COLUMNS = (
+    'id',
+    'sent_at',
+    'name',
+    'email',
+    'phone',
+    'subject',
+    'message',
+    'unread',
+)
+
+# Leading characters that make spreadsheet applications evaluate a cell
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _chunk_size():
+    return getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+
+def catalog_records(user):
+    from collections_app.models import Art, ArtVariant
+
+    prefixes = {
+        ArtVariant.ORIGINAL: 'original',
+        ArtVariant.POSTER: 'poster',
+        ArtVariant.DIGITAL: 'digital',
+    }
+    arts = (
+        Art.objects.select_related('collection__artist')
+        .only(
+            'id',
+            'title',
+            *ART_COLUMNS,
+            'collection__name',
+            'collection__artist__email',
+        )
+        .prefetch_related('variants')
+        .order_by('pk')
+    )
+    for art in arts.iterator(chunk_size=_chunk_size()):
+        record = {
+            'id': art.pk,
+            'artist_email': art.collection.artist.email,
+            'collection': art.collection.name,
+            'title': art.title,
+        }
+        for column in ART_COLUMNS:
+            record[column] = getattr(art, column)
+        for prefix in prefixes.values():
+            record[f'{prefix}_price'] = None
+            record[f'{prefix}_available'] = None
+        for variant in art.variants.all():
+            prefix = prefixes.get(variant.medium)
+            if prefix:
+                record[f'{prefix}_price'] = variant.price
+                record[f'{prefix}_available'] = variant.is_available
+        yield record
+
+
+def order_records(user):
+    from collections_app.models import Order
+
+    orders = (
+        Order.objects.only(*ORDER_COLUMNS)
+        .prefetch_related('items')
+        .order_by('pk')
+    )
+    for order in orders.iterator(chunk_size=_chunk_size()):
+        record = {column: getattr(order, column) for column in ORDER_COLUMNS}
+        record['items'] = [
+            {column: getattr(item, column) for column in ORDER_ITEM_COLUMNS}
+            for item in order.items.all()
+        ]
+        yield record
+
+
+def message_records(user):
+    from .models import Messages
+
+    messages = (
+        Messages.objects.filter(owner=user)
+        .only(*MESSAGE_COLUMNS)
+        .order_by('-sent_at', '-pk')
+    )
+    for message in messages.iterator(chunk_size=_chunk_size()):
+        yield {column: getattr(message, column) for column in MESSAGE_COLUMNS}
+
+
+def _order_csv_rows(records):
+    # One line per item; an order without items still gets one line
+    empty = dict.fromkeys(ORDER_ITEM_COLUMNS)
+    for record in records:
+        for item in record['items'] or [empty]:
+            yield {**record, **item}
+
+
+# dataset -> (record generator, CSV columns, CSV row flattener)
+DATASETS = {
+    'catalog': (catalog_records, CATALOG_COLUMNS, None),
+    'orders': (
+        order_records, ORDER_COLUMNS + ORDER_ITEM_COLUMNS, _order_csv_rows
+    ),
+    'messages': (message_records, MESSAGE_COLUMNS, None),
+}
+
+# Datasets holding text typed by visitors, escaped for spreadsheets in CSV.
+# The catalog is the owner's own data and is left as is, so an exported
+# file can be imported back as it is.
+ESCAPED_DATASETS = {'orders', 'messages'}
+
+
+class _Echo:
+    """File-like object whose write() returns what it is given.
+
+    csv.writer writes each row to it, so writerow() returns the formatted
+    line instead of buffering it.
+    """
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value, escape):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if escape and isinstance(value, str) and value.startswith(
+        FORMULA_PREFIXES
+    ):
+        # Keep spreadsheets from running visitor-supplied text as formulas
+        return "'" + value
+    return value
+
+
+def stream_export(dataset, fmt, user):
+    """Yield the lines of ``dataset`` as ``fmt`` ('csv' or 'jsonl')."""
+    records_for, columns, flatten = DATASETS[dataset]
+    records = records_for(user)
+    if fmt == 'jsonl':
+        for record in records:
+            yield json.dumps(record, cls=DjangoJSONEncoder) + '\n'
+        return
+
+    escape = dataset in ESCAPED_DATASETS
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in (flatten(records) if flatten else records):
+        yield writer.writerow([_csv_value(row[c], escape) for c in columns])
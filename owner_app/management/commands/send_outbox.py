@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from owner_app.outbox import send_batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Outbox worker: send queued emails in batches over one SMTP '
+        'connection, retrying failures with backoff. Runs until interrupted '
+        'unless --once is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Send one batch and exit (e.g. from cron)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds to sleep when no email was due (default 5)',
+        )
+        parser.add_argument(
+            '--batch',
+            type=int,
+            default=None,
+            help='Emails per batch (default OUTBOX_BATCH_SIZE)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_batch(limit=options['batch'])
+            if sent or failed:
+                self.stdout.write(f'Sent {sent} emails, {failed} failed')
+            if options['once']:
+                return
+            if not (sent or failed):
+                try:
+                    time.sleep(options['interval'])
+                except KeyboardInterrupt:
+                    return
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.24 on 2026-10-17 18:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('owner_app', '0003_contact_curator_email_contact_curator_name'),
+        ('owner_app', '0005_add_messagereply'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='messages',
+            index=models.Index(fields=['owner', 'unread'], name='messages_owner_unread_idx'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.24 on 2026-10-17 19:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def mark_emailed_replies_sent(apps, schema_editor):
+    # Replies emailed before the outbox existed were sent synchronously
+    MessageReply = apps.get_model('owner_app', 'MessageReply')
+    MessageReply.objects.filter(via_email=True).update(
+        delivery_status='sent'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('owner_app', '0006_messages_owner_unread_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='messagereply',
+            name='delivered_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='messagereply',
+            name='delivery_status',
+            field=models.CharField(choices=[('internal', 'Internal only'), ('queued', 'Queued'), ('sent', 'Sent'), ('failed', 'Failed')], default='internal', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255)),
+                ('body', models.TextField()),
+                ('html_body', models.TextField(blank=True)),
+                ('from_email', models.CharField(max_length=255)),
+                ('to', models.JSONField(help_text='List of recipient addresses')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField()),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('reply', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='emails', to='owner_app.messagereply')),
+            ],
+            options={
+                'verbose_name': 'Outbound Email',
+                'verbose_name_plural': 'Outbound Emails',
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx')],
+            },
+        ),
+        migrations.RunPython(
+            mark_emailed_replies_sent, migrations.RunPython.noop
+        ),
+    ]
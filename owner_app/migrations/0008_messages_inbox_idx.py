@@ -0,0 +1,23 @@
+# Generated by Django 4.2.24 on 2026-10-17 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('owner_app', '0007_outbox'),
+    ]
+
+    operations = [
+        # Create the replacement before dropping the old index, so the
+        # unread count is never left without one
+        migrations.AddIndex(
+            model_name='messages',
+            index=models.Index(fields=['owner', '-unread', '-sent_at'], name='messages_inbox_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='messages',
+            name='messages_owner_unread_idx',
+        ),
+    ]
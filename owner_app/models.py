@@ -74,9 +74,28 @@ class Messages(models.Model):
     def __str__(self):
         return f"Message from {self.name} <{self.email}>"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored state so the unread counter receivers in
+        # owner_app.signals can tell what a save or delete changed.
+        # Read __dict__ so deferred fields are not fetched here.
+        instance._loaded_unread = instance.__dict__.get('unread')
+        instance._loaded_owner_id = instance.__dict__.get('owner_id')
+        return instance
+
     class Meta:
         verbose_name = 'Message'
         verbose_name_plural = 'Messages'
+        indexes = [
+            # Inbox: WHERE owner_id = ? ORDER BY unread DESC, sent_at DESC.
+            # Its (owner, unread) prefix also serves the navbar unread
+            # badge, COUNT(*) WHERE owner_id = ? AND unread.
+            models.Index(
+                fields=['owner', '-unread', '-sent_at'],
+                name='messages_inbox_idx',
+            ),
+        ]
 
 
 class MessageReply(models.Model):
@@ -96,6 +115,22 @@ class MessageReply(models.Model):
     body = models.TextField()
     sent_at = models.DateTimeField(auto_now_add=True)
     via_email = models.BooleanField(default=False)
+    # Email delivery as reported by the outbox worker (owner_app.outbox)
+    INTERNAL = 'internal'
+    QUEUED = 'queued'
+    SENT = 'sent'
+    FAILED = 'failed'
+    delivery_status = models.CharField(
+        max_length=10,
+        choices=[
+            (INTERNAL, 'Internal only'),
+            (QUEUED, 'Queued'),
+            (SENT, 'Sent'),
+            (FAILED, 'Failed'),
+        ],
+        default=INTERNAL,
+    )
+    delivered_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return f"Reply to {self.message_id} by {self.sender or 'email'}"
@@ -103,3 +138,57 @@ class MessageReply(models.Model):
     class Meta:
         ordering = ('sent_at',)
 
+
+class OutboundEmail(models.Model):
+    """An email waiting in the database outbox.
+
+    Requests only insert rows; ``manage.py send_outbox`` sends them in
+    batches over one SMTP connection and retries failures with exponential
+    backoff (see owner_app.outbox).
+    """
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(help_text='List of recipient addresses')
+    status = models.CharField(
+        max_length=10,
+        choices=[
+            (PENDING, 'Pending'),
+            (SENT, 'Sent'),
+            (FAILED, 'Failed'),
+        ],
+        default=PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    # The reply whose delivery_status this email reports, if any
+    reply = models.ForeignKey(
+        MessageReply,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='emails',
+    )
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)} ({self.status})"
+
+    class Meta:
+        verbose_name = 'Outbound Email'
+        verbose_name_plural = 'Outbound Emails'
+        indexes = [
+            # The worker's queue scan: due pending rows, oldest first
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='outbox_due_idx',
+            ),
+        ]
+
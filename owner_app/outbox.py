@@ -0,0 +1,178 @@
+"""Database-backed email outbox.
+
+Views never talk to the mail server. ``enqueue`` inserts an OutboundEmail
+row (inside the caller's transaction, so a rolled-back request sends
+nothing) and ``manage.py send_outbox`` delivers due rows with
+``send_batch``:
+
+- due rows are claimed in a short transaction: locked with ``SELECT ...
+  FOR UPDATE SKIP LOCKED`` and leased by moving their next_attempt_at
+  OUTBOX_LEASE_SECONDS ahead, so several workers never send the same
+  email. No transaction is open while the mail server is talked to;
+- each email's result is saved right after its send, so a worker that
+  dies mid-batch only leaves its unsent rows, which fall due again when
+  their lease runs out;
+- one connection from ``get_connection()`` is opened per batch and reused
+  for every message in it;
+- a failed message is retried after OUTBOX_RETRY_BASE_SECONDS * 2 ** (n-1)
+  seconds (capped at OUTBOX_RETRY_MAX_SECONDS) and given up after
+  OUTBOX_MAX_ATTEMPTS attempts;
+- emails tied to a MessageReply update its delivery_status.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import MessageReply, OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(subject, body, to, html_body='', from_email=None, reply=None):
+    """Queue an email for the outbox worker and return its row."""
+    email = OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        html_body=html_body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+        next_attempt_at=timezone.now(),
+        reply=reply,
+    )
+    if reply is not None and reply.delivery_status != MessageReply.QUEUED:
+        reply.delivery_status = MessageReply.QUEUED
+        reply.save(update_fields=['delivery_status'])
+    return email
+
+
+def retry(email):
+    """Make a failed email due again with a fresh attempt budget."""
+    OutboundEmail.objects.filter(pk=email.pk).update(
+        status=OutboundEmail.PENDING,
+        attempts=0,
+        next_attempt_at=timezone.now(),
+    )
+    if email.reply_id:
+        MessageReply.objects.filter(pk=email.reply_id).update(
+            delivery_status=MessageReply.QUEUED
+        )
+
+
+def backoff(attempts):
+    """Delay before the next try after ``attempts`` failed attempts."""
+    base = getattr(settings, 'OUTBOX_RETRY_BASE_SECONDS', 60)
+    cap = getattr(settings, 'OUTBOX_RETRY_MAX_SECONDS', 60 * 60)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), cap))
+
+
+def _message(email, connection):
+    message = EmailMultiAlternatives(
+        email.subject,
+        email.body,
+        email.from_email,
+        email.to,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def _failed(email, exc, now, max_attempts):
+    email.attempts += 1
+    email.last_error = repr(exc)
+    if email.attempts >= max_attempts:
+        email.status = OutboundEmail.FAILED
+    else:
+        email.next_attempt_at = now + backoff(email.attempts)
+
+
+def lease_duration():
+    return timedelta(seconds=getattr(settings, 'OUTBOX_LEASE_SECONDS', 300))
+
+
+def _claim(limit, now):
+    """Lease up to ``limit`` due emails to this worker and return them."""
+    with transaction.atomic():
+        emails = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:limit]
+        )
+        OutboundEmail.objects.filter(pk__in=[e.pk for e in emails]).update(
+            next_attempt_at=now + lease_duration()
+        )
+    return emails
+
+
+def _save_result(email):
+    email.save(update_fields=[
+        'status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at',
+    ])
+    _record_reply_delivery([email])
+
+
+def send_batch(limit=None):
+    """Send up to ``limit`` due emails; returns (sent, failed) counts."""
+    limit = limit or getattr(settings, 'OUTBOX_BATCH_SIZE', 50)
+    max_attempts = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 6)
+    now = timezone.now()
+    emails = _claim(limit, now)
+    if not emails:
+        return 0, 0
+
+    sent = failed = 0
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:
+        # No connection at all: the whole batch backs off
+        logger.warning('Outbox connection failed: %r', exc)
+        for email in emails:
+            _failed(email, exc, now, max_attempts)
+            _save_result(email)
+        return 0, len(emails)
+
+    try:
+        for email in emails:
+            try:
+                connection.send_messages([_message(email, connection)])
+            except Exception as exc:
+                logger.warning('Outbox email %s failed: %r', email.pk, exc)
+                _failed(email, exc, timezone.now(), max_attempts)
+                failed += 1
+            else:
+                email.attempts += 1
+                email.status = OutboundEmail.SENT
+                email.sent_at = timezone.now()
+                email.last_error = ''
+                sent += 1
+            _save_result(email)
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def _record_reply_delivery(emails):
+    sent_ids = [
+        e.reply_id for e in emails
+        if e.reply_id and e.status == OutboundEmail.SENT
+    ]
+    failed_ids = [
+        e.reply_id for e in emails
+        if e.reply_id and e.status == OutboundEmail.FAILED
+    ]
+    if sent_ids:
+        MessageReply.objects.filter(pk__in=sent_ids).update(
+            delivery_status=MessageReply.SENT,
+            delivered_at=timezone.now(),
+            via_email=True,
+        )
+    if failed_ids:
+        MessageReply.objects.filter(pk__in=failed_ids).update(
+            delivery_status=MessageReply.FAILED
+        )
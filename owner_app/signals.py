@@ -0,0 +1,47 @@
+"""Signal receivers for owner_app.
+
+Connected from OwnerAppConfig.ready().
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from config.cache import bump_page_cache_version
+
+from .models import ArtistProfile, Messages
+from .unread import adjust_unread_count, reset_unread_count
+
+
+@receiver(post_save, sender=ArtistProfile)
+@receiver(post_delete, sender=ArtistProfile)
+def invalidate_artist_pages(sender, **kwargs):
+    """The artist appears on the about page and on every catalog page."""
+    bump_page_cache_version('about', 'catalog')
+
+
+@receiver(post_save, sender=Messages)
+def track_unread_on_save(sender, instance, created, raw=False, **kwargs):
+    """Adjust the cached unread counters for a created or edited message."""
+    if raw:
+        return
+    if created:
+        if instance.unread:
+            adjust_unread_count(instance.owner_id, 1)
+    else:
+        old_owner = getattr(instance, '_loaded_owner_id', None)
+        old_unread = getattr(instance, '_loaded_unread', None)
+        if old_unread is None or old_owner != instance.owner_id:
+            # Unknown previous state (or a reassigned message): recount
+            reset_unread_count(old_owner, instance.owner_id)
+        elif old_unread != instance.unread:
+            adjust_unread_count(
+                instance.owner_id, 1 if instance.unread else -1
+            )
+    instance._loaded_unread = instance.unread
+    instance._loaded_owner_id = instance.owner_id
+
+
+@receiver(post_delete, sender=Messages)
+def track_unread_on_delete(sender, instance, **kwargs):
+    """QuerySet.delete() also sends this for every deleted message."""
+    if instance.unread:
+        adjust_unread_count(instance.owner_id, -1)
@@ -0,0 +1,436 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .models import Messages, MessageReply, OutboundEmail
+from .outbox import enqueue, send_batch
+from .unread import unread_count
+
+
+# ============================================================================
+# UNREAD MESSAGE COUNTER TESTS
+# owner_app.unread keeps a cached, incrementally updated count per owner
+# ============================================================================
+
+class UnreadMessageCounterTest(TestCase):
+    """Tests for the cached unread counter and its request memoization."""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user('owner', password='pw')
+        self.client.force_login(self.owner)
+
+    def make_message(self, **kwargs):
+        fields = {
+            'name': 'Visitor',
+            'email': 'visitor@example.com',
+            'message': 'Hello',
+            'owner': self.owner,
+        }
+        fields.update(kwargs)
+        # captureOnCommitCallbacks runs the counter updates that would
+        # otherwise wait for the test transaction to commit
+        with self.captureOnCommitCallbacks(execute=True):
+            return Messages.objects.create(**fields)
+
+    def assertCachedCount(self, expected):
+        # Compare the incrementally maintained value with a real COUNT(*)
+        self.assertEqual(unread_count(self.owner.pk), expected)
+        self.assertEqual(
+            Messages.objects.filter(owner=self.owner, unread=True).count(),
+            expected,
+        )
+
+    def test_counter_follows_create_read_and_delete(self):
+        self.assertCachedCount(0)
+        first = self.make_message()
+        second = self.make_message()
+        self.make_message(unread=False)
+        self.assertCachedCount(2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('collections_app:messages'),
+                            {'read': first.pk})
+        self.assertCachedCount(1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('collections_app:messages'),
+                             {'mark_read': second.pk})
+        self.assertCachedCount(0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('collections_app:message_detail', args=[first.pk]),
+                {'action': 'mark_unread'},
+            )
+        self.assertCachedCount(1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('collections_app:messages'),
+                             {'action': 'delete_all'})
+        self.assertCachedCount(0)
+
+    def test_cached_count_needs_no_query(self):
+        self.make_message()
+        unread_count(self.owner.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.owner.pk), 1)
+
+    def test_badge_lookup_is_memoized_per_request(self):
+        self.make_message()
+        cache.clear()
+        response = self.client.get(reverse('collections_app:messages'))
+        # Rendering the badge counted once and memoized the value
+        self.assertEqual(response.wsgi_request._unread_message_count, 1)
+        self.assertEqual(response.context['unread_message_count'], 1)
+
+
+# ============================================================================
+# EMAIL OUTBOX TESTS
+# Replies are queued in the request and delivered by owner_app.outbox
+# ============================================================================
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    OUTBOX_MAX_ATTEMPTS=2,
+    OUTBOX_RETRY_BASE_SECONDS=60,
+)
+class EmailOutboxTest(TestCase):
+    """Tests for the queued reply emails and the outbox worker."""
+
+    def setUp(self):
+        self.owner = User.objects.create_user('outbox', password='pw')
+        self.client.force_login(self.owner)
+        self.msg = Messages.objects.create(
+            name='Visitor', email='visitor@example.com', message='Hi',
+            owner=self.owner,
+        )
+
+    def reply(self):
+        return self.client.post(
+            reverse('collections_app:message_detail', args=[self.msg.pk]),
+            {
+                'action': 'reply', 'body': 'Thanks!',
+                'confirm_send_to_email': '1',
+            },
+        )
+
+    def test_reply_is_only_queued_in_the_request(self):
+        self.reply()
+        self.assertEqual(len(mail.outbox), 0)
+        reply = MessageReply.objects.get()
+        self.assertEqual(reply.delivery_status, MessageReply.QUEUED)
+        self.assertEqual(OutboundEmail.objects.get().to, ['visitor@example.com'])
+
+        self.assertEqual(send_batch(), (1, 0))
+        self.assertEqual(mail.outbox[0].to, ['visitor@example.com'])
+        reply.refresh_from_db()
+        self.assertEqual(reply.delivery_status, MessageReply.SENT)
+        self.assertTrue(reply.via_email)
+        self.assertIsNotNone(reply.delivered_at)
+
+    def test_batch_reuses_one_connection(self):
+        from unittest import mock
+        from django.core.mail import get_connection
+
+        for i in range(3):
+            enqueue(f'Subject {i}', 'Body', [f'to{i}@example.com'])
+        with mock.patch(
+            'owner_app.outbox.get_connection', wraps=get_connection
+        ) as connect:
+            self.assertEqual(send_batch(), (3, 0))
+        self.assertEqual(connect.call_count, 1)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_emails_are_leased_and_sent_outside_a_transaction(self):
+        from unittest import mock
+        from django.db import connection
+        from django.utils import timezone
+
+        first = enqueue('First', 'Body', ['first@example.com'])
+        enqueue('Second', 'Body', ['second@example.com'])
+        depth = len(connection.atomic_blocks)
+        seen = []
+
+        def send(messages):
+            seen.append({
+                'depth': len(connection.atomic_blocks),
+                'leased': not OutboundEmail.objects.filter(
+                    status=OutboundEmail.PENDING,
+                    next_attempt_at__lte=timezone.now(),
+                ).exists(),
+                # Another worker finds nothing due while the batch runs
+                'rival': send_batch(),
+                'first': OutboundEmail.objects.get(pk=first.pk).status,
+            })
+            return len(messages)
+
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages',
+            side_effect=send,
+        ):
+            self.assertEqual(send_batch(), (2, 0))
+        self.assertEqual([s['depth'] for s in seen], [depth, depth])
+        self.assertTrue(all(s['leased'] for s in seen))
+        self.assertEqual([s['rival'] for s in seen], [(0, 0), (0, 0)])
+        # The first result was saved before the second email went out
+        self.assertEqual(
+            [s['first'] for s in seen],
+            [OutboundEmail.PENDING, OutboundEmail.SENT],
+        )
+
+    def test_failures_back_off_then_give_up(self):
+        from smtplib import SMTPException
+        from unittest import mock
+        from django.utils import timezone
+
+        self.reply()
+        email = OutboundEmail.objects.get()
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages',
+            side_effect=SMTPException('down'),
+        ):
+            self.assertEqual(send_batch(), (0, 1))
+            email.refresh_from_db()
+            self.assertEqual(email.status, OutboundEmail.PENDING)
+            self.assertGreater(email.next_attempt_at, timezone.now())
+            # Not due yet: nothing is attempted
+            self.assertEqual(send_batch(), (0, 0))
+
+            OutboundEmail.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(send_batch(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.FAILED)
+        self.assertIn('down', email.last_error)
+        reply = MessageReply.objects.get()
+        self.assertEqual(reply.delivery_status, MessageReply.FAILED)
+
+        # The owner can queue it again from the message page
+        self.client.post(
+            reverse('collections_app:message_detail', args=[self.msg.pk]),
+            {'action': 'retry_reply', 'reply_id': reply.pk},
+        )
+        self.assertEqual(send_batch(), (1, 0))
+        reply.refresh_from_db()
+        self.assertEqual(reply.delivery_status, MessageReply.SENT)
+
+    def test_retry_rejects_bad_reply_ids(self):
+        url = reverse('collections_app:message_detail', args=[self.msg.pk])
+        response = self.client.post(
+            url, {'action': 'retry_reply', 'reply_id': 'abc'}
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            url, {'action': 'retry_reply', 'reply_id': '999999'}
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+# ============================================================================
+# LISTING COLUMN TESTS
+# Owner listings select only the columns their templates read
+# ============================================================================
+
+def selected_columns(obj):
+    """Concrete columns loaded on ``obj`` (everything not deferred)."""
+    loaded = {f.attname for f in obj._meta.concrete_fields}
+    return loaded - obj.get_deferred_fields()
+
+
+class OwnerListingColumnsTest(TestCase):
+    """Tests for the art_list and assign_art projections."""
+
+    def setUp(self):
+        from collections_app.models import Art, Collection
+        from events_app.models import Exhibition
+        from .models import ArtistProfile
+
+        self.owner = User.objects.create_superuser(
+            'columns-owner', 'owner@example.com', 'pw'
+        )
+        self.client.force_login(self.owner)
+        artist = ArtistProfile.objects.create(
+            name='Owner Artist', email='owner-artist@example.com'
+        )
+        self.collection = Collection.objects.create(
+            artist=artist, name='Owner Collection'
+        )
+        self.art = Art.objects.create(
+            collection=self.collection, title='Owner Art',
+            description='Long text ' * 200,
+        )
+        self.exhibition = Exhibition.objects.create(title='Columns Show')
+
+    def test_art_list_selects_tile_columns(self):
+        response = self.client.get(reverse('owner_app:art_list'))
+        group = response.context['grouped_collections'][0]
+        self.assertEqual(
+            selected_columns(group['collection']), {'id', 'name'}
+        )
+        self.assertEqual(
+            selected_columns(group['arts'][0]),
+            {'id', 'collection_id', 'title', 'image', 'is_featured'},
+        )
+        self.assertContains(response, 'Owner Art')
+
+    def test_assign_art_selects_tile_columns(self):
+        response = self.client.get(
+            reverse('owner_app:assign_art', args=[self.exhibition.pk])
+        )
+        art = response.context['all_art'][0]
+        self.assertEqual(
+            selected_columns(art),
+            {'id', 'collection_id', 'title', 'image'},
+        )
+        self.assertEqual(selected_columns(art.collection), {'id', 'name'})
+        self.assertContains(response, 'Owner Collection')
+
+
+# ============================================================================
+# EXPORT TESTS
+# Owner exports are streamed in chunks as CSV or JSON Lines
+# ============================================================================
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class ExportDataTest(TestCase):
+    """Tests for the owner_app.export_data streaming downloads."""
+
+    def setUp(self):
+        from decimal import Decimal
+        from collections_app.models import (
+            Art, ArtVariant, Collection, Order, OrderItem,
+        )
+        from .models import ArtistProfile
+
+        self.owner = User.objects.create_superuser(
+            'export-owner', 'owner@example.com', 'pw'
+        )
+        self.client.force_login(self.owner)
+        artist = ArtistProfile.objects.create(
+            name='Export Artist', email='export-artist@example.com'
+        )
+        collection = Collection.objects.create(
+            artist=artist, name='Export Collection'
+        )
+        for i in range(5):
+            art = Art.objects.create(
+                collection=collection, title=f'Export {i}', medium='Ink',
+                currency='USD', description='- first line\nsecond line',
+                is_available=True,
+            )
+            for medium, price in (
+                (ArtVariant.ORIGINAL, '500.00'),
+                (ArtVariant.POSTER, '30.00'),
+                (ArtVariant.DIGITAL, '9.00'),
+            ):
+                ArtVariant.objects.create(
+                    art=art, medium=medium, price=Decimal(price),
+                    is_available=True,
+                )
+        order = Order.objects.create(
+            email='buyer@example.com', full_name='=HYPERLINK("x")',
+            total_amount=Decimal('39.00'),
+        )
+        for title, price in (('Export 0', '30.00'), ('Export 1', '9.00')):
+            OrderItem.objects.create(
+                order=order, artwork_title=title, quantity=1,
+                price=Decimal(price),
+            )
+        Order.objects.create(email='empty@example.com', total_amount=0)
+        Messages.objects.create(
+            name='Visitor', email='v@example.com', message='Hello',
+            owner=self.owner,
+        )
+        Messages.objects.create(
+            name='Other', email='o@example.com', message='Not mine',
+        )
+
+    def download(self, dataset, fmt):
+        response = self.client.get(
+            reverse('owner_app:export_data', args=[dataset, fmt])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment;', response['Content-Disposition'])
+        return b''.join(response.streaming_content).decode()
+
+    def test_catalog_csv_streams_in_chunks(self):
+        import csv
+        import io
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        response = self.client.get(
+            reverse('owner_app:export_data', args=['catalog', 'csv'])
+        )
+        with CaptureQueriesContext(connection) as queries:
+            body = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(body)))
+
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['artist_email'], 'export-artist@example.com')
+        self.assertEqual(rows[0]['poster_price'], '30.00')
+        self.assertEqual(rows[0]['original_available'], 'True')
+        # Catalog text is not escaped
+        self.assertTrue(rows[0]['description'].startswith('- first'))
+        # One Art query read in three chunks of two, and one variant
+        # prefetch per chunk
+        self.assertEqual(len(queries), 4)
+
+    def test_catalog_export_imports_back_unchanged(self):
+        from io import StringIO
+        from collections_app.importer import import_catalog
+
+        body = self.download('catalog', 'jsonl')
+        stats, errors = import_catalog(StringIO(body), 'jsonl')
+
+        self.assertEqual(errors, [])
+        self.assertEqual(stats.art_unchanged, 5)
+        self.assertEqual(stats.variants_written, 0)
+
+    def test_orders_jsonl_nests_items_and_csv_flattens_them(self):
+        import csv
+        import io
+        import json
+
+        lines = self.download('orders', 'jsonl').splitlines()
+        orders = [json.loads(line) for line in lines]
+        self.assertEqual(len(orders), 2)
+        self.assertEqual(
+            [item['artwork_title'] for item in orders[0]['items']],
+            ['Export 0', 'Export 1'],
+        )
+        self.assertEqual(orders[1]['items'], [])
+
+        rows = list(csv.DictReader(io.StringIO(
+            self.download('orders', 'csv')
+        )))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['order_number'], rows[1]['order_number'])
+        self.assertEqual(rows[2]['artwork_title'], '')
+        # Visitor-supplied text cannot run as a spreadsheet formula
+        self.assertEqual(rows[0]['full_name'], '\'=HYPERLINK("x")')
+
+    def test_messages_are_the_owners_inbox(self):
+        import json
+
+        lines = self.download('messages', 'jsonl').splitlines()
+        self.assertEqual(
+            [json.loads(line)['message'] for line in lines], ['Hello']
+        )
+
+    def test_export_is_owner_only(self):
+        url = reverse('owner_app:export_data', args=['orders', 'csv'])
+        self.client.logout()
+        self.assertEqual(self.client.get(url).status_code, 302)
+        shopper = User.objects.create_user('shopper', 's@example.com', 'pw')
+        self.client.force_login(shopper)
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.force_login(self.owner)
+        response = self.client.get(
+            reverse('owner_app:export_data', args=['users', 'csv'])
+        )
+        self.assertEqual(response.status_code, 404)
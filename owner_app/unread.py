@@ -0,0 +1,46 @@
+"""Unread message counter for the navbar badge.
+
+Each owner's unread count lives in the Django cache (config.cache.UserCounter)
+and is adjusted in place (``incr``/``decr``) whenever a Messages row is
+created, marked read or unread, or deleted, so rendering the badge normally
+costs one cache read instead of a COUNT(*). A missing counter is recounted
+from the database on the next read, so a counter that drifted or was
+evicted only lasts until UNREAD_MESSAGES_CACHE_TIMEOUT expires.
+
+Within a request the value is memoized on the request object, so the
+context processor and the ``message_count`` tag share a single lookup.
+"""
+from config.cache import UserCounter
+
+
+def _load(owner_id):
+    from .models import Messages
+
+    return Messages.objects.filter(owner_id=owner_id, unread=True).count()
+
+
+UNREAD_COUNT = UserCounter(
+    'owner_app:unread', _load,
+    timeout_setting='UNREAD_MESSAGES_CACHE_TIMEOUT',
+    request_attr='_unread_message_count',
+)
+
+
+def unread_count(owner_id):
+    """Return the owner's unread message count, counting on a cache miss."""
+    return UNREAD_COUNT.get(owner_id)
+
+
+def adjust_unread_count(owner_id, delta):
+    """Add ``delta`` to the owner's cached counter once the write commits."""
+    UNREAD_COUNT.adjust(owner_id, delta)
+
+
+def reset_unread_count(*owner_ids):
+    """Forget cached counters; used after bulk writes of unknown effect."""
+    UNREAD_COUNT.forget(*owner_ids)
+
+
+def request_unread_count(request):
+    """Per-request memoized unread count for the signed-in user."""
+    return UNREAD_COUNT.for_request(request)
@@ -65,4 +65,9 @@ urlpatterns = [
         views.edit_collection,
         name='edit_collection',
     ),
+    path(
+        'export/<slug:dataset>.<slug:fmt>',
+        views.export_data,
+        name='export_data',
+    ),
 ]
@@ -1,4 +1,7 @@
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import render, redirect
+from django.utils import timezone
+from .exports import DATASETS, FORMATS, stream_export
 from .models import ArtistProfile, Contact
 from .forms import ArtistProfileForm, ContactForm
 from collections_app.forms import ArtForm
@@ -8,6 +11,8 @@ from collections_app.models import Collection
 from events_app.forms import ExhibitionForm
 from events_app.models import Exhibition
 from django.contrib.auth.decorators import user_passes_test
+from django.views.decorators.cache import never_cache
+from config.cache import cache_anonymous_page
 
 
 def index(request):
@@ -15,6 +20,7 @@ def index(request):
     return render(request, 'owner_pages/about.html', {'artist': artist})
 
 
+@cache_anonymous_page('about')
 def public_about(request):
     """Public about page used by visitors."""
     artist = ArtistProfile.objects.first()
@@ -67,10 +73,19 @@ def edit_artist(request):
 
 @user_passes_test(lambda u: u.is_superuser, login_url='/accounts/login/')
 def art_list(request):
-    # Group arts by collection for owner listing
+    # Group arts by collection for owner listing. The template shows the
+    # collection name and a tile per art, so only those columns are loaded
+    # (collections_app.listings).
+    from django.db.models import Prefetch
+    from collections_app.listings import OWNER_ART_FIELDS
+
     collections = (
-        Collection.objects.prefetch_related('arts')
-        .select_related('artist')
+        Collection.objects.only('id', 'name')
+        .prefetch_related(
+            Prefetch(
+                'arts', queryset=Art.objects.only(*OWNER_ART_FIELDS)
+            )
+        )
         .all()
     )
     # Prepare a mapping of collection -> arts queryset
@@ -138,7 +153,8 @@ def create_art(request):
 
 @user_passes_test(lambda u: u.is_superuser, login_url='/accounts/login/')
 def edit_art(request, pk):
-    art = Art.objects.get(pk=pk)
+    # ArtForm reads the variants in __init__ and reuses them in save()
+    art = Art.objects.prefetch_related('variants').get(pk=pk)
     if request.method == 'POST':
         form = ArtForm(request.POST, request.FILES, instance=art)
         if form.is_valid():
@@ -359,10 +375,14 @@ def assign_art(request, exhibition_pk):
     so the selection is authoritative.
     """
     from events_app.models import ExhibitionArt
+    from events_app.signals import invalidate_events_page
+    from collections_app.listings import ASSIGN_ART_FIELDS
 
     exhibition = Exhibition.objects.get(pk=exhibition_pk)
 
-    all_art = Art.objects.select_related('collection').all()
+    all_art = Art.objects.select_related('collection').only(
+        *ASSIGN_ART_FIELDS
+    )
 
     # existing art ids linked to this exhibition
     existing_ids = set(
@@ -373,17 +393,22 @@ def assign_art(request, exhibition_pk):
         selected = request.POST.getlist('art')
         selected_ids = set(int(i) for i in selected)
 
-        # create links for newly selected
-        for art_id in selected_ids - existing_ids:
-            ExhibitionArt.objects.get_or_create(
-                exhibition=exhibition, art_id=art_id
-            )
-
-        # remove links for unselected
-        for art_id in existing_ids - selected_ids:
-            ExhibitionArt.objects.filter(
-                exhibition=exhibition, art_id=art_id
-            ).delete()
+        # create links for newly selected in one INSERT
+        added = ExhibitionArt.objects.bulk_create(
+            [
+                ExhibitionArt(exhibition=exhibition, art_id=art_id)
+                for art_id in selected_ids - existing_ids
+            ],
+            ignore_conflicts=True,
+        )
+        # bulk_create sends no post_save: run its receiver by hand
+        if added:
+            invalidate_events_page(sender=ExhibitionArt)
+
+        # remove links for unselected (post_delete bumps the events page)
+        ExhibitionArt.objects.filter(
+            exhibition=exhibition, art_id__in=existing_ids - selected_ids
+        ).delete()
 
         return redirect('owner_app:exhibitions_list')
 
@@ -402,6 +427,7 @@ def assign_art(request, exhibition_pk):
 def assign_media(request, exhibition_pk):
     """Allow owner to select Media rows to include in an exhibition."""
     from events_app.models import ExhibitionMedia
+    from events_app.signals import invalidate_events_page
 
     exhibition = Exhibition.objects.get(pk=exhibition_pk)
 
@@ -415,17 +441,22 @@ def assign_media(request, exhibition_pk):
         selected = request.POST.getlist('media')
         selected_ids = set(int(i) for i in selected)
 
-        # add newly selected
-        for media_id in selected_ids - existing_ids:
-            ExhibitionMedia.objects.get_or_create(
-                exhibition=exhibition, media_id=media_id
-            )
-
-        # remove unselected
-        for media_id in existing_ids - selected_ids:
-            ExhibitionMedia.objects.filter(
-                exhibition=exhibition, media_id=media_id
-            ).delete()
+        # add newly selected in one INSERT
+        added = ExhibitionMedia.objects.bulk_create(
+            [
+                ExhibitionMedia(exhibition=exhibition, media_id=media_id)
+                for media_id in selected_ids - existing_ids
+            ],
+            ignore_conflicts=True,
+        )
+        # bulk_create sends no post_save: run its receiver by hand
+        if added:
+            invalidate_events_page(sender=ExhibitionMedia)
+
+        # remove unselected (post_delete bumps the events page)
+        ExhibitionMedia.objects.filter(
+            exhibition=exhibition, media_id__in=existing_ids - selected_ids
+        ).delete()
 
         return redirect('owner_app:exhibitions_list')
 
@@ -440,3 +471,22 @@ def assign_media(request, exhibition_pk):
     )
 
 
+@never_cache
+@user_passes_test(lambda u: u.is_superuser, login_url='/accounts/login/')
+def export_data(request, dataset, fmt):
+    """
+    Download the catalog, orders or inbox as CSV or JSON Lines.
+
+    The file is streamed as it is read (see owner_app.exports), so memory
+    use does not grow with the size of the table.
+    """
+    if dataset not in DATASETS or fmt not in FORMATS:
+        raise Http404('Unknown export')
+
+    response = StreamingHttpResponse(
+        stream_export(dataset, fmt, request.user),
+        content_type=FORMATS[fmt],
+    )
+    filename = f'{dataset}-{timezone.localdate():%Y-%m-%d}.{fmt}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -6,7 +6,6 @@ import django
 django.setup()
 from django.test import Client
 from collections_app.models import Collection, ArtVariant, Art
-from django.db.models import Q
 
 print('Collections count:', Collection.objects.count())
 print('Sample collections:', list(Collection.objects.values('pk','name')[:10]))
@@ -15,7 +14,7 @@ format_choices = ArtVariant.MEDIUM_CHOICES
 print('Format choices:', format_choices)
 
 # Featured
-featured_qs = Art.objects.filter(is_featured=True).filter(Q(is_available=True) | Q(variants__is_available=True)).distinct()
+featured_qs = Art.storefront.featured()
 print('Featured count (per view criteria):', featured_qs.count())
 for a in featured_qs[:5]:
     print(' -', a.pk, a.title, 'is_available=', a.is_available, 'variants_available=', a.variants.filter(is_available=True).count())
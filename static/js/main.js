@@ -3,38 +3,52 @@ console.log('main.js loaded');
 
 /**
  * Update the basket count in the navigation bar
- * This function fetches the current basket item count from the server
- * and updates the badge in the navbar
+ * The badge is normally rendered with the count already filled in
+ * (data-count). Pass a count (e.g. `basket_count` from an AJAX basket
+ * response) to set it directly; without one the count is fetched from
+ * the server.
  */
-function updateBasketCount() {
+function setBasketCount(basketCountElement, count) {
+    basketCountElement.textContent = count;
+    basketCountElement.dataset.count = count;
+    // Hide badge if count is 0
+    basketCountElement.style.display = count === 0 ? 'none' : 'inline-block';
+}
+
+function updateBasketCount(count) {
     // Check if the basket count element exists (only for authenticated users)
     const basketCountElement = document.getElementById('basket-count');
     if (!basketCountElement) {
         return; // User is not authenticated, skip
     }
 
+    if (typeof count === 'number') {
+        setBasketCount(basketCountElement, count);
+        return;
+    }
+
     // Fetch basket count from the server
     fetch('/basket/count/')
         .then(response => response.json())
-        .then(data => {
-            // Update the badge with the item count
-            basketCountElement.textContent = data.count;
-            
-            // Hide badge if count is 0
-            if (data.count === 0) {
-                basketCountElement.style.display = 'none';
-            } else {
-                basketCountElement.style.display = 'inline-block';
-            }
-        })
+        .then(data => setBasketCount(basketCountElement, data.count))
         .catch(error => {
             console.error('Error fetching basket count:', error);
         });
 }
 
-// Update basket count when the page loads
+// Only fetch the count when the page was not rendered for this user:
+// markup without a per-user data-count (served from a shared cache), or
+// a page restored from the back/forward cache whose count may be stale.
 document.addEventListener('DOMContentLoaded', function() {
-    updateBasketCount();
+    const basketCountElement = document.getElementById('basket-count');
+    if (basketCountElement && !/^\d+$/.test(basketCountElement.dataset.count || '')) {
+        updateBasketCount();
+    }
+});
+window.addEventListener('pageshow', function(event) {
+    if (event.persisted) {
+        updateBasketCount();
+    }
 });
 
 // Export the function so it can be called from other pages
@@ -160,9 +174,10 @@ function initAddToBasketForm() {
                 const artTitle = form.dataset.artTitle || document.title;
                 const toastMsg = buildToastMessage(artTitle, variantLabel, variantPrice, 'Added');
                 showToast(toastMsg, 'success');
-                updateBasketCount();
+                updateBasketCount(data.basket_count);
             } else {
-                showToast('Failed to add to basket. Please try again.', 'error');
+                // e.g. 409 when the last unit is held by another basket
+                showToast(data.message || 'Failed to add to basket. Please try again.', 'error');
             }
         })
         .catch(() => {